@@ -1,45 +1,27 @@
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain.llms import OpenAI
-from .services.scraper import MockScraper
-from .services.resume import ResumeBuilder
-from .services.submitter import ApplicationSubmitter
-import os
+from langchain_core.tools import StructuredTool
+from typing import List
+from .services.pipeline import Pipeline, create_run
 
-# Placeholder for LLM setup
-# llm = OpenAI(temperature=0, openai_api_key=os.getenv("OPENAI_API_KEY"))
+# Placeholder for agent setup, e.g. with langchain.agents.create_agent:
+# agent = create_agent(ChatOpenAI(model="gpt-4o-mini", temperature=0), tools)
 
-scraper = MockScraper()
-resume_builder = ResumeBuilder()
-submitter = ApplicationSubmitter()
+async def apply_to_jobs(urls: List[str], base_resume: str) -> str:
+    """
+    Scrapes each job URL, tailors the base resume to it and submits an application.
 
-async def scrape_job_tool(url: str):
-    job = await scraper.scrape_job(url)
-    return f"Scraped Job: {job.title} at {job.company}"
-
-async def tailor_resume_tool(job_description: str):
-    # Simplified for tool usage
-    return await resume_builder.tailor_resume("Base Resume", job_description)
-
-async def submit_application_tool(job_id: str):
-    # Simplified
-    return "Application Submitted"
+    Jobs are processed as a pipeline (the next job is scraped while the previous
+    one is tailored), and progress is checkpointed per job.
+    """
+    run_id = await create_run(urls, base_resume)
+    report = await Pipeline().run(run_id)
+    return report.summary()
 
+# One tool for the whole flow: the agent hands over a batch of URLs instead of
+# driving scrape, tailor and submit one job at a time
 tools = [
-    Tool(
-        name="Scrape Job",
-        func=scrape_job_tool,
-        description="Useful for getting job details from a URL"
-    ),
-    Tool(
-        name="Tailor Resume",
-        func=tailor_resume_tool,
-        description="Useful for customizing a resume for a specific job"
-    ),
-    Tool(
-        name="Submit Application",
-        func=submit_application_tool,
-        description="Useful for submitting an application to a job"
+    StructuredTool.from_function(
+        coroutine=apply_to_jobs,
+        name="apply_to_jobs",
+        description="Apply to a list of job posting URLs with a resume tailored to each job. Returns a summary per stage.",
     )
 ]
-
-# agent = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=True)
@@ -0,0 +1,90 @@
+"""
+Finds new postings by paging through saved job searches.
+
+    python -m app.discovery add "https://www.linkedin.com/jobs/search/?keywords=backend&location=Remote" --interval 1800
+    python -m app.discovery list
+    python -m app.discovery run 1
+    python -m app.discovery schedule [--once] [--poll 60]
+
+`run` crawls one search now. `schedule` enqueues a `discover_search` task
+for every search that is due; the worker (python -m app.worker) runs them
+and the `scrape_job` tasks they enqueue for new or changed postings.
+"""
+from sqlalchemy import select
+from .database import AsyncSessionLocal, async_engine, init_db
+from .models import SavedSearch
+from .services.browser import get_browser_pool
+from .services.discovery import add_search, get_crawler, schedule_due_searches
+import argparse
+import asyncio
+import json
+import logging
+
+
+async def add(args):
+    async with AsyncSessionLocal() as db:
+        search = await add_search(db, args.url, name=args.name, interval_seconds=args.interval, max_pages=args.max_pages)
+        print(f"Saved search {search.id}: {search.url}")
+
+
+async def list_searches(args):
+    async with AsyncSessionLocal() as db:
+        searches = (await db.execute(select(SavedSearch).order_by(SavedSearch.id))).scalars().all()
+    for search in searches:
+        print(f"{search.id:>4} {search.name or '-':20} every {search.interval_seconds}s next {search.next_run_at:%Y-%m-%d %H:%M} {search.url}")
+        if search.last_result:
+            print(f"     last run {search.last_run_at:%Y-%m-%d %H:%M}: {json.dumps(search.last_result)}")
+
+
+async def run(args):
+    try:
+        result = await get_crawler().run(args.search_id)
+        print(json.dumps(result.to_dict(), indent=2))
+    finally:
+        await get_browser_pool().stop()
+
+
+async def schedule(args):
+    while True:
+        async with AsyncSessionLocal() as db:
+            scheduled = await schedule_due_searches(db)
+        if scheduled:
+            print(f"Enqueued discovery for searches {scheduled}")
+        if args.once:
+            return
+        await asyncio.sleep(args.poll)
+
+
+COMMANDS = {"add": add, "list": list_searches, "run": run, "schedule": schedule}
+
+
+async def main_async(args):
+    try:
+        await COMMANDS[args.command](args)
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_parser = commands.add_parser("add", help="Save a search results URL")
+    add_parser.add_argument("url")
+    add_parser.add_argument("--name")
+    add_parser.add_argument("--interval", type=int, default=None, help="Seconds between passes (default 3600)")
+    add_parser.add_argument("--max-pages", type=int, default=None, help="Pages fetched per pass at most (default 10)")
+    commands.add_parser("list", help="Show saved searches and their last pass")
+    run_parser = commands.add_parser("run", help="Crawl one search now")
+    run_parser.add_argument("search_id", type=int)
+    schedule_parser = commands.add_parser("schedule", help="Enqueue due searches for the worker")
+    schedule_parser.add_argument("--once", action="store_true", help="Enqueue what's due now and exit")
+    schedule_parser.add_argument("--poll", type=float, default=60, help="Seconds between checks")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
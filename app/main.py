@@ -1,30 +1,74 @@
-from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from .database import get_db, engine, Base
-from .models import Job, Resume, Application, ApplicationStatus
+from fastapi import FastAPI, HTTPException, Depends, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+from .database import get_db, init_db, AsyncSessionLocal, async_engine
+from .models import Job, Resume, Application, ApplicationStatus, Task
 from .services.scraper import ScraperFactory
 from .services.resume import ResumeBuilder
-from .services.submitter import ApplicationSubmitter
+from .services.browser import browser_pool
+from .services.politeness import get_scheduler
+from .services.batch import MAX_BATCH_URLS, MAX_CONCURRENCY, scrape_batch_chunks
+from .services.job_store import SCRAPED, fresh_jobs, save_job, upsert_jobs
+from .services.job_description import preload_tokenizer
+from .services.urls import normalize_url
+from .services.job_search import InvalidQuery, list_jobs
+from .services.applications import get_application, list_applications
+from .services.resume_store import add_tailored_resume, add_tailored_resumes
+from .services import queue
+from .metrics import render_prometheus
+from .tracing import TracingMiddleware
+from contextlib import asynccontextmanager
+import json
 import logging
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    # Warm the shared browser pool once for the scraper and the submitter (Playwright loads here)
+    await browser_pool.start()
+    await preload_tokenizer()
+    yield
+    await browser_pool.stop()
+    await async_engine.dispose()
 
-app = FastAPI(title="AI Job Agent")
+app = FastAPI(title="AI Job Agent", lifespan=lifespan)
+app.add_middleware(TracingMiddleware)
 logger = logging.getLogger(__name__)
 
 # Services
 resume_builder = ResumeBuilder()
-submitter = ApplicationSubmitter()
 
 # Pydantic Models
 class JobRequest(BaseModel):
     url: str
+    force: bool = False # Re-scrape even if a fresh copy is stored
+
+class JobRecord(BaseModel):
+    title: str
+    company: str
+    description: str
+    url: str
+    source: str
+
+class BatchJobRequest(BaseModel):
+    urls: List[str] = Field(..., max_length=MAX_BATCH_URLS)
+    concurrency: Optional[int] = Field(None, ge=1, le=MAX_CONCURRENCY) # Per-source limit override
+    force: bool = False
 
 class ResumeRequest(BaseModel):
     base_resume: str
     job_description: str
+    use_cache: bool = True # False forces a fresh LLM call
+
+class BatchResumeRequest(BaseModel):
+    base_resume: str
+    job_descriptions: List[str]
+    use_cache: bool = True
+    concurrency: Optional[int] = None
 
 class ApplicationRequest(BaseModel):
     job_id: int
@@ -34,63 +78,369 @@ class ApplicationRequest(BaseModel):
 async def root():
     return {"message": "Welcome to the AI Job Agent API"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of every registered metric."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/browser-pool/stats")
+async def browser_pool_stats():
+    return browser_pool.stats()
+
+@app.get("/politeness/stats")
+async def politeness_stats():
+    return get_scheduler().stats()
+
+def job_summary(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "url": job.url,
+        "source": job.source,
+    }
+
 @app.post("/jobs/scrape")
-async def scrape_job(request: JobRequest, db: Session = Depends(get_db)):
+async def scrape_job(request: JobRequest, db: AsyncSession = Depends(get_db)):
     try:
-        scraper = ScraperFactory.get_scraper(request.url)
-        job = await scraper.scrape_job(request.url)
+        url = normalize_url(request.url)
+        # Known and fresh: skip the browser entirely
+        if not request.force:
+            fresh = await fresh_jobs(db, [url])
+            if url in fresh:
+                return fresh[url]
+
+        scraper = ScraperFactory.get_scraper(url)
+        job = await scraper.scrape_job(url)
         
         # Save to DB
-        db_job = Job(
-            title=job.title,
-            company=job.company,
-            description=job.description,
-            url=job.url,
-            source=job.source
-        )
-        db.add(db_job)
-        db.commit()
-        db.refresh(db_job)
-        return db_job
+        return await save_job(db, job)
     except Exception as e:
         logger.error(f"Scraping error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/jobs/scrape:batch")
+async def scrape_jobs_batch(request: BatchJobRequest):
+    """
+    Scrapes many URLs with per-source concurrency and streams one NDJSON line per URL as it finishes.
+
+    URLs are normalized and deduplicated first (one line per distinct job, reported
+    at its first index). Jobs that are already stored and fresh are reported
+    with status "fresh" without being scraped.
+    """
+    first_index = {}
+    for index, url in enumerate(request.urls):
+        first_index.setdefault(normalize_url(url), index)
+
+    async def results():
+        # Own session: the response body outlives request-scoped dependencies
+        async with AsyncSessionLocal() as db:
+            fresh = {} if request.force else await fresh_jobs(db, first_index)
+            for url, job in fresh.items():
+                line = {"index": first_index[url], "url": url, "source": job.source, "status": "fresh", "job": job_summary(job)}
+                yield json.dumps(line) + "\n"
+
+            pending = [url for url in first_index if url not in fresh]
+            indexes = [first_index[url] for url in pending]
+            async for chunk in scrape_batch_chunks(pending, per_source_limit=request.concurrency, indexes=indexes):
+                scraped = [result for result in chunk if result.ok]
+                upserted = None
+                save_error = None
+                if scraped:
+                    try:
+                        upserted = await upsert_jobs(db, [result.job for result in scraped])
+                    except Exception as e:
+                        await db.rollback()
+                        logger.error(f"Saving scraped jobs failed: {e}")
+                        save_error = str(e)
+
+                for result in chunk:
+                    line = {"index": result.index, "url": result.url, "source": result.source}
+                    if not result.ok:
+                        line.update(status="error", error=result.error)
+                    elif save_error:
+                        line.update(status="error", error=save_error)
+                    else:
+                        url = normalize_url(result.job.url)
+                        line.update(status="ok", created=url in upserted.created_urls, job={
+                            "id": upserted.ids[url],
+                            "title": result.job.title,
+                            "company": result.job.company,
+                            "url": url,
+                            "source": result.job.source,
+                        })
+                    yield json.dumps(line) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.post("/jobs:bulk")
+async def bulk_upsert_jobs(jobs: List[JobRecord], db: AsyncSession = Depends(get_db)):
+    """
+    Inserts or refreshes already-scraped job records keyed on normalized URL.
+    """
+    result = await upsert_jobs(db, [Job(**job.model_dump()) for job in jobs])
+    return {"created": result.created, "updated": result.updated, "ids": result.ids}
+
+@app.get("/jobs")
+async def get_jobs(
+    q: Optional[str] = None,
+    source: Optional[str] = None,
+    company: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    order: str = "recent",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Lists stored jobs, newest first or by search relevance, with cursor pagination.
+
+    Pass `next_cursor` from a response as `cursor` to fetch the following page.
+    """
+    try:
+        page = await list_jobs(
+            db,
+            q=q,
+            source=source,
+            company=company,
+            created_after=created_after,
+            created_before=created_before,
+            order=order,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": [{**job_summary(job), "created_at": job.created_at} for job in page.items],
+        "next_cursor": page.next_cursor,
+    }
+
+@app.get("/jobs/ranked")
+async def ranked_jobs(
+    resume_id: int,
+    top_k: int = Query(20, ge=1, le=1000),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Ranks stored jobs against a resume with the local TF-IDF index (no LLM call).
+
+    Scores are cosine similarities in [0, 1]; use them to pick which jobs are
+    worth tailoring for.
+    """
+    resume = await db.get(Resume, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    # numpy/scipy load on the first ranking request, not at startup
+    from .services.ranking import job_index
+
+    await job_index.sync(db)
+    ranked = job_index.rank(resume.content, top_k=top_k, min_score=min_score)
+    jobs = {job.id: job for job in (await db.execute(select(Job).where(Job.id.in_([r.job_id for r in ranked]), SCRAPED))).scalars()}
+    return [
+        {**job_summary(jobs[r.job_id]), "score": round(r.score, 4)}
+        for r in ranked
+        if r.job_id in jobs # Deleted since it was indexed (or indexed as a placeholder by an older sync)
+    ]
+
+def resume_summary(resume: Resume) -> dict:
+    return {
+        "id": resume.id,
+        "content": resume.content,
+        "base_resume": resume.base_resume,
+        "parent_id": resume.parent_id,
+        "content_hash": resume.content_hash,
+        "created_at": resume.created_at,
+    }
+
 @app.post("/resumes/tailor")
-async def tailor_resume(request: ResumeRequest, db: Session = Depends(get_db)):
+async def tailor_resume(request: ResumeRequest, db: AsyncSession = Depends(get_db)):
     try:
-        tailored_content = await resume_builder.tailor_resume(request.base_resume, request.job_description)
+        tailored_content = await resume_builder.tailor_resume(request.base_resume, request.job_description, use_cache=request.use_cache)
         
-        # Save to DB
-        db_resume = Resume(content=tailored_content, base_resume=False)
-        db.add(db_resume)
-        db.commit()
-        db.refresh(db_resume)
-        return db_resume
+        # Save to DB (deduplicated, compressed against the base resume)
+        db_resume = await add_tailored_resume(db, request.base_resume, tailored_content)
+        await db.commit()
+        await db.refresh(db_resume, ["created_at"])
+        return resume_summary(db_resume)
     except Exception as e:
         logger.error(f"Resume tailoring error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/applications/submit")
-async def submit_application(request: ApplicationRequest, db: Session = Depends(get_db)):
-    job = db.query(Job).filter(Job.id == request.job_id).first()
-    resume = db.query(Resume).filter(Resume.id == request.resume_id).first()
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/resumes/tailor:stream")
+async def tailor_resume_stream(request: ResumeRequest, http_request: Request):
+    """
+    Streams the tailored resume as Server-Sent Events.
+
+    Emits `token` events as the LLM produces text, then a `done` event with the
+    saved resume id (or an `error` event). If the client disconnects the
+    upstream LLM call is cancelled and nothing is saved.
+    """
+    async def events():
+        # Flush headers right away so proxies see a live response
+        yield ": stream opened\n\n"
+        stream = resume_builder.astream_tailor(request.base_resume, request.job_description, use_cache=request.use_cache)
+        parts = []
+        try:
+            async for chunk in stream:
+                if await http_request.is_disconnected():
+                    logger.info("Client disconnected, cancelling resume stream")
+                    return
+                parts.append(chunk)
+                yield sse_event("token", {"text": chunk})
+        except Exception as e:
+            logger.error(f"Resume streaming error: {e}")
+            yield sse_event("error", {"detail": str(e)})
+            return
+        finally:
+            await stream.aclose()
+
+        content = "".join(parts)
+        if not content.strip():
+            logger.error("Resume stream finished without any text")
+            yield sse_event("error", {"detail": "The model returned an empty resume"})
+            return
+        # The request-scoped session is gone by now, so persist with our own
+        async with AsyncSessionLocal() as db:
+            db_resume = await add_tailored_resume(db, request.base_resume, content)
+            await db.commit()
+        yield sse_event("done", {"resume_id": db_resume.id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/resumes/tailor:batch")
+async def tailor_resumes_batch(request: BatchResumeRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Tailors one base resume against many job descriptions; results keep input order with per-item errors.
+    """
+    results = await resume_builder.tailor_many(
+        request.base_resume,
+        request.job_descriptions,
+        use_cache=request.use_cache,
+        concurrency=request.concurrency,
+    )
+    
+    # Save successful variants in one commit
+    succeeded = [result for result in results if result.ok]
+    stored = await add_tailored_resumes(db, request.base_resume, [result.content for result in succeeded])
+    db_resumes = {result.index: resume for result, resume in zip(succeeded, stored)}
+    await db.commit()
+    
+    return [
+        {
+            "index": result.index,
+            "resume_id": db_resumes[result.index].id if result.ok else None,
+            "content": result.content,
+            "error": result.error,
+        }
+        for result in results
+    ]
+
+@app.get("/resumes/cache/stats")
+async def resume_cache_stats():
+    return resume_builder.cache.stats()
+
+@app.post("/jobs/scrape:enqueue", status_code=202)
+async def enqueue_scrape_job(request: JobRequest, db: AsyncSession = Depends(get_db)):
+    task = await queue.enqueue(db, "scrape_job", {"url": request.url})
+    return {"task_id": task.id, "status": task.status}
+
+@app.post("/applications/submit", status_code=202)
+async def submit_application(request: ApplicationRequest, db: AsyncSession = Depends(get_db)):
+    job = await db.get(Job, request.job_id)
+    resume = await db.get(Resume, request.resume_id)
     
     if not job or not resume:
         raise HTTPException(status_code=404, detail="Job or Resume not found")
+    if job.scraped_at is None and job.description is None:
+        # Discovered but not scraped yet: nothing to tailor against or apply to
+        raise HTTPException(status_code=409, detail="Job has not been scraped yet")
         
     application = Application(job_id=job.id, resume_id=resume.id, status=ApplicationStatus.PENDING)
     db.add(application)
-    db.commit()
-    db.refresh(application)
-    
-    # Trigger submission
-    # Note: In a real app, this should be a background task (Celery/Arq)
-    status = await submitter.submit_application(application)
+    await db.commit()
+    await db.refresh(application)
     
-    application.status = status
-    db.commit()
-    db.refresh(application)
+    # Submission runs in the worker process (python -m app.worker); poll GET /tasks/{task_id}
+    task = await queue.enqueue(db, "submit_application", {"application_id": application.id})
     
-    return application
+    return {"task_id": task.id, "application_id": application.id, "status": task.status}
+
+def application_summary(application: Application) -> dict:
+    resume = application.resume
+    return {
+        "id": application.id,
+        "status": application.status,
+        "created_at": application.created_at,
+        "submitted_at": application.submitted_at,
+        "job": job_summary(application.job) if application.job else None,
+        "resume": {"id": resume.id, "base_resume": resume.base_resume, "created_at": resume.created_at} if resume else None,
+    }
+
+@app.get("/applications")
+async def get_applications(
+    status: Optional[str] = None,
+    job_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Lists applications newest first, with their job and resume, using cursor pagination.
+
+    Pass `next_cursor` from a response as `cursor` to fetch the following page.
+    """
+    try:
+        page = await list_applications(
+            db,
+            status=status,
+            job_id=job_id,
+            created_after=created_after,
+            created_before=created_before,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": [application_summary(application) for application in page.items],
+        "next_cursor": page.next_cursor,
+    }
+
+@app.get("/applications/{application_id}")
+async def get_application_detail(application_id: int, db: AsyncSession = Depends(get_db)):
+    application = await get_application(db, application_id)
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    summary = application_summary(application)
+    if application.resume:
+        summary["resume"]["content"] = application.resume.content
+    return summary
 
+@app.get("/tasks/{task_id}")
+async def get_task(task_id: int, db: AsyncSession = Depends(get_db)):
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return {
+        "id": task.id,
+        "kind": task.kind,
+        "status": task.status,
+        "attempts": task.attempts,
+        "max_attempts": task.max_attempts,
+        "run_at": task.run_at,
+        "last_error": task.last_error,
+        "result": task.result,
+    }
@@ -0,0 +1,111 @@
+"""
+Data migrations for rows written before a storage change.
+
+    python -m app.migrations resumes [--batch-size 500]
+
+Schema changes (new tables, nullable columns, indexes) are applied by
+init_db(); the functions here rewrite existing rows. Each one is idempotent
+and commits per batch, so an interrupted run can simply be started again.
+"""
+from sqlalchemy import func, select, update, delete
+from .database import Base, engine, init_db
+from .models import Resume, compress_content, content_hash
+import argparse
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _references(table):
+    """(table, column) pairs of every foreign key pointing at `table`."""
+    return [
+        (fk.parent.table, fk.parent)
+        for other in Base.metadata.sorted_tables
+        for fk in other.foreign_keys
+        if fk.column.table is table
+    ]
+
+
+def migrate_resumes(bind=None, batch_size: int = 500) -> dict:
+    """
+    Hashes, deduplicates and compresses resumes stored as plain text.
+
+    Rows with identical content (and the same base_resume flag) collapse
+    into the oldest one; references to the others are repointed to it. Other
+    tailored rows are zlib-compressed in place. Their base resume isn't known
+    for rows written before parent_id existed, so they are compressed on
+    their own. Base resumes stay plain text.
+    """
+    bind = bind or engine
+    init_db(bind)
+    resumes = Resume.__table__
+    references = _references(resumes)
+    stats = {"rows": 0, "merged": 0, "compressed": 0, "bytes_before": 0, "bytes_after": 0}
+
+    last_id = 0
+    while True:
+        with bind.begin() as connection:
+            rows = connection.execute(
+                select(resumes.c.id, resumes.c.content, resumes.c.base_resume)
+                .where(resumes.c.content_hash.is_(None), resumes.c.id > last_id)
+                .order_by(resumes.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            hashes = {row.id: content_hash(row.content or "") for row in rows}
+            # Oldest stored row per (hash, base flag), including rows migrated in earlier batches
+            keepers = {
+                (found.content_hash, bool(found.base_resume)): found.id
+                for found in connection.execute(
+                    select(resumes.c.content_hash, resumes.c.base_resume, func.min(resumes.c.id).label("id"))
+                    .where(resumes.c.content_hash.in_(set(hashes.values())))
+                    .group_by(resumes.c.content_hash, resumes.c.base_resume)
+                )
+            }
+
+            for row in rows:
+                stats["rows"] += 1
+                content = row.content or ""
+                stats["bytes_before"] += len(content.encode())
+                key = (hashes[row.id], bool(row.base_resume))
+                keeper = keepers.get(key)
+                if keeper is not None:
+                    for table, column in references:
+                        connection.execute(update(table).where(column == row.id).values({column.name: keeper}))
+                    connection.execute(delete(resumes).where(resumes.c.id == row.id))
+                    stats["merged"] += 1
+                    continue
+
+                keepers[key] = row.id
+                values = {"content_hash": hashes[row.id]}
+                if not row.base_resume and row.content is not None:
+                    values.update(content=None, compressed=compress_content(row.content))
+                    stats["compressed"] += 1
+                    stats["bytes_after"] += len(values["compressed"])
+                else:
+                    stats["bytes_after"] += len(content.encode())
+                connection.execute(update(resumes).where(resumes.c.id == row.id).values(**values))
+        logger.info(f"Migrated resumes up to id {last_id}: {stats}")
+    return stats
+
+
+MIGRATIONS = {"resumes": migrate_resumes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("name", choices=sorted(MIGRATIONS))
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stats = MIGRATIONS[args.name](batch_size=args.batch_size)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,34 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, JSON, Index, LargeBinary, event, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
+from typing import Optional
 import enum
+import hashlib
+import zlib
 from .database import Base
 
+def utcnow() -> datetime:
+    # Naive UTC, for columns compared in Python/SQL the same way on SQLite and Postgres
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def compress_content(content: str, base: Optional[str] = None) -> bytes:
+    """
+    zlib-compresses `content`, primed with `base` as preset dictionary when given.
+
+    Text shared with the base (within zlib's 32 KB window) is encoded as
+    back-references into it, so a tailored variant costs about its diff.
+    """
+    compressor = zlib.compressobj(level=9, zdict=base.encode()) if base else zlib.compressobj(level=9)
+    return compressor.compress(content.encode()) + compressor.flush()
+
+def decompress_content(data: bytes, base: Optional[str] = None) -> str:
+    decompressor = zlib.decompressobj(zdict=base.encode()) if base else zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode()
+
 class ApplicationStatus(str, enum.Enum):
     PENDING = "pending"
     SUBMITTED = "submitted"
@@ -18,22 +43,117 @@ class Job(Base):
     title = Column(String, index=True)
     company = Column(String, index=True)
     description = Column(Text)
+    # Boilerplate-free form sent to the LLM, computed once when the job is stored
+    description_condensed = Column(Text, nullable=True)
+    condensed_tokens_saved = Column(Integer, nullable=True)
     url = Column(String, unique=True, index=True)
     source = Column(String) # e.g., "linkedin", "indeed"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    scraped_at = Column(DateTime, default=utcnow) # Naive UTC; drives the re-scrape freshness TTL
+    # Hash of the posting's search result card (title, company, location, listed date), set
+    # by discovery; a different hash on a later pass means the posting was edited or reposted
+    content_hash = Column(String(64), nullable=True)
     
     applications = relationship("Application", back_populates="job")
 
+    __table_args__ = (
+        # Filtered listings walk these newest-first (keyset on id)
+        Index("ix_jobs_source_id", "source", "id"),
+        Index("ix_jobs_company_source_id", "company", "source", "id"),
+    )
+
+# Full-text search over title + description (queries live in services/job_search.py).
+# Postgres: GIN index on this exact expression, which queries must repeat verbatim.
+JOB_SEARCH_VECTOR = "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+# SQLite: external-content FTS5 table kept in step with jobs by triggers.
+JOB_SEARCH_DDL = {
+    "postgresql": [
+        f"CREATE INDEX IF NOT EXISTS ix_jobs_search ON jobs USING GIN ({JOB_SEARCH_VECTOR})",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+        "title, description, content='jobs', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+        "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+        "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE OF title, description ON jobs BEGIN "
+        "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+def create_job_search(connection):
+    """
+    Creates the full-text search objects for `jobs` if missing (idempotent).
+
+    Runs automatically when create_all creates the table; call it directly for
+    databases whose jobs table predates search. An FTS5 table created over
+    existing rows is backfilled.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'")).first()
+    for statement in JOB_SEARCH_DDL.get(dialect, []):
+        connection.execute(text(statement))
+    if dialect == "sqlite" and not exists:
+        connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+    # Indexes added to an existing table aren't created by create_all
+    for index in Job.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+@event.listens_for(Job.__table__, "after_create")
+def _create_job_search(target, connection, **kw):
+    create_job_search(connection)
+
+@event.listens_for(Job.__table__, "before_drop")
+def _drop_job_search(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS jobs_fts"))
+
 class Resume(Base):
     __tablename__ = "resumes"
 
     id = Column(Integer, primary_key=True, index=True)
-    content = Column(Text) # Markdown or JSON representation of the resume
+    # Markdown or JSON representation of the resume, read through `content`.
+    # Base resumes are stored as plain text; tailored variants as `compressed`
+    # against their parent (see compress_content).
+    _content = Column("content", Text, nullable=True)
+    compressed = Column(LargeBinary, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True) # sha256 of the full content, for dedup
+    parent_id = Column(Integer, ForeignKey("resumes.id"), nullable=True, index=True) # The base it was tailored from
     base_resume = Column(Boolean, default=False) # Is this a master resume?
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
+
+    # Joined into every resume query (one level), since variants are decoded against it
+    parent = relationship("Resume", remote_side=[id], lazy="joined", join_depth=1)
     applications = relationship("Application", back_populates="resume")
 
+    @property
+    def content(self) -> Optional[str]:
+        if self.compressed is None:
+            return self._content
+        decoded = self.__dict__.get("_decoded")
+        if decoded is None:
+            base = self.parent.content if self.parent_id is not None else None
+            decoded = self.__dict__["_decoded"] = decompress_content(self.compressed, base)
+        return decoded
+
+    @content.setter
+    def content(self, value: Optional[str]):
+        self._content = value
+        self.compressed = None
+        self.content_hash = content_hash(value) if value is not None else None
+        self.__dict__.pop("_decoded", None)
+
+    def compress_against(self, parent: "Resume"):
+        """Stores this resume as a delta against `parent`, which becomes its parent."""
+        content = self.content
+        self.parent = parent
+        self.compressed = compress_content(content, parent.content)
+        self._content = None
+        self.__dict__["_decoded"] = content
+
 class Application(Base):
     __tablename__ = "applications"
 
@@ -46,3 +166,117 @@ class Application(Base):
 
     job = relationship("Job", back_populates="applications")
     resume = relationship("Resume", back_populates="applications")
+
+    __table_args__ = (
+        # Dashboard listings: newest first within a status (id breaks created_at ties)
+        Index("ix_applications_status_created_at", "status", "created_at", "id"),
+        Index("ix_applications_created_at", "created_at", "id"),
+        # Applications for a job; foreign keys aren't indexed automatically
+        Index("ix_applications_job_id", "job_id"),
+    )
+
+class TaskStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead" # Gave up after max_attempts; kept for inspection
+
+class Task(Base):
+    __tablename__ = "tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False) # e.g., "submit_application", "scrape_job"
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default=TaskStatus.QUEUED)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    # Naive UTC timestamps so lease comparisons behave the same on SQLite and Postgres
+    run_at = Column(DateTime, nullable=False) # Not claimable before this time (retry backoff)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True) # Lease expiry; expired leases can be reclaimed
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_tasks_status_run_at", "status", "run_at"),
+    )
+
+class PipelineItemStatus(str, enum.Enum):
+    PENDING = "pending" # Still has stages to run
+    DONE = "done"
+    FAILED = "failed"
+
+class PipelineRun(Base):
+    __tablename__ = "pipeline_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    base_resume = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    items = relationship("PipelineItem", back_populates="run", order_by="PipelineItem.id")
+
+class PipelineItem(Base):
+    """One URL's progress through scrape → tailor → submit; the ids are the checkpoints."""
+    __tablename__ = "pipeline_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    run_id = Column(Integer, ForeignKey("pipeline_runs.id"), nullable=False)
+    url = Column(String, nullable=False) # Normalized
+    status = Column(String, nullable=False, default=PipelineItemStatus.PENDING)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True) # Set once scraped
+    resume_id = Column(Integer, ForeignKey("resumes.id"), nullable=True) # Set once tailored
+    application_id = Column(Integer, ForeignKey("applications.id"), nullable=True) # Set before submitting
+    failed_stage = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    run = relationship("PipelineRun", back_populates="items")
+
+    __table_args__ = (
+        Index("ix_pipeline_items_run_id_url", "run_id", "url", unique=True),
+        Index("ix_pipeline_items_run_id_status", "run_id", "status"),
+    )
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True) # sha256 of model, temperature, prompt and inputs
+    namespace = Column(String, index=True) # e.g., "tailor_resume"
+    model = Column(String)
+    value = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    expires_at = Column(DateTime, nullable=True)
+
+class SavedSearch(Base):
+    """A job search results URL that discovery pages through on a schedule."""
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=True)
+    url = Column(String, unique=True, nullable=False)
+    # Normalized URL of the newest posting seen by the last pass; the next pass stops there
+    cursor = Column(String, nullable=True)
+    interval_seconds = Column(Integer, nullable=False, default=3600)
+    max_pages = Column(Integer, nullable=False, default=10)
+    next_run_at = Column(DateTime, nullable=False, default=utcnow) # Naive UTC
+    last_run_at = Column(DateTime, nullable=True)
+    last_result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_saved_searches_next_run_at", "next_run_at"),
+    )
+
+class FormPlan(Base):
+    """A recorded walk through an Easy Apply form, replayed for later forms with the same fingerprint."""
+    __tablename__ = "form_plans"
+
+    fingerprint = Column(String(64), primary_key=True) # sha256 of the step count and each step's field labels and types
+    first_step = Column(String(64), nullable=False, index=True) # Fingerprint of step 1, which new forms are looked up by
+    step_count = Column(Integer, nullable=False)
+    steps = Column(JSON, nullable=False) # Per step: fingerprint, [{label, kind, answer}], advance button label
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    last_used_at = Column(DateTime, nullable=True)
@@ -0,0 +1,80 @@
+"""
+Runs the scrape → tailor → submit pipeline over a list of job URLs.
+
+    python -m app.pipeline --resume resume.md https://www.linkedin.com/jobs/view/123/ ...
+    python -m app.pipeline --resume resume.md --urls-file urls.txt --tailor-workers 8
+    python -m app.pipeline --run-id 7 --retry-failed
+
+Progress is checkpointed per job, so an interrupted run continues where it
+stopped with `--run-id`. Prints per-stage throughput when done.
+"""
+from pathlib import Path
+from .database import async_engine, init_db
+from .services.browser import get_browser_pool
+from .services.pipeline import Pipeline, create_run
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+
+def print_report(report: dict):
+    print(f"run {report['run_id']}: {report['done']} submitted, {report['failed']} failed in {report['duration_s']:.1f}s")
+    print(f"{'stage':8} {'workers':>7} {'done':>6} {'failed':>6} {'jobs/s':>8} {'busy':>6}")
+    for name, stage in report["stages"].items():
+        print(
+            f"{name:8} {stage['workers']:>7} {stage['completed']:>6} {stage['failed']:>6} "
+            f"{stage['items_per_second']:>8.2f} {stage['utilization']:>6.0%}"
+        )
+
+
+async def run(args) -> dict:
+    try:
+        run_id = args.run_id
+        if run_id is None:
+            urls = list(args.urls)
+            if args.urls_file:
+                urls += [line.strip() for line in Path(args.urls_file).read_text().splitlines() if line.strip()]
+            run_id = await create_run(urls, Path(args.resume).read_text())
+            print(f"Created run {run_id} (continue it with --run-id {run_id})", file=sys.stderr)
+        pipeline = Pipeline(
+            scrape_workers=args.scrape_workers,
+            tailor_workers=args.tailor_workers,
+            submit_workers=args.submit_workers,
+            queue_size=args.queue_size,
+        )
+        report = await pipeline.run(run_id, retry_failed=args.retry_failed)
+        return report.to_dict()
+    finally:
+        await get_browser_pool().stop()
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("urls", nargs="*", help="Job URLs for a new run")
+    parser.add_argument("--urls-file", help="File with one job URL per line")
+    parser.add_argument("--resume", help="Base resume to tailor (required for a new run)")
+    parser.add_argument("--run-id", type=int, help="Continue an existing run instead of creating one")
+    parser.add_argument("--retry-failed", action="store_true", help="Also retry items that failed, from their failed stage")
+    parser.add_argument("--scrape-workers", type=int, default=None)
+    parser.add_argument("--tailor-workers", type=int, default=None)
+    parser.add_argument("--submit-workers", type=int, default=None)
+    parser.add_argument("--queue-size", type=int, default=None, help="Bound of the queue in front of each stage")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+    if args.run_id is None and (not args.resume or not (args.urls or args.urls_file)):
+        parser.error("a new run needs --resume and at least one URL")
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
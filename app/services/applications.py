@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from ..models import Application, ApplicationStatus, Resume
+from .job_search import MAX_PAGE_SIZE, InvalidQuery, decode_cursor, encode_cursor
+
+STATUSES = tuple(status.value for status in ApplicationStatus)
+
+
+@dataclass
+class ApplicationPage:
+    items: List[Application]
+    next_cursor: Optional[str] = None
+
+
+def with_job_and_resume(stmt, resume_content: bool = False):
+    """
+    Loads each application's job and resume with the rows, never lazily.
+
+    The job (many-to-one, small) is joined into the same query. Resumes are
+    fetched in one extra IN query, each distinct resume once. Their content
+    is only loaded when asked for, because it is the bulk of the row.
+    """
+    resume = selectinload(Application.resume)
+    if not resume_content:
+        resume = resume.options(load_only(Resume.id, Resume.base_resume, Resume.created_at), raiseload(Resume.parent))
+    return stmt.options(joinedload(Application.job), resume)
+
+
+async def list_applications(
+    db: AsyncSession,
+    status: Optional[str] = None,
+    job_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> ApplicationPage:
+    """
+    Lists applications newest first with their job and resume, one keyset page at a time.
+
+    A page costs the same two queries however many rows it holds or how deep
+    it is. `next_cursor` resumes right after the last item.
+    """
+    if status is not None and status not in STATUSES:
+        raise InvalidQuery(f"status must be one of {', '.join(STATUSES)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    stmt = with_job_and_resume(select(Application))
+    if status:
+        stmt = stmt.where(Application.status == status)
+    if job_id is not None:
+        stmt = stmt.where(Application.job_id == job_id)
+    if created_after:
+        stmt = stmt.where(Application.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Application.created_at < created_before)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        # Compare against the stored timestamp itself, so the cursor never
+        # depends on how the database formats or rounds created_at
+        last_created_at = select(Application.created_at).where(Application.id == last_id).scalar_subquery()
+        stmt = stmt.where(or_(
+            Application.created_at < last_created_at,
+            and_(Application.created_at == last_created_at, Application.id < last_id),
+        ))
+    stmt = stmt.order_by(Application.created_at.desc(), Application.id.desc())
+
+    # One extra row tells us whether there is a next page
+    items = list((await db.execute(stmt.limit(limit + 1))).scalars().unique())
+    has_more = len(items) > limit
+    items = items[:limit]
+    return ApplicationPage(items=items, next_cursor=encode_cursor(items[-1].id) if has_more else None)
+
+
+async def get_application(db: AsyncSession, application_id: int) -> Optional[Application]:
+    stmt = with_job_and_resume(select(Application).where(Application.id == application_id), resume_content=True)
+    return (await db.execute(stmt)).scalars().first()
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+from ..models import Job
+from .scraper import ScraperFactory
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Browser-backed sources are bounded by the browser pool anyway; keep their
+# default lane narrow so one source can't hog every slot.
+DEFAULT_SOURCE_CONCURRENCY = {
+    "linkedin": int(os.getenv("SCRAPE_CONCURRENCY_LINKEDIN", "2")),
+}
+DEFAULT_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY_DEFAULT", "8"))
+# Request bounds: each URL gets a task, and an override opens that many lanes per source
+MAX_BATCH_URLS = int(os.getenv("SCRAPE_BATCH_MAX_URLS", "500"))
+MAX_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY_MAX", "32"))
+
+
+@dataclass
+class ScrapeResult:
+    index: int
+    url: str
+    source: str
+    job: Optional[Job] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def source_limit(source: str, override: Optional[int] = None) -> int:
+    if override:
+        return override
+    return DEFAULT_SOURCE_CONCURRENCY.get(source, DEFAULT_CONCURRENCY)
+
+
+async def scrape_batch(urls: List[str], per_source_limit: Optional[int] = None) -> AsyncIterator[ScrapeResult]:
+    """
+    Scrapes `urls` concurrently and yields one ScrapeResult per URL as soon as it finishes.
+
+    URLs are grouped by scraper source and each source gets its own concurrency
+    limit. A failing URL yields an error result and never aborts the batch.
+    """
+    async for chunk in scrape_batch_chunks(urls, per_source_limit, max_chunk=1):
+        for result in chunk:
+            yield result
+
+
+async def scrape_batch_chunks(
+    urls: List[str],
+    per_source_limit: Optional[int] = None,
+    max_chunk: int = 100,
+    indexes: Optional[List[int]] = None,
+) -> AsyncIterator[List[ScrapeResult]]:
+    """
+    Like scrape_batch, but yields every result that is already finished (up to
+    `max_chunk`) together, so callers can persist them in one statement without
+    delaying the first result. `indexes` overrides the index reported per URL.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+    indexes = indexes or list(range(len(urls)))
+
+    async def run(index: int, url: str):
+        source = "unknown"
+        try:
+            scraper = ScraperFactory.get_scraper(url)
+            source = scraper.source
+            semaphore = semaphores.setdefault(source, asyncio.Semaphore(source_limit(source, per_source_limit)))
+            async with semaphore:
+                job = await scraper.scrape_job(url)
+            await results.put(ScrapeResult(index=index, url=url, source=source, job=job))
+        except Exception as e:
+            logger.error(f"Batch scrape failed for {url}: {e}")
+            await results.put(ScrapeResult(index=index, url=url, source=source, error=str(e)))
+
+    tasks = [asyncio.create_task(run(index, url)) for index, url in zip(indexes, urls)]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            chunk = [await results.get()]
+            while len(chunk) < max_chunk and not results.empty():
+                chunk.append(results.get_nowait())
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        # Consumer went away (e.g. client disconnected): stop outstanding scrapes
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
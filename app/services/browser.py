@@ -0,0 +1,269 @@
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from ..metrics import REGISTRY
+from .page_profiles import PageProfile, PageTraffic
+from ..tracing import span
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+POOL_HITS = REGISTRY.counter("browser_pool_hits_total", "Leases served by an already running browser", ["pool"])
+POOL_MISSES = REGISTRY.counter("browser_pool_misses_total", "Leases that had to launch a browser first", ["pool"])
+POOL_RECYCLES = REGISTRY.counter("browser_pool_recycles_total", "Browsers closed and replaced", ["pool", "reason"])
+POOL_WAIT = REGISTRY.histogram("browser_pool_wait_seconds", "Time spent waiting for a free browser slot", ["pool"])
+POOL_IN_USE = REGISTRY.gauge("browser_pool_in_use", "Browser slots currently leased", ["pool"])
+
+
+class BrowserPoolTimeout(Exception):
+    """Raised when no browser slot frees up within the acquire timeout."""
+
+
+class _BrowserSlot:
+    def __init__(self, index: int):
+        self.index = index
+        self.browser = None
+        self.contexts = {}  # context options key -> BrowserContext
+        self.states = {}  # session context key -> fingerprint of the storage state it was created with
+        self.pages_served = 0
+        self.crashed = False
+
+    @property
+    def alive(self) -> bool:
+        return self.browser is not None and not self.crashed and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Bounded pool of warm Chromium browsers shared by scrapers and submitters.
+
+    Each slot holds one browser and leases one page at a time, so the pool size
+    is also the maximum number of concurrent browser jobs. Callers wait (up to
+    `acquire_timeout`) when every slot is busy. Browsers are recycled after
+    `max_pages_per_browser` leases or as soon as they crash.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_pages_per_browser: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+        headless: Optional[bool] = None,
+        name: str = "default",
+        launch_args: Optional[List[str]] = None,
+    ):
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.max_pages_per_browser = max_pages_per_browser or int(os.getenv("BROWSER_POOL_MAX_PAGES", "50"))
+        if acquire_timeout is None:
+            acquire_timeout = float(os.getenv("BROWSER_POOL_ACQUIRE_TIMEOUT", "120"))
+        self.acquire_timeout = acquire_timeout
+        if headless is None:
+            headless = os.getenv("BROWSER_HEADLESS", "1") != "0"
+        self.headless = headless
+        self.name = name
+        self.launch_args = launch_args or [] # Extra Chromium flags, e.g. host-resolver rules for fixture sites
+        self._playwright = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._slots = []
+        self._start_lock = asyncio.Lock()
+        self._waiting = 0
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self, warm: bool = True):
+        async with self._start_lock:
+            if self.started:
+                return
+            self._playwright = await self._start_driver()
+            self._slots = [_BrowserSlot(i) for i in range(self.size)]
+            idle = asyncio.Queue()
+            for slot in self._slots:
+                if warm:
+                    try:
+                        await self._launch(slot)
+                    except Exception as e:
+                        # Not fatal: the slot launches lazily on its first lease.
+                        logger.error(f"Failed to warm browser slot {slot.index}: {e}")
+                idle.put_nowait(slot)
+            self._idle = idle
+            logger.info(f"Browser pool '{self.name}' started with {self.size} slots")
+
+    async def stop(self):
+        async with self._start_lock:
+            if not self.started:
+                return
+            for slot in self._slots:
+                await self._close_browser(slot)
+            self._slots = []
+            self._idle = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+            logger.info(f"Browser pool '{self.name}' stopped")
+
+    @asynccontextmanager
+    async def page(self, profile: Optional[PageProfile] = None, session: Optional[str] = None, **context_options):
+        """
+        Leases a fresh page from a warm browser context.
+
+        Contexts are cached per slot and keyed on `profile` and `context_options`,
+        so callers that ask for the same options (user agent, storage state, ...)
+        reuse them. An authenticated context is keyed on its `session` (site and
+        account) instead of its `storage_state`: when the state changes after a
+        login, the old context and its cookies are closed and replaced. The
+        profile's request blocking is installed once per context, and per-page
+        request/byte counts are logged when the lease ends.
+        """
+        from playwright.async_api import Error as PlaywrightError
+
+        if not self.started:
+            await self.start(warm=False)
+
+        slot = await self._acquire()
+        page = None
+        traffic = None
+        try:
+            if slot.alive:
+                POOL_HITS.inc(pool=self.name)
+            else:
+                POOL_MISSES.inc(pool=self.name)
+                if slot.browser is not None:
+                    await self._recycle(slot, "crash")
+                await self._launch(slot)
+
+            context = await self._context(slot, profile, context_options, session)
+            page = await context.new_page()
+            if profile is not None:
+                traffic = PageTraffic(page, profile)
+            slot.pages_served += 1
+            yield page
+        except PlaywrightError:
+            if slot.browser is not None and not slot.browser.is_connected():
+                slot.crashed = True
+            raise
+        finally:
+            if traffic is not None:
+                await traffic.report(page.url)
+            if page is not None and not slot.crashed:
+                try:
+                    await page.close()
+                except Exception:
+                    slot.crashed = True
+            if slot.crashed:
+                await self._recycle(slot, "crash")
+            elif slot.pages_served >= self.max_pages_per_browser:
+                await self._recycle(slot, "max_pages")
+            self._release(slot)
+
+    def stats(self) -> dict:
+        recycles = {
+            labels[1]: value
+            for labels, value in POOL_RECYCLES.samples().items()
+            if labels[0] == self.name
+        }
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "in_use": POOL_IN_USE.value(pool=self.name),
+            "waiting": self._waiting,
+            "browsers_running": sum(1 for slot in self._slots if slot.alive),
+            "hits": POOL_HITS.value(pool=self.name),
+            "misses": POOL_MISSES.value(pool=self.name),
+            "recycles": recycles,
+            "wait_seconds_total": POOL_WAIT.sum(pool=self.name),
+            "acquires": POOL_WAIT.count(pool=self.name),
+        }
+
+    async def _start_driver(self):
+        # Imported here so the API and worker processes start without loading Playwright
+        from playwright.async_api import async_playwright
+
+        return await async_playwright().start()
+
+    async def _new_browser(self):
+        return await self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+
+    async def _acquire(self) -> _BrowserSlot:
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            slot = await asyncio.wait_for(self._idle.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolTimeout(f"No browser slot became free within {self.acquire_timeout}s")
+        finally:
+            self._waiting -= 1
+            POOL_WAIT.observe(time.perf_counter() - started, pool=self.name)
+        POOL_IN_USE.inc(pool=self.name)
+        return slot
+
+    def _release(self, slot: _BrowserSlot):
+        POOL_IN_USE.dec(pool=self.name)
+        if self._idle is not None:
+            self._idle.put_nowait(slot)
+
+    async def _launch(self, slot: _BrowserSlot):
+        with span("browser.launch", pool=self.name, slot=slot.index):
+            browser = await self._new_browser()
+
+        def on_disconnected(_):
+            if slot.browser is browser:
+                slot.crashed = True
+
+        browser.on("disconnected", on_disconnected)
+        slot.browser = browser
+        slot.contexts = {}
+        slot.states = {}
+        slot.pages_served = 0
+        slot.crashed = False
+
+    async def _context(self, slot: _BrowserSlot, profile: Optional[PageProfile], context_options: dict, session: Optional[str] = None):
+        state = None
+        if session is None:
+            key = json.dumps([profile.name if profile else None, context_options], sort_keys=True, default=str)
+        else:
+            options = {name: value for name, value in context_options.items() if name != "storage_state"}
+            key = json.dumps([profile.name if profile else None, {"session": session, **options}], sort_keys=True, default=str)
+            state = hashlib.sha256(json.dumps(context_options.get("storage_state"), sort_keys=True).encode()).hexdigest()
+        context = slot.contexts.get(key)
+        if context is not None and slot.states.get(key) != state:
+            # Logged in again: the old context still holds the stale cookies
+            del slot.contexts[key]
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Error closing a stale context on browser slot {slot.index}: {e}")
+            context = None
+        if context is None:
+            context = await slot.browser.new_context(**context_options)
+            if profile is not None:
+                await profile.install(context)
+            slot.contexts[key] = context
+            slot.states[key] = state
+        return context
+
+    async def _recycle(self, slot: _BrowserSlot, reason: str):
+        logger.info(f"Recycling browser slot {slot.index} ({reason}) after {slot.pages_served} pages")
+        POOL_RECYCLES.inc(pool=self.name, reason=reason)
+        await self._close_browser(slot)
+
+    async def _close_browser(self, slot: _BrowserSlot):
+        browser, slot.browser, slot.contexts, slot.states = slot.browser, None, {}, {}
+        slot.crashed = False
+        if browser is not None:
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser slot {slot.index}: {e}")
+
+
+browser_pool = BrowserPool()
+
+
+def get_browser_pool() -> BrowserPool:
+    return browser_pool
@@ -0,0 +1,273 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import AsyncSessionLocal
+from ..metrics import REGISTRY
+from ..models import Job, SavedSearch, utcnow
+from ..tracing import span
+from . import queue
+from .job_store import UPSERT_CHUNK_SIZE, insert_listings
+from .scrapers.linkedin_search import PAGE_SIZE, JobCard, LinkedInSearchFetcher, page_url, parse_search_page
+import hashlib
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+SEEN_ERROR_RATE = float(os.getenv("DISCOVERY_SEEN_ERROR_RATE", "0.001"))
+# The filter only misses rows written by other processes; rebuild it from `jobs` this often
+SEEN_REFRESH_SECONDS = float(os.getenv("DISCOVERY_SEEN_REFRESH_SECONDS", "3600"))
+SEEN_MIN_CAPACITY = 10000
+
+POSTINGS = REGISTRY.counter("discovery_postings_total", "Search result cards by outcome", ["outcome"])
+PAGES = REGISTRY.counter("discovery_pages_total", "Search result pages fetched")
+SEEN_CHECKS = REGISTRY.counter("discovery_seen_checks_total", "Seen-set checks by result", ["result"])
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; no false negatives, about `error_rate` false positives at capacity."""
+
+    def __init__(self, capacity: int, error_rate: float = SEEN_ERROR_RATE):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class SeenSet:
+    """
+    In-process Bloom filter of the job URLs stored in `jobs`.
+
+    Discovery checks every card against it first: a miss means the posting is
+    certainly new and needs no lookup; only hits go to the database to compare
+    content hashes. Built lazily from the table, extended as discovery inserts
+    rows, and rebuilt when stale or filled past capacity.
+    """
+
+    def __init__(self, error_rate: Optional[float] = None, refresh_seconds: Optional[float] = None):
+        self.error_rate = error_rate or SEEN_ERROR_RATE
+        self.refresh_seconds = SEEN_REFRESH_SECONDS if refresh_seconds is None else refresh_seconds
+        self.filter: Optional[BloomFilter] = None
+        self.loaded_at = 0.0
+
+    def _stale(self) -> bool:
+        return (
+            self.filter is None
+            or self.filter.count > self.filter.capacity
+            or time.monotonic() - self.loaded_at > self.refresh_seconds
+        )
+
+    async def load(self, db: AsyncSession, force: bool = False):
+        if not (force or self._stale()):
+            return
+        with span("discovery.seen.load") as current:
+            total = (await db.execute(select(func.count(Job.id)))).scalar() or 0
+            # Headroom so discoveries until the next refresh don't push the error rate up
+            seen = BloomFilter(max(SEEN_MIN_CAPACITY, total * 2), self.error_rate)
+            urls = await db.stream_scalars(select(Job.url).execution_options(yield_per=UPSERT_CHUNK_SIZE))
+            async for url in urls:
+                seen.add(url)
+            current.set(urls=seen.count, bytes=len(seen.bits))
+        self.filter, self.loaded_at = seen, time.monotonic()
+        logger.info(f"Loaded {seen.count} job URLs into the seen-set ({len(seen.bits)} bytes)")
+
+    def add(self, urls: Iterable[str]):
+        for url in urls:
+            self.filter.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.filter
+
+
+@dataclass
+class DiscoveryResult:
+    search_id: int
+    pages: int = 0
+    cards: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    db_lookups: int = 0 # Cards the seen-set couldn't rule out
+    reached_cursor: bool = False
+    duration: float = 0.0
+
+    @property
+    def enqueued(self) -> int:
+        return self.new + self.changed
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "enqueued": self.enqueued, "duration": round(self.duration, 3)}
+
+
+class DiscoveryCrawler:
+    """
+    Pages through a saved search and enqueues `scrape_job` tasks for postings that are new or changed.
+
+    Results are newest first. A pass stops at the first card of the previous
+    pass (the search's cursor), at a short or empty page, at a page with
+    nothing new or changed, or after the search's max_pages, so its cost
+    follows the number of new postings rather than the result count.
+    """
+
+    def __init__(self, fetcher=None, seen: Optional[SeenSet] = None, page_size: int = PAGE_SIZE):
+        self.fetcher = fetcher or LinkedInSearchFetcher() # Anything with `async fetch(url) -> html`
+        self.seen = seen or SeenSet()
+        self.page_size = page_size
+
+    async def run(self, search_id: int) -> DiscoveryResult:
+        result = DiscoveryResult(search_id=search_id)
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            search = await db.get(SavedSearch, search_id)
+            if search is None:
+                raise ValueError(f"Saved search {search_id} not found")
+            await self.seen.load(db)
+
+            with span("discovery.search", search_id=search_id, url=search.url) as current:
+                newest = None
+                for page in range(search.max_pages):
+                    url = page_url(search.url, page * self.page_size)
+                    with span("discovery.page", url=url, page=page) as page_span:
+                        cards = parse_search_page(await self.fetcher.fetch(url))
+                        PAGES.inc()
+                        result.pages += 1
+                        if not cards:
+                            break
+                        if newest is None:
+                            newest = cards[0].url
+
+                        urls = [card.url for card in cards]
+                        if search.cursor in urls:
+                            cards = cards[:urls.index(search.cursor)]
+                            result.reached_cursor = True
+                        found = await self._process(db, cards, result)
+                        page_span.set(cards=len(cards), enqueued=found)
+
+                    if result.reached_cursor or found == 0 or len(urls) < self.page_size:
+                        break
+
+                search.cursor = newest or search.cursor
+                search.last_run_at = utcnow()
+                result.duration = time.perf_counter() - started
+                search.last_result = result.to_dict()
+                await db.commit()
+                current.set(**{key: value for key, value in result.to_dict().items() if key != "search_id"})
+
+        logger.info(f"Discovery for search {search_id}: {result.to_dict()}")
+        return result
+
+    async def _process(self, db: AsyncSession, cards: List[JobCard], result: DiscoveryResult) -> int:
+        """Classifies one page of cards, stores and enqueues what's new or changed, and returns how many were enqueued."""
+        result.cards += len(cards)
+        cards = list({card.url: card for card in cards}.values())
+        maybe_seen = [card for card in cards if card.url in self.seen]
+        SEEN_CHECKS.inc(len(cards) - len(maybe_seen), result="absent")
+        SEEN_CHECKS.inc(len(maybe_seen), result="maybe")
+
+        stored: Dict[str, Optional[str]] = {}
+        if maybe_seen:
+            result.db_lookups += len(maybe_seen)
+            rows = await db.execute(select(Job.url, Job.content_hash).where(Job.url.in_([card.url for card in maybe_seen])))
+            stored = dict(rows.all())
+            SEEN_CHECKS.inc(len(maybe_seen) - len(stored), result="false_positive")
+
+        inserted = await insert_listings(db, [card.to_job() for card in cards if card.url not in stored])
+        self.seen.add(inserted)
+
+        changed = []
+        for card in cards:
+            if card.url not in stored:
+                continue
+            if stored[card.url] != card.content_hash:
+                # A NULL hash is a job added by hand: record its card but don't re-scrape it
+                if stored[card.url] is not None:
+                    changed.append(card.url)
+                await db.execute(update(Job).where(Job.url == card.url).values(content_hash=card.content_hash))
+        await db.commit()
+
+        # Rows another process inserted since the filter was built count as unchanged
+        new = [card.url for card in cards if card.url in inserted]
+        result.new += len(new)
+        result.changed += len(changed)
+        result.unchanged += len(cards) - len(new) - len(changed)
+        POSTINGS.inc(len(new), outcome="new")
+        POSTINGS.inc(len(changed), outcome="changed")
+        POSTINGS.inc(len(cards) - len(new) - len(changed), outcome="unchanged")
+
+        for url in new + changed:
+            await queue.enqueue(db, "scrape_job", {"url": url})
+        return len(new) + len(changed)
+
+
+async def add_search(
+    db: AsyncSession,
+    url: str,
+    name: Optional[str] = None,
+    interval_seconds: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> SavedSearch:
+    """Saves a search results URL for discovery, or returns the existing one; it's due immediately."""
+    url = page_url(url, 0)
+    search = (await db.execute(select(SavedSearch).where(SavedSearch.url == url))).scalars().first()
+    if search is None:
+        search = SavedSearch(url=url, name=name)
+        if interval_seconds:
+            search.interval_seconds = interval_seconds
+        if max_pages:
+            search.max_pages = max_pages
+        db.add(search)
+        await db.commit()
+        await db.refresh(search)
+    return search
+
+
+async def schedule_due_searches(db: AsyncSession, now: Optional[datetime] = None) -> List[int]:
+    """
+    Enqueues a `discover_search` task for every saved search that is due and returns their ids.
+
+    next_run_at is advanced with a compare-and-set, so schedulers running
+    concurrently never enqueue the same search twice.
+    """
+    now = now or utcnow()
+    due = (await db.execute(
+        select(SavedSearch.id, SavedSearch.next_run_at, SavedSearch.interval_seconds).where(SavedSearch.next_run_at <= now)
+    )).all()
+    scheduled = []
+    for search_id, next_run_at, interval in due:
+        claimed = await db.execute(
+            update(SavedSearch)
+            .where(SavedSearch.id == search_id, SavedSearch.next_run_at == next_run_at)
+            .values(next_run_at=now + timedelta(seconds=interval))
+        )
+        await db.commit()
+        if claimed.rowcount == 1:
+            await queue.enqueue(db, "discover_search", {"search_id": search_id})
+            scheduled.append(search_id)
+    return scheduled
+
+
+crawler = DiscoveryCrawler()
+
+
+def get_crawler() -> DiscoveryCrawler:
+    return crawler
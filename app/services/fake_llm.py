@@ -0,0 +1,125 @@
+from collections import deque
+from typing import Any, AsyncIterator, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+import asyncio
+import re
+import time
+
+
+class FakeRateLimitError(Exception):
+    """Mimics a provider 429 so rate-limit handling can be exercised locally."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: Optional[float] = None):
+        super().__init__("Rate limit reached (simulated)")
+        self.retry_after = retry_after
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic local chat model for tests and benchmarks.
+
+    Sleeps `latency` seconds per call, and raises FakeRateLimitError when more
+    than `rpm_limit` calls land within `window_seconds` (a simulated provider
+    limit). The reply is derived from the prompt only, so identical inputs give
+    identical outputs. `stats` reports the peak number of calls in flight at
+    once, so tests can check concurrency without timing it.
+    """
+
+    latency: float = 0.05
+    token_delay: float = 0.0 # Per streamed chunk, after the first
+    rpm_limit: Optional[int] = None
+    window_seconds: float = 60.0
+    model_name: str = "fake-chat"
+
+    _calls: int = PrivateAttr(default=0)
+    _rate_limited: int = PrivateAttr(default=0)
+    _in_flight: int = PrivateAttr(default=0)
+    _peak_in_flight: int = PrivateAttr(default=0)
+    _window: Any = PrivateAttr(default_factory=deque)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "calls": self._calls,
+            "rate_limited": self._rate_limited,
+            "peak_in_flight": self._peak_in_flight,
+            "simulated_latency": self.latency,
+        }
+
+    def _check_rate_limit(self):
+        if self.rpm_limit is None:
+            return
+        now = time.monotonic()
+        while self._window and now - self._window[0] >= self.window_seconds:
+            self._window.popleft()
+        if len(self._window) >= self.rpm_limit:
+            self._rate_limited += 1
+            raise FakeRateLimitError(retry_after=self.window_seconds - (now - self._window[0]))
+        self._window.append(now)
+
+    def _enter(self):
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def _reply(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        keywords = sorted(set(re.findall(r"[a-z][a-z+#]{3,}", prompt.lower())))[:20]
+        return f"Tailored resume\n\nKeywords: {', '.join(keywords)}\n\n{messages[-1].content}"
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        text = self._reply(messages)
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(text) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        usage_metadata = {
+            "input_tokens": usage["prompt_tokens"],
+            "output_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"],
+        }
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage_metadata))],
+            llm_output={"token_usage": usage, "model_name": self.model_name, "simulated_latency": self.latency},
+        )
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        self._check_rate_limit()
+        self._enter()
+        try:
+            time.sleep(self.latency)
+        finally:
+            self._in_flight -= 1
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._calls += 1
+        self._check_rate_limit()
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._in_flight -= 1
+        return self._result(messages)
+
+    async def _astream(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        self._calls += 1
+        self._check_rate_limit()
+        self._enter()
+        try:
+            # `latency` is the time to first token
+            await asyncio.sleep(self.latency)
+            for i, token in enumerate(re.split(r"(?<=\s)", self._reply(messages))):
+                if i and self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        finally:
+            self._in_flight -= 1
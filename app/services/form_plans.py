@@ -0,0 +1,487 @@
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+from sqlalchemy import select, update
+from ..database import AsyncSessionLocal
+from ..metrics import REGISTRY
+from ..models import FormPlan, utcnow
+from ..tracing import span
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+PLANS_ENABLED = os.getenv("FORM_PLANS_ENABLED", "1") != "0"
+STEP_TIMEOUT_SECONDS = float(os.getenv("FORM_STEP_TIMEOUT_SECONDS", "10"))
+STEP_POLL_SECONDS = 0.1
+MAX_STEPS = 12
+
+PLAN_LOOKUPS = REGISTRY.counter("form_plan_lookups_total", "Easy Apply forms by plan outcome (hit, partial, miss)", ["result"])
+STEP_SECONDS = REGISTRY.histogram("form_step_seconds", "Time to fill and advance one Easy Apply step", ["mode"])
+
+EASY_APPLY_BUTTON = "button.jobs-apply-button:visible"
+# Footer buttons, in the order LinkedIn shows them on the last steps
+ADVANCE_LABELS = ("Continue to next step", "Review your application", "Submit application")
+SKIPPED_INPUT_TYPES = {"hidden", "submit", "button", "reset", "image", "search"}
+PLACEHOLDER_OPTIONS = {"select an option"}
+TRUE_ANSWERS = {"1", "true", "yes", "on"}
+
+# The visible step's markup, with live values written back into attributes (outerHTML doesn't carry them)
+STEP_HTML_JS = """() => {
+    const modal = document.querySelector('.jobs-easy-apply-modal');
+    if (!modal) return {done: false, html: null};
+    const success = modal.querySelector('.jobs-easy-apply-success, [data-test-modal-id="post-apply-modal"]');
+    if (success && !success.hidden && success.offsetParent !== null) return {done: true, html: null};
+    const step = [...modal.querySelectorAll('.jobs-easy-apply-content')].find(element => !element.hidden && element.offsetParent !== null);
+    if (!step) return {done: false, html: null};
+    step.querySelectorAll('input, textarea').forEach(input => {
+        if (input.type === 'checkbox' || input.type === 'radio') input.toggleAttribute('checked', input.checked);
+        else if (input.type !== 'file') input.setAttribute('value', input.value);
+    });
+    step.querySelectorAll('option').forEach(option => option.toggleAttribute('selected', option.selected));
+    return {done: false, html: step.outerHTML};
+}"""
+
+# One round trip for a whole step: sets each value the way typing would (input and change events)
+FILL_JS = """(fills) => {
+    const setValue = (element, value) => {
+        const prototype = element instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+            : element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+        Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, value);
+        element.dispatchEvent(new Event('input', {bubbles: true}));
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+    };
+    const missing = [];
+    for (const {selector, kind, value} of fills) {
+        const element = document.querySelector(kind === 'radio' ? `${selector}[value="${CSS.escape(value)}"]` : selector);
+        if (!element) { missing.push(selector); continue; }
+        if (kind === 'radio') { if (!element.checked) element.click(); }
+        else if (kind === 'checkbox') { if (element.checked !== value) element.click(); }
+        else if (kind === 'select') {
+            const option = [...element.options].find(option => option.text.trim() === value);
+            if (option) setValue(element, option.value); else missing.push(selector);
+        }
+        else setValue(element, value);
+    }
+    return missing;
+}"""
+
+
+class FormFailed(Exception):
+    """The Easy Apply form couldn't be completed."""
+
+
+class FormUnanswerable(FormFailed):
+    """A required field has no configured answer."""
+
+
+def css_string(value: str) -> str:
+    """`value` as a double-quoted CSS string, for attribute selectors (what CSS.escape does in FILL_JS)."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'"{escaped}"'
+
+
+def fingerprint(value) -> str:
+    return hashlib.sha256(json.dumps(value, separators=(",", ":")).encode()).hexdigest()
+
+
+def plan_fingerprint(steps: List[dict]) -> str:
+    """The form fingerprint: step count and every step's fingerprint."""
+    return fingerprint([len(steps)] + [step["fingerprint"] for step in steps])
+
+
+@dataclass
+class FormField:
+    label: str
+    kind: str # text, email, tel, number, textarea, select, radio, checkbox or file
+    selector: str # Valid on this page only: LinkedIn field ids embed the job id
+    options: List[str] = field(default_factory=list)
+    value: str = "" # Current value; checkboxes "on" when checked
+    required: bool = False
+
+
+@dataclass
+class FormStep:
+    fields: List[FormField]
+    advance: Optional[str] # aria-label of the button that leaves the step
+    heading: str = ""
+
+    @property
+    def fingerprint(self) -> str:
+        return fingerprint([[f.label, f.kind] for f in self.fields])
+
+    @property
+    def key(self) -> tuple:
+        # Tells consecutive steps apart, including ones without fields
+        return (self.fingerprint, self.advance, self.heading)
+
+
+def _text(element) -> str:
+    return " ".join(element.text_content().split()) if element is not None else ""
+
+
+def scan_step(html: str) -> FormStep:
+    """The fields of one Easy Apply step, in page order, from its markup."""
+    import lxml.html
+
+    root = lxml.html.fragment_fromstring(html, create_parent="div")
+    labels = {label.get("for"): _text(label) for label in root.iter("label") if label.get("for")}
+    fields: List[FormField] = []
+    groups = set()
+    for element in root.iter("input", "select", "textarea"):
+        kind = (element.get("type") or "text").lower() if element.tag == "input" else element.tag
+        if kind in SKIPPED_INPUT_TYPES:
+            continue
+        required = element.get("required") is not None or element.get("aria-required") == "true"
+
+        if kind == "radio":
+            # One field per group, labelled by its fieldset's legend
+            name = element.get("name")
+            if name in groups:
+                continue
+            groups.add(name)
+            group = [radio for radio in root.iter("input") if radio.get("type") == "radio" and radio.get("name") == name]
+            fieldset = next(element.iterancestors("fieldset"), None)
+            legend = fieldset.find(".//legend") if fieldset is not None else None
+            fields.append(FormField(
+                label=_text(legend) or labels.get(element.get("id"), name),
+                kind=kind,
+                selector=f"input[name={css_string(name)}]",
+                options=[radio.get("value") for radio in group],
+                value=next((radio.get("value") for radio in group if radio.get("checked") is not None), ""),
+                required=any(radio.get("required") is not None for radio in group),
+            ))
+            continue
+
+        element_id = element.get("id")
+        label = labels.get(element_id) or element.get("aria-label") or element.get("name") or ""
+        selector = f"[id={css_string(element_id)}]" if element_id else f"[name={css_string(element.get('name') or '')}]"
+        options: List[str] = []
+        if kind == "select":
+            options = [_text(option) for option in element.iter("option") if _text(option).lower() not in PLACEHOLDER_OPTIONS]
+            selected = next((option for option in element.iter("option") if option.get("selected") is not None), None)
+            value = _text(selected) if selected is not None and _text(selected).lower() not in PLACEHOLDER_OPTIONS else ""
+        elif kind == "checkbox":
+            value = "on" if element.get("checked") is not None else ""
+        elif kind == "textarea":
+            value = element.text or ""
+        else:
+            value = element.get("value") or ""
+        fields.append(FormField(label, kind, selector, options, value, required))
+
+    advance = next((button.get("aria-label") for button in root.iter("button") if button.get("aria-label") in ADVANCE_LABELS), None)
+    return FormStep(fields, advance, _text(next(root.iter("h3"), None)))
+
+
+def load_answers(path: Optional[str] = None) -> Dict[str, str]:
+    """Applicant answers from the JSON file at FORM_ANSWERS_PATH: label phrase -> answer."""
+    path = path or os.getenv("FORM_ANSWERS_PATH")
+    if not path:
+        return {}
+    with open(path) as f:
+        return {phrase.lower(): str(answer) for phrase, answer in json.load(f).items()}
+
+
+def answer_key(form_field: FormField, answers: Dict[str, str]) -> Optional[str]:
+    """The longest answer phrase contained in the field's label."""
+    label = form_field.label.lower()
+    matches = [phrase for phrase in answers if phrase in label]
+    return max(matches, key=len) if matches else None
+
+
+def is_resume_upload(form_field: FormField) -> bool:
+    """LinkedIn's resume input (jobs-document-upload-file-input-upload-resume-<job id>)."""
+    return form_field.kind == "file" and ("upload-resume" in form_field.selector or "resume" in form_field.label.lower())
+
+
+def resolve(form_field: FormField, key: Optional[str], answers: Dict[str, str]):
+    """The value to fill in, or None to keep the field as the page has it."""
+    if key is None or key not in answers:
+        if form_field.required and not form_field.value:
+            raise FormUnanswerable(f"No answer for required field {form_field.label!r}")
+        return None
+    answer = answers[key]
+    if form_field.kind == "checkbox":
+        return answer.lower() in TRUE_ANSWERS
+    if form_field.kind in ("select", "radio"):
+        option = next((option for option in form_field.options if option.lower() == answer.lower()), None)
+        if option is None:
+            raise FormUnanswerable(f"Answer {answer!r} isn't an option for {form_field.label!r}")
+        return option
+    return answer
+
+
+@dataclass
+class StepRun:
+    index: int
+    mode: str # replay or explore
+    fingerprint: str
+    seconds: float = 0.0
+    fields: int = 0
+
+
+@dataclass
+class FormRun:
+    result: str = "miss" # hit: every step replayed; partial: some explored; miss: no plan
+    plan: Optional[str] = None # Fingerprint of the plan recorded or replayed
+    steps: List[StepRun] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {"result": self.result, "plan": self.plan, "steps": [asdict(step) for step in self.steps]}
+
+
+class FormPlanStore:
+    """
+    Form plans in memory, backed by the `form_plans` table.
+
+    Plans are grouped by the fingerprint of their first step, the only part
+    of a form known before walking it. Like the LLM cache, the table is an
+    optimization: lookups and writes that fail are logged, never raised.
+    """
+
+    def __init__(self, persistent: bool = True, session_factory=AsyncSessionLocal):
+        self.persistent = persistent
+        self.session_factory = session_factory
+        self._memory: Dict[str, Dict[str, dict]] = {} # first step -> plan fingerprint -> plan
+
+    async def candidates(self, first_step: str) -> List[dict]:
+        """Plans starting with this step, most replayed first."""
+        plans = self._memory.get(first_step)
+        if plans is None:
+            plans = await self._db_get(first_step)
+            self._memory[first_step] = plans
+        return sorted(plans.values(), key=lambda plan: -plan["hits"])
+
+    async def record(self, steps: List[dict]) -> str:
+        key = plan_fingerprint(steps)
+        first_step = steps[0]["fingerprint"]
+        self._memory.setdefault(first_step, {})[key] = {"fingerprint": key, "steps": steps, "hits": 0}
+        if self.persistent:
+            try:
+                async with self.session_factory() as db:
+                    await db.merge(FormPlan(
+                        fingerprint=key,
+                        first_step=first_step,
+                        step_count=len(steps),
+                        steps=steps,
+                        hits=0,
+                        created_at=utcnow(),
+                    ))
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Saving form plan failed: {e}")
+        return key
+
+    async def hit(self, plan: dict):
+        plan["hits"] += 1
+        if self.persistent:
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(FormPlan)
+                        .where(FormPlan.fingerprint == plan["fingerprint"])
+                        .values(hits=FormPlan.hits + 1, last_used_at=utcnow())
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Updating form plan failed: {e}")
+
+    def clear(self):
+        self._memory.clear()
+
+    async def _db_get(self, first_step: str) -> Dict[str, dict]:
+        if not self.persistent:
+            return {}
+        try:
+            async with self.session_factory() as db:
+                rows = (await db.execute(select(FormPlan).where(FormPlan.first_step == first_step))).scalars()
+                return {row.fingerprint: {"fingerprint": row.fingerprint, "steps": row.steps, "hits": row.hits} for row in rows}
+        except Exception as e:
+            logger.warning(f"Form plan lookup failed: {e}")
+            return {}
+
+
+class EasyApplyForm:
+    """
+    Completes LinkedIn's Easy Apply form on an open job page.
+
+    Every step is read once (its markup, parsed here) and fingerprinted by its
+    field labels and types. With no plan, a step is explored: each label is
+    matched against the applicant's answers and its field filled on its own.
+    After a successful submission the walk is recorded as a plan. Later forms
+    whose steps have the same fingerprints replay it: one batched fill per
+    step, no label matching. A step that doesn't match (or that the page
+    refuses to leave after a replay) is explored instead, and the corrected
+    walk is recorded as a new plan. The resume input always gets the resume
+    passed to complete(), whichever way its step is filled.
+    """
+
+    def __init__(
+        self,
+        store: Optional[FormPlanStore] = None,
+        answers: Optional[Dict[str, str]] = None,
+        step_timeout: Optional[float] = None,
+        use_plans: Optional[bool] = None,
+    ):
+        self.store = store or FormPlanStore()
+        self._answers = None if answers is None else {phrase.lower(): answer for phrase, answer in answers.items()}
+        self.step_timeout = step_timeout or STEP_TIMEOUT_SECONDS
+        self.use_plans = PLANS_ENABLED if use_plans is None else use_plans
+
+    @property
+    def answers(self) -> Dict[str, str]:
+        if self._answers is None:
+            self._answers = load_answers()
+        return self._answers
+
+    async def complete(self, page, resume_path: Optional[str] = None) -> FormRun:
+        """
+        Opens Easy Apply, walks every step and submits. Raises FormFailed when that isn't possible.
+
+        `resume_path` is uploaded to the form's resume input, replayed or not,
+        instead of the resume LinkedIn has on file.
+        """
+        if await page.query_selector(EASY_APPLY_BUTTON) is None:
+            raise FormFailed("Easy Apply isn't available for this job")
+        await page.click(EASY_APPLY_BUTTON)
+
+        run = FormRun()
+        with span("form.complete") as form_span:
+            walked: List[dict] = []
+            plans: Optional[List[dict]] = None
+            retried = False
+            step = await self._next_step(page, None)
+            while step is not None:
+                index = len(walked)
+                if index >= MAX_STEPS:
+                    raise FormFailed(f"Easy Apply form has more than {MAX_STEPS} steps")
+                if plans is None:
+                    plans = await self.store.candidates(step.fingerprint) if self.use_plans else []
+                # Replay the most used plan with a matching step here, preferring plans that matched every step so far
+                matching = [plan for plan in plans if len(plan["steps"]) > index and plan["steps"][index]["fingerprint"] == step.fingerprint]
+                matching.sort(key=lambda plan: [done["fingerprint"] for done in plan["steps"][:index]] != [done["fingerprint"] for done in walked])
+                plan = matching[0] if matching and not retried else None
+
+                started = time.perf_counter()
+                with span("form.step", index=index) as step_span:
+                    recorded = await self._replay(page, step, plan["steps"][index], resume_path) if plan else None
+                    mode = "explore" if recorded is None else "replay"
+                    if recorded is None:
+                        recorded = await self._explore(page, step, resume_path)
+                    step_span.set(mode=mode, fields=len(step.fields))
+                    if not step.advance:
+                        raise FormFailed(f"No button to leave step {index + 1} ({step.heading!r})")
+                    await page.click(f'button[aria-label="{step.advance}"]:visible')
+                    following = await self._next_step(page, step)
+                elapsed = time.perf_counter() - started
+                STEP_SECONDS.observe(elapsed, mode=mode)
+                run.steps.append(StepRun(index, mode, step.fingerprint, round(elapsed, 4), len(step.fields)))
+
+                if following is not None and following.key == step.key:
+                    # The page kept us on this step: a replayed answer no longer fits, so explore it once
+                    if mode == "explore":
+                        raise FormFailed(f"Step {index + 1} ({step.heading!r}) didn't accept its answers")
+                    retried, step = True, following
+                    continue
+                retried = False
+                walked.append(recorded)
+                step = following
+
+            plans = plans or []
+            replayed = all(step_run.mode == "replay" for step_run in run.steps)
+            known = next((plan for plan in plans if plan["fingerprint"] == plan_fingerprint(walked)), None)
+            if not plans:
+                run.result = "miss"
+            elif replayed and known is not None:
+                run.result, run.plan = "hit", known["fingerprint"]
+                await self.store.hit(known)
+            else:
+                run.result = "partial"
+            if run.result != "hit" and self.use_plans and walked:
+                run.plan = await self.store.record(walked)
+            PLAN_LOOKUPS.inc(result=run.result)
+            form_span.set(result=run.result, steps=len(run.steps))
+        logger.info(f"Easy Apply submitted in {len(walked)} steps (plan {run.result})")
+        return run
+
+    async def _next_step(self, page, previous: Optional[FormStep]) -> Optional[FormStep]:
+        """The step now showing, once it differs from `previous`; None when the application was sent."""
+        deadline = time.monotonic() + self.step_timeout
+        while True:
+            state = await page.evaluate(STEP_HTML_JS)
+            if state["done"]:
+                return None
+            step = scan_step(state["html"]) if state["html"] else None
+            if step is not None and (previous is None or step.key != previous.key):
+                return step
+            if time.monotonic() > deadline:
+                if step is None:
+                    raise FormFailed("Easy Apply form didn't show a step")
+                return step # Still `previous`; the caller decides
+            await asyncio.sleep(STEP_POLL_SECONDS)
+
+    def _value(self, form_field: FormField, key: Optional[str], resume_path: Optional[str]):
+        if is_resume_upload(form_field):
+            if resume_path is None and form_field.required:
+                raise FormUnanswerable(f"No resume to upload for required field {form_field.label!r}")
+            return resume_path
+        return resolve(form_field, key, self.answers)
+
+    async def _upload(self, page, form_field: FormField, path: str):
+        # Submitting without the intended file would send the wrong resume or none at all
+        try:
+            await page.set_input_files(form_field.selector, path)
+        except Exception as e:
+            raise FormFailed(f"Couldn't upload {path} to {form_field.label!r}: {e}")
+
+    async def _replay(self, page, step: FormStep, planned: dict, resume_path: Optional[str] = None) -> Optional[dict]:
+        """Fills the step from its plan in one round trip; None if the plan doesn't fit the page."""
+        fills, files = [], []
+        for form_field, planned_field in zip(step.fields, planned["fields"]):
+            value = self._value(form_field, planned_field["answer"], resume_path)
+            if value is None:
+                continue
+            if form_field.kind == "file":
+                files.append((form_field, value))
+            else:
+                fills.append({"selector": form_field.selector, "kind": form_field.kind, "value": value})
+        if fills and await page.evaluate(FILL_JS, fills):
+            return None
+        for form_field, path in files:
+            await self._upload(page, form_field, path)
+        return planned
+
+    async def _explore(self, page, step: FormStep, resume_path: Optional[str] = None) -> dict:
+        recorded = []
+        for form_field in step.fields:
+            key = answer_key(form_field, self.answers)
+            value = self._value(form_field, key, resume_path)
+            recorded.append({"label": form_field.label, "kind": form_field.kind, "answer": key})
+            if value is None:
+                continue
+            if form_field.kind == "select":
+                await page.select_option(form_field.selector, label=value)
+            elif form_field.kind == "radio":
+                await page.check(f"{form_field.selector}[value={css_string(value)}]")
+            elif form_field.kind == "checkbox":
+                await (page.check if value else page.uncheck)(form_field.selector)
+            elif form_field.kind == "file":
+                await self._upload(page, form_field, value)
+            else:
+                await page.fill(form_field.selector, value)
+        return {"fingerprint": step.fingerprint, "fields": recorded, "advance": step.advance}
+
+    def stats(self) -> dict:
+        counts = {result: PLAN_LOOKUPS.value(result=result) for result in ("hit", "partial", "miss")}
+        total = sum(counts.values())
+        return {**counts, "hit_rate": round(counts["hit"] / total, 4) if total else 0.0}
+
+
+easy_apply_form = EasyApplyForm()
+
+
+def get_easy_apply_form() -> EasyApplyForm:
+    return easy_apply_form
@@ -0,0 +1,250 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from ..metrics import REGISTRY
+import asyncio
+import hashlib
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Prompt token budget for a condensed job description
+TOKEN_BUDGET = int(os.getenv("JD_TOKEN_BUDGET", "350"))
+TOKENIZER_ENCODING = os.getenv("JD_TOKENIZER_ENCODING", "cl100k_base")
+# Local copy of the encoding's .tiktoken file (e.g. data/tiktoken/cl100k_base.tiktoken)
+TOKENIZER_FILE = os.getenv("JD_TOKENIZER_FILE")
+# What tiktoken builds around each encoding's ranks (tiktoken_ext.openai_public)
+ENCODINGS = {
+    "cl100k_base": {
+        "pat_str": r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""",
+        "special_tokens": {
+            "<|endoftext|>": 100257, "<|fim_prefix|>": 100258, "<|fim_middle|>": 100259,
+            "<|fim_suffix|>": 100260, "<|endofprompt|>": 100276,
+        },
+    },
+    "o200k_base": {
+        "pat_str": "|".join([
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""\p{N}{1,3}""",
+            r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+            r"""\s*[\r\n]+""",
+            r"""\s+(?!\S)""",
+            r"""\s+""",
+        ]),
+        "special_tokens": {"<|endoftext|>": 199999, "<|endofprompt|>": 200018},
+    },
+}
+
+TOKENS_SAVED = REGISTRY.counter("jd_tokens_saved_total", "Prompt tokens removed from job descriptions before tailoring", ["model"])
+
+# Sections worth tailoring against; checked before BOILERPLATE_HEADING so "About the role" is kept.
+# Requirements come first when the budget is tight, then the role itself.
+REQUIRE_HEADING = re.compile(
+    r"^(about you|what you('ll| will) bring|what we('re| are) looking for|who you are|requirements|minimum requirements"
+    r"|qualifications|(basic|minimum|preferred|required) qualifications|skills|(required|preferred) skills"
+    r"|must[- ]haves?|nice[- ]to[- ]haves?|bonus points|experience|tech stack)\b",
+    re.IGNORECASE,
+)
+KEEP_HEADING = re.compile(
+    r"^(about the (role|job|position|team)|the role|your role|role overview|responsibilities|key responsibilities"
+    r"|duties|what you('ll| will) (do|own|work on))\b",
+    re.IGNORECASE,
+)
+BOILERPLATE_HEADING = re.compile(
+    r"^(about (us|[\w&.,' -]{1,40})|who we are|our (company|mission|story|values|culture|team)|company overview"
+    r"|benefits|perks|what we offer|why (join|work)|compensation|salary|pay range|equal (employment )?opportunity"
+    r"|eeo|diversity|inclusion|accommodations?|privacy|how to apply|life at)\b",
+    re.IGNORECASE,
+)
+# Sentences dropped wherever they appear (EEO statements, legal notices, application mechanics)
+BOILERPLATE_SENTENCE = re.compile(
+    r"equal (employment )?opportunity|without regard to|race, colou?r|sexual orientation|gender identity"
+    r"|protected veteran|veteran status|reasonable accommodation|e-verify|background check|privacy (policy|notice)"
+    r"|applicants with (a )?disabilit|fair chance|click apply|apply now|we look forward to (hearing|receiving)"
+    r"|recruitment agencies|unsolicited resumes",
+    re.IGNORECASE,
+)
+BULLET = re.compile(r"^\s*(?:[-*•·▪◦●–]|\d{1,2}[.)])\s+")
+INLINE_BULLET = re.compile(r"\s*[•·▪●]\s*")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+
+
+@dataclass
+class CondensedDescription:
+    text: str
+    original_tokens: int
+    tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.original_tokens - self.tokens)
+
+
+class _Tokenizer:
+    """
+    Counts tokens with the provider's BPE encoding, read by tiktoken from the
+    local `.tiktoken` file at `path` (JD_TOKENIZER_FILE), or else with a regex
+    approximation (one token per short word or punctuation mark). The encoding
+    is never downloaded: that would block the event loop on the network.
+    """
+
+    WORD = re.compile(r"\w+|[^\w\s]")
+
+    def __init__(self, encoding: str = TOKENIZER_ENCODING, path: Optional[str] = TOKENIZER_FILE):
+        self.encoding_name = encoding
+        self.path = path
+        self._encoding = None
+        self._loaded = False
+
+    @property
+    def name(self) -> str:
+        return f"tiktoken:{self.encoding_name}" if self.load() else "regex"
+
+    def load(self):
+        """Loads the encoding once and logs which tokenizer is in use; blocking file IO, so preload() it off the event loop."""
+        if not self._loaded:
+            self._loaded = True
+            if self.path is None:
+                logger.warning("JD_TOKENIZER_FILE is not set, approximating job description token counts")
+                return None
+            try:
+                self._encoding = self._read()
+                logger.info(f"Counting job description tokens with tiktoken {self.encoding_name} from {self.path}")
+            except Exception as e:
+                logger.warning(f"Can't load tiktoken {self.encoding_name} from {self.path}, approximating token counts: {e}")
+        return self._encoding
+
+    def _read(self):
+        import tiktoken
+        from tiktoken.load import load_tiktoken_bpe
+
+        if self.encoding_name not in ENCODINGS:
+            raise ValueError(f"unknown encoding (known: {', '.join(ENCODINGS)})")
+        with open(self.path, "rb") as f:
+            # tiktoken keeps its own copy of the file; the hash keeps a stale copy from shadowing a replaced file
+            digest = hashlib.sha256(f.read()).hexdigest()
+        return tiktoken.Encoding(
+            name=self.encoding_name,
+            mergeable_ranks=load_tiktoken_bpe(self.path, expected_hash=digest),
+            **ENCODINGS[self.encoding_name],
+        )
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.load()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        # Long words split into several BPE tokens
+        return sum(1 + len(word) // 8 for word in self.WORD.findall(text))
+
+
+tokenizer = _Tokenizer()
+
+
+def count_tokens(text: str) -> int:
+    return tokenizer.count(text)
+
+
+async def preload_tokenizer():
+    """Reads the encoding file in a thread, so the first condensed description doesn't."""
+    await asyncio.to_thread(tokenizer.load)
+
+
+def _heading(line: str) -> Optional[str]:
+    """Returns "require", "keep", "boilerplate" or "other" for a heading line, None for content."""
+    text = line.strip().rstrip(":").strip()
+    if not text or len(text) > 60 or len(text.split()) > 7 or text[-1] in ".!?,;":
+        return None
+    if REQUIRE_HEADING.match(text):
+        return "require"
+    if KEEP_HEADING.match(text):
+        return "keep"
+    if BOILERPLATE_HEADING.match(text):
+        return "boilerplate"
+    return "other" if line.rstrip().endswith(":") else None
+
+
+def _dedupe_key(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def _split(description: str) -> List[Tuple[Optional[str], str, str, bool]]:
+    """Splits a description into (heading, kind, item, bullet) tuples, dropping boilerplate sections."""
+    items = []
+    heading, kind = None, "other"
+    for raw in description.replace("\r", "").split("\n"):
+        # "• a • b" on one line is a list too
+        parts = INLINE_BULLET.split(raw)
+        lines = [raw] if len(parts) == 1 else [f"- {part}" for part in parts if part.strip()]
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            section = None if BULLET.match(line) else _heading(line)
+            if section is not None:
+                heading, kind = line.rstrip(":").strip(), section
+                continue
+            if kind == "boilerplate":
+                continue
+            bullet = BULLET.sub("", line)
+            # Bullets in a kept section are items as is, prose is split into sentences
+            listed = kind in ("require", "keep") and bullet != line
+            parts = [bullet] if listed else SENTENCE_END.split(bullet)
+            items.extend((heading, kind, part.strip(), listed) for part in parts if part.strip())
+    return items
+
+
+def _render(selected: List[Tuple[Optional[str], str, str, bool]]) -> str:
+    lines, current = [], object()
+    for heading, kind, item, listed in selected:
+        if heading != current:
+            current = heading
+            if heading:
+                lines.append(f"{heading}:")
+        lines.append(f"- {item}" if heading else item)
+    return "\n".join(lines)
+
+
+def condense_description(description: str, budget: Optional[int] = None) -> CondensedDescription:
+    """
+    Reduces a job description to what a tailoring prompt needs.
+
+    Boilerplate sections (about us, benefits, EEO) and legal sentences are
+    dropped and repeated paragraphs or bullets kept once. Requirement bullets
+    are taken first, then responsibility bullets, then the prose of those
+    sections, then the remaining text, each in the original order, until
+    `budget` tokens (JD_TOKEN_BUDGET) are used. Descriptions without line breaks are condensed
+    sentence by sentence.
+    """
+    budget = TOKEN_BUDGET if budget is None else budget
+    original_tokens = count_tokens(description or "")
+    seen, items = set(), []
+    for heading, kind, item, listed in _split(description or ""):
+        key = _dedupe_key(item)
+        if not key or key in seen or BOILERPLATE_SENTENCE.search(item):
+            continue
+        seen.add(key)
+        items.append((heading, kind, item, listed))
+
+    chosen, used, headings = set(), 0, set()
+    for priority in (("require", True), ("keep", True), ("require", False), ("keep", False), ("other", False)):
+        for index, (heading, kind, item, listed) in enumerate(items):
+            if (kind, listed) != priority:
+                continue
+            # "- " prefix and newline, plus the heading line the first time a section is used
+            cost = count_tokens(item) + 2 + (count_tokens(heading) + 2 if heading and heading not in headings else 0)
+            if used + cost > budget:
+                continue
+            chosen.add(index)
+            headings.add(heading)
+            used += cost
+
+    text = _render([item for index, item in enumerate(items) if index in chosen])
+    tokens = count_tokens(text)
+    if not text or tokens >= original_tokens:
+        # Nothing recognizable survived, or the description was already short
+        return CondensedDescription(text=description or "", original_tokens=original_tokens, tokens=original_tokens)
+    return CondensedDescription(text=text, original_tokens=original_tokens, tokens=tokens)
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import and_, func, literal_column, or_, select, table, column
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import JOB_SEARCH_VECTOR, Job
+from .job_store import SCRAPED
+import base64
+import json
+import re
+
+MAX_PAGE_SIZE = 100
+ORDERS = ("recent", "relevance")
+
+jobs_fts = table("jobs_fts", column("rowid"), column("rank"))
+
+
+class InvalidQuery(ValueError):
+    """Bad cursor, order or search input; maps to a 400."""
+
+
+@dataclass
+class JobPage:
+    items: List[Job]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidQuery("Malformed cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, (int, float)) for v in values):
+        raise InvalidQuery("Cursor does not match this ordering")
+    return values
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """
+    Turns free text into an FTS5 query matching all words.
+
+    Each word is quoted so user input can never be parsed as FTS5 syntax
+    (column filters, NEAR, unbalanced quotes...).
+    """
+    words = re.findall(r"\w+", q.lower())
+    return " ".join(f'"{word}"' for word in words) or None
+
+
+async def list_jobs(
+    db: AsyncSession,
+    q: Optional[str] = None,
+    source: Optional[str] = None,
+    company: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    order: str = "recent",
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> JobPage:
+    """
+    Lists jobs with filters and full-text search, one keyset page at a time.
+
+    `order="recent"` walks newest first by id; `order="relevance"` (requires
+    `q`) walks best match first, ties broken by id. `next_cursor` resumes
+    right after the last item, so deep pages cost the same as the first.
+    """
+    if order not in ORDERS:
+        raise InvalidQuery(f"order must be one of {', '.join(ORDERS)}")
+    if order == "relevance" and not q:
+        raise InvalidQuery("order=relevance requires q")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # Discovered postings show up once they are scraped
+    stmt = select(Job).where(SCRAPED)
+    if source:
+        stmt = stmt.where(Job.source == source)
+    if company:
+        stmt = stmt.where(Job.company == company)
+    if created_after:
+        stmt = stmt.where(Job.created_at >= created_after)
+    if created_before:
+        stmt = stmt.where(Job.created_at < created_before)
+
+    rank = None
+    if q:
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            match = fts5_query(q)
+            if match is None:
+                return JobPage(items=[])
+            stmt = stmt.join(jobs_fts, jobs_fts.c.rowid == Job.id).where(literal_column("jobs_fts").op("MATCH")(match))
+            # bm25: lower is better
+            rank = jobs_fts.c.rank
+        elif dialect == "postgresql":
+            query = func.websearch_to_tsquery(literal_column("'english'"), q)
+            vector = literal_column(JOB_SEARCH_VECTOR) # Must match the GIN index expression
+            stmt = stmt.where(vector.op("@@")(query))
+            # ts_rank: higher is better; negated so both dialects sort ascending
+            rank = -func.ts_rank(vector, query)
+        else:
+            raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    if order == "relevance":
+        stmt = stmt.add_columns(rank.label("rank"))
+        if cursor:
+            last_rank, last_id = decode_cursor(cursor, 2)
+            stmt = stmt.where(or_(rank > last_rank, and_(rank == last_rank, Job.id < last_id)))
+        stmt = stmt.order_by(rank, Job.id.desc())
+    else:
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            stmt = stmt.where(Job.id < last_id)
+        stmt = stmt.order_by(Job.id.desc())
+
+    # One extra row tells us whether there is a next page
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [row[0] for row in rows]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(float(last.rank), last[0].id) if order == "relevance" else encode_cursor(last[0].id)
+    return JobPage(items=items, next_cursor=next_cursor)
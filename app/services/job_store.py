@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Job, utcnow
+from .job_description import condense_description
+from .urls import normalize_url
+import os
+
+# Jobs scraped more recently than this are served from the DB instead of re-scraped
+FRESHNESS_TTL_SECONDS = float(os.getenv("JOB_FRESHNESS_TTL_SECONDS", str(7 * 24 * 3600)))
+UPSERT_CHUNK_SIZE = int(os.getenv("JOB_UPSERT_CHUNK_SIZE", "500"))
+
+# Excludes discovery placeholders (see insert_listings) from what users see.
+# Rows stored before scraped_at existed have it NULL too, but have a description.
+SCRAPED = or_(Job.scraped_at.is_not(None), Job.description.is_not(None))
+
+# Columns refreshed when a known URL is scraped again
+UPDATABLE_COLUMNS = ("title", "company", "description", "description_condensed", "condensed_tokens_saved", "source", "scraped_at")
+
+
+@dataclass
+class UpsertResult:
+    created: int = 0
+    updated: int = 0
+    ids: Dict[str, int] = field(default_factory=dict) # normalized url -> job id
+    created_urls: Set[str] = field(default_factory=set)
+
+
+def _insert(db: AsyncSession):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+    return insert(Job)
+
+
+async def fresh_jobs(db: AsyncSession, urls: Iterable[str], ttl_seconds: Optional[float] = None) -> Dict[str, Job]:
+    """Returns the stored jobs among `urls` (already normalized) that are still within the freshness TTL."""
+    urls = list(urls)
+    if not urls:
+        return {}
+    ttl = FRESHNESS_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    cutoff = utcnow() - timedelta(seconds=ttl)
+    found = {}
+    for start in range(0, len(urls), UPSERT_CHUNK_SIZE):
+        chunk = urls[start:start + UPSERT_CHUNK_SIZE]
+        result = await db.execute(select(Job).where(Job.url.in_(chunk), Job.scraped_at >= cutoff))
+        found.update({job.url: job for job in result.scalars()})
+    return found
+
+
+async def upsert_jobs(db: AsyncSession, jobs: Iterable[Job], chunk_size: int = UPSERT_CHUNK_SIZE) -> UpsertResult:
+    """
+    Inserts or refreshes many jobs keyed on their normalized URL.
+
+    Each chunk is a single INSERT ... ON CONFLICT (url) DO UPDATE statement, on
+    both Postgres and SQLite. Duplicates within `jobs` collapse to the last one.
+    """
+    now = utcnow()
+    rows: Dict[str, dict] = {}
+    for job in jobs:
+        url = normalize_url(job.url)
+        # Condensed here, at scrape time, instead of on every tailoring call
+        condensed = condense_description(job.description or "")
+        rows[url] = {
+            "title": job.title,
+            "company": job.company,
+            "description": job.description,
+            "description_condensed": condensed.text,
+            "condensed_tokens_saved": condensed.tokens_saved,
+            "url": url,
+            "source": job.source,
+            "scraped_at": now,
+        }
+
+    result = UpsertResult()
+    if not rows:
+        return result
+
+    urls: List[str] = list(rows)
+    for start in range(0, len(urls), chunk_size):
+        chunk = urls[start:start + chunk_size]
+        existing = set((await db.execute(select(Job.url).where(Job.url.in_(chunk)))).scalars())
+
+        stmt = _insert(db).values([rows[url] for url in chunk])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Job.url],
+            set_={column: stmt.excluded[column] for column in UPDATABLE_COLUMNS},
+        ).returning(Job.id, Job.url)
+        for job_id, url in (await db.execute(stmt)).all():
+            result.ids[url] = job_id
+            if url in existing:
+                result.updated += 1
+            else:
+                result.created += 1
+                result.created_urls.add(url)
+
+    await db.commit()
+    return result
+
+
+async def insert_listings(db: AsyncSession, jobs: Iterable[Job], chunk_size: int = UPSERT_CHUNK_SIZE) -> Set[str]:
+    """
+    Inserts discovered postings that aren't stored yet, as placeholders to be scraped.
+
+    Only the fields a search result shows are set. scraped_at stays NULL, so
+    fresh_jobs never serves a placeholder and reads filtered on SCRAPED skip
+    it. Existing rows are left untouched.
+    Returns the URLs that were actually inserted.
+    """
+    rows = {}
+    for job in jobs:
+        url = normalize_url(job.url)
+        rows[url] = {"title": job.title, "company": job.company, "url": url, "source": job.source, "content_hash": job.content_hash, "scraped_at": None}
+
+    inserted: Set[str] = set()
+    if not rows:
+        return inserted
+    urls = list(rows)
+    for start in range(0, len(urls), chunk_size):
+        stmt = _insert(db).values([rows[url] for url in urls[start:start + chunk_size]])
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.url]).returning(Job.url)
+        inserted.update((await db.execute(stmt)).scalars())
+    await db.commit()
+    return inserted
+
+
+async def save_job(db: AsyncSession, job: Job) -> Job:
+    result = await upsert_jobs(db, [job])
+    job_id = next(iter(result.ids.values()))
+    return await db.get(Job, job_id, populate_existing=True)
@@ -0,0 +1,213 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+from sqlalchemy import select
+from ..database import AsyncSessionLocal
+from ..metrics import REGISTRY
+from ..models import LLMCacheEntry, utcnow
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+CACHE_HITS = REGISTRY.counter("llm_cache_hits_total", "LLM cache hits", ["namespace", "tier"])
+CACHE_MISSES = REGISTRY.counter("llm_cache_misses_total", "LLM cache misses (an LLM call was made)", ["namespace"])
+CACHE_COALESCED = REGISTRY.counter("llm_cache_coalesced_total", "Requests that joined an identical in-flight LLM call", ["namespace"])
+CACHE_BYPASSED = REGISTRY.counter("llm_cache_bypassed_total", "Requests that skipped the cache (opt-out or policy)", ["namespace"])
+
+
+def cache_key(**parts) -> str:
+    """Content address for an LLM call: sha256 over the canonical JSON of every input that shapes the output."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachePolicy:
+    """
+    Decides which LLM configurations may be served from the cache.
+
+    Outputs sampled at a temperature above `max_temperature` are never cached,
+    and when `models` is set only those models are. A cached answer is one
+    earlier sample, so callers that want a fresh draw should opt out per call.
+    """
+    enabled: bool = True
+    max_temperature: float = 0.7
+    models: Optional[Iterable[str]] = None
+
+    @classmethod
+    def from_env(cls) -> "CachePolicy":
+        models = os.getenv("LLM_CACHE_MODELS")
+        return cls(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "1") != "0",
+            max_temperature=float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.7")),
+            models=[m.strip() for m in models.split(",") if m.strip()] if models else None,
+        )
+
+    def allows(self, model: str, temperature: float) -> bool:
+        if not self.enabled or temperature > self.max_temperature:
+            return False
+        return self.models is None or model in set(self.models)
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM completions.
+
+    Tier 1 is an in-process LRU bounded by `max_entries` with a TTL. Tier 2 is
+    the `llm_cache` table, so results survive restarts and are shared between
+    the API and the worker. Concurrent identical misses are coalesced into one
+    LLM call (single-flight). If the caller making that call is cancelled, the
+    others retry and one of them makes it instead.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        persistent: bool = True,
+        session_factory=AsyncSessionLocal,
+    ):
+        self.namespace = namespace
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self.persistent = persistent
+        self.session_factory = session_factory
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at monotonic, value)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]], model: Optional[str] = None) -> str:
+        while True:
+            value = self._memory_get(key)
+            if value is not None:
+                CACHE_HITS.inc(namespace=self.namespace, tier="memory")
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            CACHE_COALESCED.inc(namespace=self.namespace)
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The leader was cancelled (its client went away), not this caller:
+                # go round again, and the first waiter back leads a new call
+                if inflight.cancelled():
+                    continue
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._db_get(key)
+            if value is not None:
+                CACHE_HITS.inc(namespace=self.namespace, tier="db")
+            else:
+                CACHE_MISSES.inc(namespace=self.namespace)
+                value = await compute()
+                await self._db_put(key, value, model)
+            self._memory_put(key, value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # Wakes the waiters, which retry rather than sharing this caller's cancellation
+            future.cancel()
+            raise
+        except Exception as e:
+            # Waiters see the same failure; nothing is cached
+            future.set_exception(e)
+            future.exception()  # mark retrieved so an unawaited future doesn't warn
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def peek(self, key: str) -> Optional[str]:
+        """Cached value for `key` from either tier, without computing anything on a miss."""
+        value = self._memory_get(key)
+        if value is not None:
+            CACHE_HITS.inc(namespace=self.namespace, tier="memory")
+            return value
+        value = await self._db_get(key)
+        if value is not None:
+            CACHE_HITS.inc(namespace=self.namespace, tier="db")
+            self._memory_put(key, value)
+            return value
+        CACHE_MISSES.inc(namespace=self.namespace)
+        return None
+
+    async def put(self, key: str, value: str, model: Optional[str] = None):
+        await self._db_put(key, value, model)
+        self._memory_put(key, value)
+
+    def bypass(self):
+        CACHE_BYPASSED.inc(namespace=self.namespace)
+
+    def clear(self):
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "hits_memory": CACHE_HITS.value(namespace=self.namespace, tier="memory"),
+            "hits_db": CACHE_HITS.value(namespace=self.namespace, tier="db"),
+            "misses": CACHE_MISSES.value(namespace=self.namespace),
+            "coalesced": CACHE_COALESCED.value(namespace=self.namespace),
+            "bypassed": CACHE_BYPASSED.value(namespace=self.namespace),
+            "in_flight": len(self._inflight),
+        }
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_put(self, key: str, value: str):
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def _db_get(self, key: str) -> Optional[str]:
+        if not self.persistent:
+            return None
+        try:
+            async with self.session_factory() as db:
+                entry = (await db.execute(select(LLMCacheEntry).where(LLMCacheEntry.key == key))).scalars().first()
+                if entry is None or (entry.expires_at is not None and entry.expires_at < utcnow()):
+                    return None
+                return entry.value
+        except Exception as e:
+            # The persistent tier is an optimization; never fail the request over it
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    async def _db_put(self, key: str, value: str, model: Optional[str]):
+        if not self.persistent:
+            return
+        try:
+            async with self.session_factory() as db:
+                now = utcnow()
+                await db.merge(LLMCacheEntry(
+                    key=key,
+                    namespace=self.namespace,
+                    model=model,
+                    value=value,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                ))
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
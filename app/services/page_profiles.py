@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+from ..metrics import REGISTRY
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+PAGE_REQUESTS = REGISTRY.counter("page_requests_total", "Browser requests by profile and outcome", ["profile", "outcome"])
+PAGE_BYTES = REGISTRY.counter("page_bytes_total", "Response bytes received by browser pages", ["profile"])
+
+# Ads, analytics and tag managers: never needed to read or fill a job page
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "bat.bing.com",
+    "ads.linkedin.com",
+    "px.ads.linkedin.com",
+    "snap.licdn.com",
+    "scorecardresearch.com",
+    "hotjar.com",
+    "segment.io",
+    "cdn.segment.com",
+    "demdex.net",
+    "omtrdc.net",
+)
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font", "stylesheet")
+
+
+def _env_list(name: str, default) -> Tuple[str, ...]:
+    value = os.getenv(name)
+    if value is None:
+        return tuple(default)
+    return tuple(item.strip().lower() for item in value.split(",") if item.strip())
+
+
+@dataclass(frozen=True)
+class PageProfile:
+    """
+    How a page should load: which requests to abort and when navigation counts as done.
+
+    `blocked_domains` match the request host or any parent domain.
+    """
+    name: str
+    blocked_resource_types: FrozenSet[str] = frozenset()
+    blocked_domains: Tuple[str, ...] = ()
+    wait_until: str = "load"
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlsplit(url).hostname or "").lower()
+        return any(host == domain or host.endswith("." + domain) for domain in self.blocked_domains)
+
+    async def install(self, context):
+        """Routes every request of `context` through this profile's deny lists."""
+        if not self.blocked_resource_types and not self.blocked_domains:
+            return
+
+        async def handle(route):
+            request = route.request
+            if self.should_block(request.resource_type, request.url):
+                PAGE_REQUESTS.inc(profile=self.name, outcome="blocked")
+                traffic = _traffic_for(request)
+                if traffic is not None:
+                    traffic.blocked += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", handle)
+
+
+# Scraping only needs text: drop rendering assets and third-party trackers,
+# and stop waiting once the DOM is parsed.
+SCRAPE_PROFILE = PageProfile(
+    name="scrape",
+    blocked_resource_types=frozenset(_env_list("SCRAPER_BLOCKED_RESOURCE_TYPES", DEFAULT_BLOCKED_TYPES)),
+    blocked_domains=_env_list("BROWSER_BLOCKED_DOMAINS", DEFAULT_BLOCKED_DOMAINS),
+    wait_until="domcontentloaded",
+)
+
+# Forms need their scripts, styles and images to render and validate; only trackers go.
+SUBMIT_PROFILE = PageProfile(
+    name="submit",
+    blocked_resource_types=frozenset(_env_list("SUBMITTER_BLOCKED_RESOURCE_TYPES", ())),
+    blocked_domains=_env_list("BROWSER_BLOCKED_DOMAINS", DEFAULT_BLOCKED_DOMAINS),
+    wait_until="load",
+)
+
+
+_page_traffic: "WeakKeyDictionary" = WeakKeyDictionary()
+
+
+def _traffic_for(request) -> Optional["PageTraffic"]:
+    try:
+        return _page_traffic.get(request.frame.page)
+    except Exception:
+        # Service worker requests have no frame
+        return None
+
+
+class PageTraffic:
+    """Counts requests and response bytes for one leased page."""
+
+    def __init__(self, page, profile: PageProfile):
+        self.profile = profile
+        self.requests = 0
+        self.blocked = 0
+        self.failed = 0
+        self.bytes = 0
+        self._pending = set()
+        _page_traffic[page] = self
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    def _on_request(self, request):
+        self.requests += 1
+
+    def _on_failed(self, request):
+        self.failed += 1
+
+    def _on_finished(self, request):
+        PAGE_REQUESTS.inc(profile=self.profile.name, outcome="finished")
+        task = asyncio.ensure_future(self._add_size(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _add_size(self, request):
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        size = sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        self.bytes += size
+        PAGE_BYTES.inc(size, profile=self.profile.name)
+
+    async def report(self, url: str):
+        if self._pending:
+            await asyncio.wait(self._pending, timeout=1)
+        # Aborted requests also fire requestfailed
+        failed = max(self.failed - self.blocked, 0)
+        logger.info(
+            f"[{self.profile.name}] {url}: {self.requests} requests "
+            f"({self.blocked} blocked, {failed} failed), {self.bytes} bytes"
+        )
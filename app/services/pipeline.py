@@ -0,0 +1,292 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, update
+from ..database import AsyncSessionLocal
+from ..metrics import REGISTRY
+from ..models import Application, ApplicationStatus, Job, PipelineItem, PipelineItemStatus, PipelineRun
+from ..tracing import span
+from .applications import with_job_and_resume
+from .job_description import TOKENS_SAVED
+from .job_store import fresh_jobs, save_job
+from .resume import ResumeBuilder
+from .resume_store import add_tailored_resume
+from .scraper import ScraperFactory
+from .urls import normalize_url
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = REGISTRY.gauge("pipeline_queue_depth", "Items waiting for a pipeline stage", ["stage"])
+STAGE_ITEMS = REGISTRY.counter("pipeline_items_total", "Pipeline stage outcomes", ["stage", "outcome"])
+
+STAGES = ("scrape", "tailor", "submit")
+
+
+class SubmissionFailed(Exception):
+    """The submitter reported FAILED for the application."""
+
+
+@dataclass
+class StageStats:
+    workers: int
+    completed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+
+    def to_dict(self, elapsed: float) -> dict:
+        return {
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "items_per_second": round(self.completed / elapsed, 3) if elapsed else 0.0,
+            # Share of the stage's worker time spent working rather than waiting on its queue
+            "utilization": round(self.busy_seconds / (elapsed * self.workers), 3) if elapsed else 0.0,
+        }
+
+
+@dataclass
+class PipelineReport:
+    run_id: int
+    duration: float
+    done: int = 0
+    failed: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "duration_s": round(self.duration, 3),
+            "done": self.done,
+            "failed": self.failed,
+            "stages": {name: stats.to_dict(self.duration) for name, stats in self.stages.items()},
+        }
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{name} {stats.completed / self.duration if self.duration else 0:.2f}/s"
+            for name, stats in self.stages.items()
+        )
+        return f"Run {self.run_id}: {self.done} submitted, {self.failed} failed in {self.duration:.1f}s ({stages})"
+
+
+async def create_run(urls: List[str], base_resume: str) -> int:
+    """Stores a run with one pending item per distinct normalized URL; returns its id."""
+    normalized = list(dict.fromkeys(normalize_url(url) for url in urls if url.strip()))
+    async with AsyncSessionLocal() as db:
+        run = PipelineRun(base_resume=base_resume, items=[PipelineItem(url=url) for url in normalized])
+        db.add(run)
+        await db.commit()
+        return run.id
+
+
+def next_stage(item: PipelineItem) -> str:
+    """Where a pending item resumes: the stage after its last checkpoint."""
+    if item.job_id is None:
+        return "scrape"
+    if item.resume_id is None:
+        return "tailor"
+    return "submit"
+
+
+class Pipeline:
+    """
+    Runs scrape → tailor → submit for every pending item of a run, overlapped.
+
+    Each stage has its own worker count (browser-bound scrape and submit,
+    LLM-bound tailor) and reads from a bounded queue. A slow stage therefore
+    pushes back on the one before it instead of piling up work, and job N+1
+    is scraped while job N is tailored. Every finished stage is checkpointed
+    on the item's row. An interrupted run resumes from its last checkpoints,
+    and a failed item keeps its stage and error.
+    """
+
+    def __init__(
+        self,
+        scrape_workers: Optional[int] = None,
+        tailor_workers: Optional[int] = None,
+        submit_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        resume_builder: Optional[ResumeBuilder] = None,
+        submitter=None,
+        scraper_factory=None,
+        use_cache: bool = True,
+    ):
+        self.workers = {
+            "scrape": scrape_workers or int(os.getenv("PIPELINE_SCRAPE_WORKERS", os.getenv("BROWSER_POOL_SIZE", "2"))),
+            "tailor": tailor_workers or int(os.getenv("PIPELINE_TAILOR_WORKERS", "4")),
+            "submit": submit_workers or int(os.getenv("PIPELINE_SUBMIT_WORKERS", "1")),
+        }
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+        self.resume_builder = resume_builder or ResumeBuilder()
+        if submitter is None:
+            from .submitter import ApplicationSubmitter
+            submitter = ApplicationSubmitter()
+        self.submitter = submitter
+        self.scraper_factory = scraper_factory or ScraperFactory
+        self.use_cache = use_cache
+        self.handlers = {"scrape": self._scrape, "tailor": self._tailor, "submit": self._submit}
+
+    async def run(self, run_id: int, retry_failed: bool = False) -> PipelineReport:
+        async with AsyncSessionLocal() as db:
+            run = await db.get(PipelineRun, run_id)
+            if run is None:
+                raise ValueError(f"Pipeline run {run_id} not found")
+            if retry_failed:
+                await db.execute(
+                    update(PipelineItem)
+                    .where(PipelineItem.run_id == run_id, PipelineItem.status == PipelineItemStatus.FAILED)
+                    .values(status=PipelineItemStatus.PENDING, failed_stage=None, error=None)
+                )
+                await db.commit()
+            result = await db.execute(
+                select(PipelineItem)
+                .where(PipelineItem.run_id == run_id, PipelineItem.status == PipelineItemStatus.PENDING)
+                .order_by(PipelineItem.id)
+            )
+            items = list(result.scalars())
+        base_resume = run.base_resume
+
+        queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        report = PipelineReport(run_id=run_id, duration=0.0, stages={stage: StageStats(self.workers[stage]) for stage in STAGES})
+        remaining = len(items)
+        finished = asyncio.Event()
+        if not remaining:
+            finished.set()
+
+        def settle(ok: bool):
+            nonlocal remaining
+            if ok:
+                report.done += 1
+            else:
+                report.failed += 1
+            remaining -= 1
+            if remaining == 0:
+                finished.set()
+
+        async def put(stage: str, item: PipelineItem):
+            await queues[stage].put(item)
+            QUEUE_DEPTH.inc(stage=stage)
+
+        async def feed():
+            for item in items:
+                await put(next_stage(item), item)
+
+        async def work(stage: str):
+            handler = self.handlers[stage]
+            stats = report.stages[stage]
+            following = STAGES.index(stage) + 1
+            while True:
+                item = await queues[stage].get()
+                QUEUE_DEPTH.dec(stage=stage)
+                started = time.perf_counter()
+                try:
+                    with span(f"pipeline.{stage}", url=item.url):
+                        await handler(item, base_resume)
+                except Exception as e:
+                    stats.busy_seconds += time.perf_counter() - started
+                    stats.failed += 1
+                    STAGE_ITEMS.inc(stage=stage, outcome="failed")
+                    logger.error(f"Pipeline {stage} failed for {item.url}: {e}")
+                    try:
+                        await self._fail(item, stage, e)
+                    except Exception as checkpoint_error:
+                        # Still pending in the database, so a resumed run picks it up again
+                        logger.error(f"Pipeline could not record the {stage} failure for {item.url}: {checkpoint_error}")
+                    finally:
+                        settle(ok=False)
+                    continue
+                stats.busy_seconds += time.perf_counter() - started
+                stats.completed += 1
+                STAGE_ITEMS.inc(stage=stage, outcome="ok")
+                if following < len(STAGES):
+                    await put(STAGES[following], item)
+                else:
+                    settle(ok=True)
+
+        logger.info(f"Pipeline run {run_id}: {len(items)} items, workers {self.workers}")
+        tasks = [asyncio.create_task(feed())]
+        tasks += [asyncio.create_task(work(stage)) for stage in STAGES for _ in range(self.workers[stage])]
+        started = time.perf_counter()
+        try:
+            await finished.wait()
+        finally:
+            report.duration = time.perf_counter() - started
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for stage in STAGES:
+                QUEUE_DEPTH.set(0, stage=stage)
+        logger.info(report.summary())
+        return report
+
+    async def _checkpoint(self, db, item: PipelineItem, **values):
+        await db.execute(update(PipelineItem).where(PipelineItem.id == item.id).values(**values))
+        for name, value in values.items():
+            setattr(item, name, value)
+
+    async def _fail(self, item: PipelineItem, stage: str, error: Exception):
+        async with AsyncSessionLocal() as db:
+            await self._checkpoint(db, item, status=PipelineItemStatus.FAILED, failed_stage=stage, error=str(error)[:2000])
+            await db.commit()
+
+    async def _scrape(self, item: PipelineItem, base_resume: str):
+        async with AsyncSessionLocal() as db:
+            job = (await fresh_jobs(db, [item.url])).get(item.url)
+        if job is None:
+            # No session is held open while the browser works
+            scraped = await self.scraper_factory.get_scraper(item.url).scrape_job(item.url)
+            async with AsyncSessionLocal() as db:
+                job = await save_job(db, scraped)
+        async with AsyncSessionLocal() as db:
+            await self._checkpoint(db, item, job_id=job.id)
+            await db.commit()
+
+    async def _tailor(self, item: PipelineItem, base_resume: str):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Job.description, Job.description_condensed, Job.condensed_tokens_saved).where(Job.id == item.job_id)
+            )
+            description, condensed, tokens_saved = result.one()
+        if condensed is None:
+            # Stored before descriptions were condensed at scrape time
+            content = await self.resume_builder.tailor(base_resume, description or "", use_cache=self.use_cache)
+        else:
+            TOKENS_SAVED.inc(tokens_saved or 0, model=self.resume_builder.model)
+            content = await self.resume_builder.tailor(base_resume, condensed, use_cache=self.use_cache, condense=False)
+        async with AsyncSessionLocal() as db:
+            resume = await add_tailored_resume(db, base_resume, content)
+            await self._checkpoint(db, item, resume_id=resume.id)
+            await db.commit()
+
+    async def _submit(self, item: PipelineItem, base_resume: str):
+        async with AsyncSessionLocal() as db:
+            if item.application_id is None:
+                # Created and checkpointed first, so a resumed run retries this application, not a new one
+                application = Application(job_id=item.job_id, resume_id=item.resume_id, status=ApplicationStatus.PENDING)
+                db.add(application)
+                await db.flush()
+                await self._checkpoint(db, item, application_id=application.id)
+                await db.commit()
+            result = await db.execute(
+                with_job_and_resume(select(Application).where(Application.id == item.application_id), resume_content=True)
+            )
+            application = result.scalars().one()
+
+        if application.status != ApplicationStatus.SUBMITTED:
+            status = await self.submitter.submit_application(application)
+            async with AsyncSessionLocal() as db:
+                values = {"status": status}
+                if status == ApplicationStatus.SUBMITTED:
+                    values["submitted_at"] = datetime.now()
+                await db.execute(update(Application).where(Application.id == application.id).values(**values))
+                await db.commit()
+            if status == ApplicationStatus.FAILED:
+                raise SubmissionFailed(f"Submission failed for application {application.id}")
+
+        async with AsyncSessionLocal() as db:
+            await self._checkpoint(db, item, status=PipelineItemStatus.DONE)
+            await db.commit()
@@ -0,0 +1,275 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+from ..metrics import REGISTRY
+from .rate_limit import TokenBucket
+import asyncio
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = REGISTRY.gauge("politeness_queue_depth", "Navigations waiting for a host slot", ["host"])
+IN_FLIGHT = REGISTRY.gauge("politeness_in_flight", "Navigations currently holding a host slot", ["host"])
+HOST_RATE = REGISTRY.gauge("politeness_rate_per_minute", "Current allowed navigations per minute", ["host"])
+HOST_REQUESTS = REGISTRY.counter("politeness_requests_total", "Navigations granted a host slot", ["host"])
+HOST_THROTTLED = REGISTRY.counter("politeness_throttled_total", "Responses that signalled throttling", ["host", "reason"])
+HOST_WAIT = REGISTRY.histogram("politeness_wait_seconds", "Time spent waiting for a host slot", ["host"])
+
+# Status codes a host uses to say "slow down" (999 is LinkedIn's)
+THROTTLE_STATUSES = {429: "429", 999: "999"}
+CAPTCHA_URL_MARKERS = ("captcha", "/checkpoint/challenge")
+
+
+class HostThrottled(Exception):
+    """The host pushed back (429/999/captcha); the host's lane has been slowed down."""
+
+    def __init__(self, host: str, reason: str):
+        super().__init__(f"{host} is throttling us ({reason})")
+        self.host = host
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    requests_per_minute: float = 30.0
+    burst: float = 3.0
+    max_in_flight: int = 2
+    min_rate_factor: float = 0.1 # Slowdowns never go below this fraction of the base rate
+    cooldown_seconds: float = 30.0 # First pause after a throttle; doubles on repeats
+    max_cooldown_seconds: float = 600.0
+    recover_after: int = 10 # Clean responses before stepping the rate back up
+
+
+def host_key(url: str) -> str:
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def policies_from_env() -> Dict[str, HostPolicy]:
+    """
+    Per-host overrides from POLITENESS_HOSTS, e.g.
+    {"linkedin.com": {"requests_per_minute": 20, "max_in_flight": 2}}.
+    """
+    raw = os.getenv("POLITENESS_HOSTS")
+    if not raw:
+        return {}
+    return {host_key(f"//{host}"): HostPolicy(**options) for host, options in json.loads(raw).items()}
+
+
+class _Lane:
+    def __init__(self, host: str, policy: HostPolicy):
+        self.host = host
+        self.policy = policy
+        self.bucket = TokenBucket(policy.requests_per_minute, capacity=policy.burst, name=f"host_{host}")
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.in_flight = 0
+        self.rate_factor = 1.0
+        self.cooldown_until = 0.0
+        self.strikes = 0 # Consecutive throttles, drives the cooldown
+        self.clean = 0 # Clean responses since the last rate change
+        HOST_RATE.set(policy.requests_per_minute, host=host)
+
+    @property
+    def rate_per_minute(self) -> float:
+        return self.policy.requests_per_minute * self.rate_factor
+
+    def ready_in(self, now: float) -> float:
+        """0 if a slot can be granted now (and takes a token), else seconds to wait."""
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        return self.bucket.try_acquire()
+
+    def throttled(self, reason: str):
+        self.strikes += 1
+        self.clean = 0
+        self.rate_factor = max(self.policy.min_rate_factor, self.rate_factor / 2)
+        self.bucket.set_rate(self.rate_per_minute)
+        self.bucket.drain()
+        cooldown = min(self.policy.max_cooldown_seconds, self.policy.cooldown_seconds * 2 ** (self.strikes - 1))
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+        HOST_THROTTLED.inc(host=self.host, reason=reason)
+        HOST_RATE.set(self.rate_per_minute, host=self.host)
+        logger.warning(
+            f"{self.host} throttled us ({reason}); pausing {cooldown:.0f}s, "
+            f"then {self.rate_per_minute:.1f}/min"
+        )
+
+    def succeeded(self):
+        self.strikes = 0
+        self.clean += 1
+        if self.rate_factor < 1.0 and self.clean >= self.policy.recover_after:
+            # Additive increase, multiplicative decrease
+            self.clean = 0
+            self.rate_factor = min(1.0, self.rate_factor + 0.1)
+            self.bucket.set_rate(self.rate_per_minute)
+            HOST_RATE.set(self.rate_per_minute, host=self.host)
+
+
+class HostTicket:
+    """A granted host slot; report what the server said so the lane can adapt."""
+
+    def __init__(self, lane: _Lane):
+        self.lane = lane
+        self.reason: Optional[str] = None
+
+    @property
+    def host(self) -> str:
+        return self.lane.host
+
+    def observe(self, status: Optional[int] = None, url: str = "", captcha: bool = False) -> Optional[str]:
+        """Records a response; returns the throttle reason, if any."""
+        reason = THROTTLE_STATUSES.get(status)
+        if reason is None and (captcha or any(marker in url.lower() for marker in CAPTCHA_URL_MARKERS)):
+            reason = "captcha"
+        if reason:
+            self.reason = reason
+            self.lane.throttled(reason)
+        else:
+            self.lane.succeeded()
+        return reason
+
+    def check(self, response, page):
+        """observe() for a Playwright navigation; raises HostThrottled if the host pushed back."""
+        reason = self.observe(status=response.status if response is not None else None, url=page.url)
+        if reason:
+            raise HostThrottled(self.host, reason)
+
+    async def renew(self):
+        """
+        Waits for another token on the host's lane, for a follow-up navigation
+        (a login, a retry) made while this slot is still held.
+        """
+        while True:
+            delay = self.lane.ready_in(time.monotonic())
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        HOST_REQUESTS.inc(host=self.host)
+        self.reason = None
+
+
+class PolitenessScheduler:
+    """
+    Shared gate for outbound navigations.
+
+    Every host gets a lane with its own token bucket, in-flight cap and
+    adaptive slowdown (AIMD on 429/999/captcha). On top of that a global
+    `max_in_flight` bounds the total, and free capacity is handed to hosts
+    round-robin, so a deep queue for one host can't starve the others.
+    Acquire a slot before leasing a browser page so waiting on a slow host
+    never ties up a browser.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        default_policy: Optional[HostPolicy] = None,
+        policies: Optional[Dict[str, HostPolicy]] = None,
+    ):
+        self.max_in_flight = max_in_flight or int(os.getenv("POLITENESS_MAX_IN_FLIGHT", os.getenv("BROWSER_POOL_SIZE", "2")))
+        self.default_policy = default_policy or HostPolicy(
+            requests_per_minute=float(os.getenv("POLITENESS_REQUESTS_PER_MINUTE", "30")),
+            burst=float(os.getenv("POLITENESS_BURST", "3")),
+            max_in_flight=int(os.getenv("POLITENESS_MAX_IN_FLIGHT_PER_HOST", "2")),
+        )
+        self.policies = policies_from_env() if policies is None else {host_key(f"//{h}"): p for h, p in policies.items()}
+        self._lanes: Dict[str, _Lane] = {}
+        self._rotation: Deque[str] = deque()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Waits for a slot on `url`'s host and yields a HostTicket while it is held."""
+        lane = self._lane(host_key(url))
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        QUEUE_DEPTH.inc(host=lane.host)
+        started = time.perf_counter()
+        try:
+            self._dispatch()
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self._release(lane)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            QUEUE_DEPTH.dec(host=lane.host)
+        HOST_WAIT.observe(time.perf_counter() - started, host=lane.host)
+        try:
+            yield HostTicket(lane)
+        finally:
+            self._release(lane)
+
+    def stats(self) -> dict:
+        return {
+            host: {
+                "waiting": sum(1 for waiter in lane.waiters if not waiter.done()),
+                "in_flight": lane.in_flight,
+                "rate_per_minute": round(lane.rate_per_minute, 2),
+                "cooldown_seconds": round(max(0.0, lane.cooldown_until - time.monotonic()), 1),
+            }
+            for host, lane in self._lanes.items()
+        }
+
+    def _lane(self, host: str) -> _Lane:
+        lane = self._lanes.get(host)
+        if lane is None:
+            lane = _Lane(host, self.policies.get(host, self.default_policy))
+            self._lanes[host] = lane
+            self._rotation.append(host)
+        return lane
+
+    def _release(self, lane: _Lane):
+        lane.in_flight -= 1
+        self._in_flight -= 1
+        IN_FLIGHT.dec(host=lane.host)
+        self._dispatch()
+
+    def _dispatch(self):
+        """Grants as many waiting slots as the limits allow, one host at a time in rotation."""
+        now = time.monotonic()
+        wake_in = None
+        granted = True
+        while granted and self._in_flight < self.max_in_flight:
+            granted = False
+            for _ in range(len(self._rotation)):
+                host = self._rotation[0]
+                self._rotation.rotate(-1)
+                lane = self._lanes[host]
+                while lane.waiters and lane.waiters[0].done():
+                    lane.waiters.popleft() # Cancelled while queued
+                if not lane.waiters or lane.in_flight >= lane.policy.max_in_flight:
+                    continue
+                delay = lane.ready_in(now)
+                if delay > 0:
+                    wake_in = delay if wake_in is None else min(wake_in, delay)
+                    continue
+                lane.in_flight += 1
+                self._in_flight += 1
+                IN_FLIGHT.inc(host=host)
+                HOST_REQUESTS.inc(host=host)
+                lane.waiters.popleft().set_result(None)
+                granted = True
+                break # Next grant goes to the next host in line
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if wake_in is not None and self._in_flight < self.max_in_flight:
+            self._timer = asyncio.get_running_loop().call_later(wake_in, self._dispatch)
+
+
+scheduler = PolitenessScheduler()
+
+
+def get_scheduler() -> PolitenessScheduler:
+    return scheduler
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Task, TaskStatus, utcnow
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", "300"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = float(os.getenv("TASK_RETRY_BASE_SECONDS", "5"))
+RETRY_MAX_SECONDS = float(os.getenv("TASK_RETRY_MAX_SECONDS", "600"))
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter for the given (1-based) attempt number."""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * (2 ** max(attempt - 1, 0)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict, max_attempts: Optional[int] = None, delay: float = 0) -> Task:
+    task = Task(
+        kind=kind,
+        payload=payload,
+        status=TaskStatus.QUEUED,
+        max_attempts=max_attempts or DEFAULT_MAX_ATTEMPTS,
+        run_at=utcnow() + timedelta(seconds=delay),
+    )
+    db.add(task)
+    await db.commit()
+    await db.refresh(task)
+    return task
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(Task.status == TaskStatus.QUEUED, Task.run_at <= now),
+        # Lease expired: the worker holding it died or stalled
+        and_(Task.status == TaskStatus.RUNNING, Task.locked_until < now),
+    )
+
+
+async def claim(
+    db: AsyncSession,
+    worker_id: str,
+    limit: int = 1,
+    kinds: Optional[Iterable[str]] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+) -> List[Task]:
+    """
+    Claims up to `limit` runnable tasks for `worker_id` under a lease.
+
+    Candidates are read first (with SKIP LOCKED where the backend supports it),
+    then each one is taken with a conditional UPDATE, so two workers racing for
+    the same row can never both win. This works on SQLite as well as Postgres.
+    """
+    now = utcnow()
+    query = select(Task.id).where(_claimable(now)).order_by(Task.run_at, Task.id).limit(limit)
+    if kinds:
+        query = query.where(Task.kind.in_(list(kinds)))
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+
+    candidate_ids = list((await db.execute(query)).scalars())
+    claimed_ids = []
+    for task_id in candidate_ids:
+        result = await db.execute(
+            update(Task)
+            .where(Task.id == task_id, _claimable(now))
+            .values(
+                status=TaskStatus.RUNNING,
+                locked_by=worker_id,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                attempts=Task.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            claimed_ids.append(task_id)
+    await db.commit()
+
+    if not claimed_ids:
+        return []
+    claimed = (
+        select(Task)
+        .where(Task.id.in_(claimed_ids))
+        .order_by(Task.run_at, Task.id)
+        .execution_options(populate_existing=True)
+    )
+    return list((await db.execute(claimed)).scalars())
+
+
+async def extend_lease(db: AsyncSession, task: Task, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+    result = await db.execute(
+        update(Task)
+        .where(Task.id == task.id, Task.locked_by == worker_id, Task.status == TaskStatus.RUNNING)
+        .values(locked_until=utcnow() + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def complete(db: AsyncSession, task: Task, worker_id: str, result: Optional[dict] = None) -> bool:
+    updated = await db.execute(
+        update(Task)
+        .where(Task.id == task.id, Task.locked_by == worker_id, Task.status == TaskStatus.RUNNING)
+        .values(status=TaskStatus.SUCCEEDED, result=result, locked_by=None, locked_until=None, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if updated.rowcount != 1:
+        logger.warning(f"Task {task.id} lease was lost before completion")
+    return updated.rowcount == 1
+
+
+async def fail(db: AsyncSession, task: Task, worker_id: str, error: str) -> str:
+    """
+    Records a failed attempt. Schedules a retry with backoff, or moves the task
+    to the dead-letter state once `max_attempts` is exhausted. Returns the new status.
+    """
+    if task.attempts >= task.max_attempts:
+        values = dict(status=TaskStatus.DEAD)
+    else:
+        values = dict(status=TaskStatus.QUEUED, run_at=utcnow() + timedelta(seconds=backoff_seconds(task.attempts)))
+    await db.execute(
+        update(Task)
+        .where(Task.id == task.id, Task.locked_by == worker_id, Task.status == TaskStatus.RUNNING)
+        .values(locked_by=None, locked_until=None, last_error=error, **values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    if values["status"] == TaskStatus.DEAD:
+        logger.error(f"Task {task.id} ({task.kind}) dead-lettered after {task.attempts} attempts: {error}")
+    return values["status"]
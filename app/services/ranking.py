@@ -0,0 +1,263 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Job
+from .job_store import SCRAPED
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import zlib
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+N_FEATURES = int(os.getenv("RANKING_N_FEATURES", str(2 ** 18)))
+INDEX_PATH = os.getenv("RANKING_INDEX_PATH", "data/job_index")
+# scraped_at is assigned before commit, so a job can commit with a stamp behind the watermark
+SYNC_OVERLAP = timedelta(seconds=float(os.getenv("RANKING_SYNC_OVERLAP_SECONDS", "300")))
+
+INDEX_VERSION = 1
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to "
+    "we will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams plus adjacent bigrams (so "machine learning" is a feature)."""
+    words = [word for word in TOKEN_RE.findall((text or "").lower()) if word not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_features(texts: Iterable[str], n_features: int = N_FEATURES) -> sparse.csr_matrix:
+    """
+    Hashed term-frequency rows, one per text, with sublinear (1 + log tf) weighting.
+
+    Feature indices come from crc32 so they are stable across processes and
+    restarts (unlike the builtin hash), which keeps a persisted index valid.
+    """
+    indptr = [0]
+    indices: List[int] = []
+    data: List[float] = []
+    for text in texts:
+        counts = {}
+        for token in tokenize(text):
+            column = zlib.crc32(token.encode()) % n_features
+            counts[column] = counts.get(column, 0) + 1
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, n_features),
+    )
+    matrix.sort_indices()
+    np.log(matrix.data, out=matrix.data)
+    matrix.data += 1
+    return matrix
+
+
+def idf_weights(df: np.ndarray, n: int) -> np.ndarray:
+    return (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+
+def weights(matrix: sparse.csr_matrix, df: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """IDF and the IDF-weighted norm of every row, for cosine scoring."""
+    idf = idf_weights(df, matrix.shape[0])
+    return idf, np.sqrt(matrix.power(2) @ (idf * idf))
+
+
+@dataclass
+class RankedJob:
+    job_id: int
+    score: float
+
+
+class JobIndex:
+    """
+    Hashed TF-IDF index over stored job descriptions.
+
+    Rows hold term frequencies only; IDF is recomputed from document
+    frequencies at query time, so adding or replacing jobs never requires
+    re-weighting existing rows. `sync` pulls jobs inserted or re-scraped since
+    the last sync, re-reading an overlap window behind its watermark so rows
+    committed late aren't missed, and builds and persists the matrix (next to
+    `path`, so a restart picks up where it left off) off the event loop.
+    """
+
+    def __init__(self, path: Optional[str] = INDEX_PATH, n_features: int = N_FEATURES):
+        self.path = Path(path) if path else None
+        self.n_features = n_features
+        self.reset()
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    def reset(self):
+        self.matrix = sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.df = np.zeros(self.n_features, dtype=np.float32)
+        self.max_job_id = 0
+        self.watermark: Optional[datetime] = None # Latest scraped_at already indexed
+        self.recent: Dict[int, datetime] = {} # scraped_at of rows indexed inside the overlap window
+        self._idf = self._row_norms = None
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def add(self, job_ids: List[int], texts: List[str]):
+        """Adds rows for `job_ids`, replacing any already indexed."""
+        if job_ids:
+            self._swap(*self._build(job_ids, texts))
+
+    def _build(self, job_ids: List[int], texts: List[str]) -> tuple:
+        """
+        The matrix, ids, document frequencies, IDF and row norms with `job_ids`
+        added. Reads the index without changing it, so it can run in a thread
+        while requests keep ranking against the current matrix.
+        """
+        new_ids = np.asarray(job_ids, dtype=np.int64)
+        keep = ~np.isin(self.job_ids, new_ids)
+        rows = hash_features(texts, self.n_features)
+        matrix, ids = self.matrix, self.job_ids
+        if not keep.all():
+            matrix, ids = matrix[keep], ids[keep]
+        matrix = sparse.vstack([matrix, rows], format="csr")
+        ids = np.concatenate([ids, new_ids])
+        df = np.bincount(matrix.indices, minlength=self.n_features).astype(np.float32)
+        return (matrix, ids, df, *weights(matrix, df))
+
+    def _swap(self, matrix, job_ids, df, idf, row_norms):
+        self.matrix, self.job_ids, self.df = matrix, job_ids, df
+        self._idf, self._row_norms = idf, row_norms
+        self.max_job_id = max(self.max_job_id, int(job_ids.max()))
+
+    def idf(self) -> np.ndarray:
+        return idf_weights(self.df, len(self.job_ids))
+
+    def rank(self, text: str, top_k: int = 20, min_score: float = 0.0) -> List[RankedJob]:
+        """Cosine similarity of every indexed job against `text`, best first."""
+        if not len(self.job_ids):
+            return []
+        if self._row_norms is None:
+            self._idf, self._row_norms = weights(self.matrix, self.df)
+        idf, row_norms = self._idf, self._row_norms
+
+        query = hash_features([text], self.n_features)
+        columns = query.indices
+        query_weights = query.data * idf[columns]
+        query_norm = np.linalg.norm(query_weights)
+        if query_norm == 0:
+            return []
+
+        # Score against X * diag(idf) without materializing it
+        weighted_query = np.zeros(self.n_features, dtype=np.float32)
+        weighted_query[columns] = query_weights * idf[columns]
+        dots = self.matrix @ weighted_query
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = np.where(row_norms > 0, dots / (row_norms * query_norm), 0.0)
+
+        candidates = np.flatnonzero(scores >= max(min_score, np.finfo(np.float32).tiny))
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [RankedJob(job_id=int(self.job_ids[i]), score=float(scores[i])) for i in order]
+
+    async def sync(self, db: AsyncSession) -> int:
+        """Indexes jobs created or re-scraped since the last sync; returns how many rows changed."""
+        async with self._lock:
+            if not self._loaded:
+                await asyncio.to_thread(self.load)
+            if self.max_job_id and (await db.scalar(select(func.max(Job.id))) or 0) < self.max_job_id:
+                # The jobs table was reset under a persisted index
+                logger.warning("Job index is ahead of the database, rebuilding")
+                self.reset()
+            conditions = [Job.id > self.max_job_id]
+            if self.watermark is not None:
+                conditions.append(Job.scraped_at > self.watermark - SYNC_OVERLAP)
+            result = await db.execute(
+                # Placeholders are indexed once scraped, when their scraped_at enters the window
+                select(Job.id, Job.title, Job.description, Job.scraped_at).where(or_(*conditions), SCRAPED).order_by(Job.id)
+            )
+            # The overlap re-reads rows already indexed at the same scrape; skip those
+            rows = [row for row in result.all() if row.scraped_at is None or self.recent.get(row.id) != row.scraped_at]
+            if not rows:
+                return 0
+
+            started = time.perf_counter()
+            self._swap(*await asyncio.to_thread(
+                self._build, [row.id for row in rows], [f"{row.title or ''}\n{row.description or ''}" for row in rows]
+            ))
+            stamps = {row.id: row.scraped_at for row in rows if row.scraped_at is not None}
+            if stamps:
+                self.watermark = max([self.watermark, *stamps.values()] if self.watermark else stamps.values())
+                self.recent.update(stamps)
+                horizon = self.watermark - SYNC_OVERLAP
+                self.recent = {job_id: stamp for job_id, stamp in self.recent.items() if stamp > horizon}
+            await asyncio.to_thread(self.save)
+            logger.info(f"Indexed {len(rows)} jobs in {time.perf_counter() - started:.3f}s ({len(self)} total)")
+            return len(rows)
+
+    def _files(self) -> Tuple[Path, Path]:
+        return self.path.with_suffix(".npz"), self.path.with_suffix(".json")
+
+    def save(self):
+        if self.path is None:
+            return
+        matrix_path, meta_path = self._files()
+        matrix_path.parent.mkdir(parents=True, exist_ok=True)
+        sparse.save_npz(matrix_path, self.matrix)
+        meta = {
+            "version": INDEX_VERSION,
+            "n_features": self.n_features,
+            "job_ids": self.job_ids.tolist(),
+            "max_job_id": self.max_job_id,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "recent": {str(job_id): stamp.isoformat() for job_id, stamp in self.recent.items()},
+        }
+        # Metadata is written last and atomically; it is what marks the index valid
+        tmp_path = meta_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(meta))
+        tmp_path.replace(meta_path)
+
+    def load(self) -> bool:
+        """Loads a persisted index if one matches this configuration; otherwise starts empty."""
+        self._loaded = True
+        if self.path is None:
+            return False
+        matrix_path, meta_path = self._files()
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta["version"] != INDEX_VERSION or meta["n_features"] != self.n_features:
+                logger.info("Job index on disk is incompatible, rebuilding")
+                return False
+            matrix = sparse.load_npz(matrix_path).tocsr().astype(np.float32)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Could not load job index ({e}), rebuilding")
+            return False
+
+        job_ids = np.asarray(meta["job_ids"], dtype=np.int64)
+        if matrix.shape[0] != len(job_ids):
+            logger.warning("Job index files are out of step, rebuilding")
+            return False
+        self.matrix = matrix
+        self.job_ids = job_ids
+        self.df = np.bincount(matrix.indices, minlength=self.n_features).astype(np.float32)
+        self._idf = self._row_norms = None
+        self.max_job_id = meta["max_job_id"]
+        self.watermark = datetime.fromisoformat(meta["watermark"]) if meta["watermark"] else None
+        self.recent = {int(job_id): datetime.fromisoformat(stamp) for job_id, stamp in meta.get("recent", {}).items()}
+        return True
+
+
+job_index = JobIndex()
@@ -0,0 +1,137 @@
+from typing import Awaitable, Callable, Optional, TypeVar
+from ..metrics import REGISTRY
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_WAIT = REGISTRY.histogram("rate_limit_wait_seconds", "Time spent waiting on a client-side token bucket", ["limiter"])
+RATE_LIMIT_RETRIES = REGISTRY.counter("rate_limit_retries_total", "Calls retried after a 429 response", ["limiter"])
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at `rate_per_minute`.
+
+    `capacity` bounds bursts (defaults to one minute's worth). Requests larger
+    than the capacity are clamped so they can't wait forever. `clock` is the
+    time source refills are measured against.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        name: str = "default",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.name = name
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate_per_minute: float):
+        self._refill()
+        self.rate = rate_per_minute / 60.0
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """Takes `amount` tokens if available and returns 0, else returns the seconds until they will be."""
+        amount = min(amount, self.capacity)
+        self._refill()
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self.rate
+
+    def drain(self):
+        """Drops any saved-up burst, e.g. after the server pushed back."""
+        self._refill()
+        self._tokens = min(self._tokens, 0.0)
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Waits until `amount` tokens are available, takes them and returns the time waited."""
+        amount = min(amount, self.capacity)
+        started = self._clock()
+        # The lock keeps waiters FIFO so a large request can't be starved by small ones
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    break
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+        waited = self._clock() - started
+        RATE_LIMIT_WAIT.observe(waited, limiter=self.name)
+        return waited
+
+
+class LLMRateLimiter:
+    """Client-side limits for an LLM provider: requests per minute and tokens per minute."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, name: str = "llm"):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, name=f"{name}_requests")
+        self.tokens = TokenBucket(tokens_per_minute, name=f"{name}_tokens")
+
+    async def acquire(self, tokens: int):
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for HTTP 429 style errors from OpenAI/httpx clients (and the fake chat model)."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("retry-after")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def retry_on_rate_limit(
+    call: Callable[[], Awaitable[T]],
+    max_retries: int = 5,
+    base_seconds: float = 1.0,
+    max_seconds: float = 60.0,
+    name: str = "llm",
+) -> T:
+    """
+    Runs `call`, retrying 429 responses with full-jitter exponential backoff.
+
+    A server-provided Retry-After is used as the lower bound of the delay.
+    Other errors propagate immediately.
+    """
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if not is_rate_limited(e) or attempt >= max_retries:
+                raise
+            delay = random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+            delay = max(delay, retry_after_seconds(e) or 0)
+            attempt += 1
+            RATE_LIMIT_RETRIES.inc(limiter=name)
+            logger.warning(f"Rate limited ({e}); retry {attempt}/{max_retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -1,33 +1,289 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+from ..metrics import REGISTRY
+from .job_description import TOKENS_SAVED, condense_description
+from .llm_cache import CachePolicy, LLMCache, cache_key
+from .rate_limit import LLMRateLimiter, retry_on_rate_limit
+from ..tracing import span, start_span
+import asyncio
+import logging
 import os
+import time
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are an expert career coach and resume writer. Your goal is to tailor a candidate's resume to a specific job description to maximize their chances of getting an interview. Do not invent false information, but highlight relevant skills and experiences."
+OPENAI_MODEL = "gpt-3.5-turbo"
+FAKE_MODEL = "fake-chat"
+USER_PROMPT = "Here is my base resume:\n\n{resume}\n\nHere is the job description:\n\n{job_description}\n\nPlease rewrite the resume to better match the job description. Focus on keywords and relevant achievements."
+
+TIME_TO_FIRST_TOKEN = REGISTRY.histogram("llm_time_to_first_token_seconds", "Latency until the first streamed token", ["model"])
+LLM_TOKENS = REGISTRY.counter("llm_tokens_total", "Tokens reported by the provider", ["model", "kind"])
+
+# Shared across builders so the API and agent tools hit the same cache
+tailor_cache = LLMCache(namespace="tailor_resume")
+
+# One client-side budget per process, matching the provider account limits
+llm_rate_limiter = LLMRateLimiter(
+    requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500")),
+    tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")),
+)
+
+def estimate_tokens(text: str) -> int:
+    # Rough heuristic (~4 characters per token), good enough for rate budgeting
+    return len(text) // 4 + 1
+
+@dataclass
+class TailorResult:
+    index: int
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 class ResumeBuilder:
-    def __init__(self):
-        # Initialize LLM. Expects OPENAI_API_KEY in environment.
-        # Defaults to gpt-3.5-turbo for cost/speed, can be configured.
-        self.llm = ChatOpenAI(temperature=0.7, model="gpt-3.5-turbo")
-        
-    async def tailor_resume(self, base_resume_content: str, job_description: str) -> str:
+    def __init__(
+        self,
+        cache: Optional[LLMCache] = None,
+        cache_policy: Optional[CachePolicy] = None,
+        llm=None,
+        rate_limiter: Optional[LLMRateLimiter] = None,
+    ):
+        # The LLM client and chain are built on first use, so importing the API
+        # doesn't load LangChain or require OPENAI_API_KEY.
+        # LLM_PROVIDER=fake swaps in the local FakeChatModel (no network, no key needed).
+        self.temperature = 0.7
+        self.fake = os.getenv("LLM_PROVIDER") == "fake"
+        self._llm = llm
+        self._chain = None
+        if llm is not None:
+            self.model = getattr(llm, "model_name", type(llm).__name__)
+        else:
+            self.model = FAKE_MODEL if self.fake else OPENAI_MODEL
+        self.cache = cache or tailor_cache
+        self.cache_policy = cache_policy or CachePolicy.from_env()
+        self.rate_limiter = rate_limiter or llm_rate_limiter
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "5"))
+        self.retry_base_seconds = float(os.getenv("LLM_RETRY_BASE_SECONDS", "1.0"))
+        self.condense_descriptions = os.getenv("JD_CONDENSE", "1") != "0"
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            if self.fake:
+                from .fake_llm import FakeChatModel
+                self._llm = FakeChatModel(latency=float(os.getenv("FAKE_LLM_LATENCY", "0.05")), model_name=FAKE_MODEL)
+            else:
+                from langchain_openai import ChatOpenAI
+                # Expects OPENAI_API_KEY; 429s are retried by retry_on_rate_limit with jitter, not by the client
+                self._llm = ChatOpenAI(temperature=self.temperature, model=OPENAI_MODEL, max_retries=0)
+        return self._llm
+
+    @property
+    def chain(self):
+        # Built once and reused by every call (the chain is stateless)
+        if self._chain is None:
+            from langchain_core.output_parsers import StrOutputParser
+            from langchain_core.prompts import ChatPromptTemplate
+
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", SYSTEM_PROMPT),
+                ("user", USER_PROMPT)
+            ])
+            self._chain = prompt | self.llm | StrOutputParser()
+        return self._chain
+
+    async def tailor_resume(self, base_resume_content: str, job_description: str, use_cache: bool = True) -> str:
         """
         Tailors a resume to a specific job description using an LLM.
+
+        Identical requests are served from the LLM cache when the cache policy
+        allows this model/temperature; pass use_cache=False to force a fresh call.
         """
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are an expert career coach and resume writer. Your goal is to tailor a candidate's resume to a specific job description to maximize their chances of getting an interview. Do not invent false information, but highlight relevant skills and experiences."),
-            ("user", "Here is my base resume:\n\n{resume}\n\nHere is the job description:\n\n{job_description}\n\nPlease rewrite the resume to better match the job description. Focus on keywords and relevant achievements.")
-        ])
-        
-        chain = prompt | self.llm | StrOutputParser()
-        
         try:
-            tailored_resume = await chain.ainvoke({
-                "resume": base_resume_content,
-                "job_description": job_description
-            })
-            return tailored_resume
+            return await self._tailor(base_resume_content, self.condense(job_description), use_cache)
         except Exception as e:
-            # Fallback or re-raise depending on requirements. 
+            # Fallback or re-raise depending on requirements.
             # For now, return a basic error message or the original resume with a note.
-            print(f"Error tailoring resume: {e}")
+            logger.error(f"Error tailoring resume: {e}")
             return f"Error tailoring resume. Original content preserved.\n\n{base_resume_content}"
+
+    async def tailor(self, base_resume_content: str, job_description: str, use_cache: bool = True, condense: bool = True) -> str:
+        """
+        Like tailor_resume, but raises on failure instead of returning a placeholder.
+
+        Pass condense=False for a description that is already condensed (Job.description_condensed).
+        """
+        if condense:
+            job_description = self.condense(job_description)
+        return await self._tailor(base_resume_content, job_description, use_cache)
+
+    async def tailor_many(
+        self,
+        base_resume_content: str,
+        job_descriptions: List[str],
+        use_cache: bool = True,
+        concurrency: Optional[int] = None,
+    ) -> List[TailorResult]:
+        """
+        Tailors one resume against many job descriptions concurrently.
+
+        Calls share the prebuilt chain and the process-wide rate limiter, 429s are
+        retried with jittered backoff, and results come back in input order with
+        per-item errors instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(concurrency or int(os.getenv("LLM_BATCH_CONCURRENCY", "8")))
+
+        async def one(index: int, job_description: str) -> TailorResult:
+            async with semaphore:
+                try:
+                    content = await self._tailor(base_resume_content, self.condense(job_description), use_cache)
+                    return TailorResult(index=index, content=content)
+                except Exception as e:
+                    return TailorResult(index=index, error=str(e))
+
+        return await asyncio.gather(*(one(i, jd) for i, jd in enumerate(job_descriptions)))
+
+    async def astream_tailor(self, base_resume_content: str, job_description: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Streams the tailored resume as it is generated.
+
+        A cached result is replayed as a single chunk; a completed stream is
+        written to the cache. Closing the iterator early (e.g. the client went
+        away) cancels the upstream LLM call and caches nothing.
+        """
+        job_description = self.condense(job_description)
+        cacheable = use_cache and self.cache_policy.allows(self.model, self.temperature)
+        key = self._cache_key(base_resume_content, job_description)
+        if cacheable:
+            cached = await self.cache.peek(key)
+            if cached is not None:
+                yield cached
+                return
+        else:
+            self.cache.bypass()
+
+        inputs = {
+            "resume": base_resume_content,
+            "job_description": job_description
+        }
+        tokens = self._estimate_call_tokens(base_resume_content, job_description)
+        # Not made current: an async generator's context is the consumer's between yields
+        stream_span = start_span("llm.stream", model=self.model)
+
+        async def open_stream():
+            # Providers reject with 429 before the first chunk, so only opening is retried
+            await self.rate_limiter.acquire(tokens)
+            started = time.perf_counter()
+            stream = self.chain.astream(inputs)
+            try:
+                first = await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+            TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - started, model=self.model)
+            return stream, first
+
+        try:
+            stream, first = await retry_on_rate_limit(open_stream, max_retries=self.max_retries, base_seconds=self.retry_base_seconds)
+        except StopAsyncIteration:
+            stream_span.finish()
+            return
+        except BaseException as e:
+            stream_span.finish(error=e)
+            raise
+        parts = [first]
+        completed, error = False, None
+        try:
+            yield first
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+            completed = True
+        except GeneratorExit:
+            raise # Closed early by the consumer: not an error, just not completed
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            await stream.aclose()
+            stream_span.set(chunks=len(parts), completed=completed)
+            stream_span.finish(error=error)
+
+        if cacheable and "".join(parts).strip():
+            await self.cache.put(key, "".join(parts), model=self.model)
+
+    def condense(self, job_description: str) -> str:
+        """
+        Strips boilerplate from a raw job description before it goes into a prompt
+        (JD_CONDENSE=0 disables), recording the tokens saved on a jd.condense span
+        and in jd_tokens_saved_total.
+        """
+        if not self.condense_descriptions:
+            return job_description
+        with span("jd.condense") as condense_span:
+            condensed = condense_description(job_description)
+            condense_span.set(original_tokens=condensed.original_tokens, tokens=condensed.tokens, tokens_saved=condensed.tokens_saved)
+        TOKENS_SAVED.inc(condensed.tokens_saved, model=self.model)
+        return condensed.text
+
+    def _cache_key(self, base_resume_content: str, job_description: str) -> str:
+        return cache_key(
+            model=self.model,
+            temperature=self.temperature,
+            prompt=[SYSTEM_PROMPT, USER_PROMPT],
+            resume=base_resume_content,
+            job_description=job_description,
+        )
+
+    def _estimate_call_tokens(self, base_resume_content: str, job_description: str) -> int:
+        # Budget prompt plus an output about as long as the resume
+        return estimate_tokens(SYSTEM_PROMPT + USER_PROMPT + job_description) + 2 * estimate_tokens(base_resume_content)
+
+    async def _tailor(self, base_resume_content: str, job_description: str, use_cache: bool) -> str:
+        if not use_cache or not self.cache_policy.allows(self.model, self.temperature):
+            self.cache.bypass()
+            return await self._generate(base_resume_content, job_description)
+
+        return await self.cache.get_or_compute(
+            self._cache_key(base_resume_content, job_description),
+            lambda: self._generate(base_resume_content, job_description),
+            model=self.model,
+        )
+
+    async def _generate(self, base_resume_content: str, job_description: str) -> str:
+        from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+        inputs = {
+            "resume": base_resume_content,
+            "job_description": job_description
+        }
+        tokens = self._estimate_call_tokens(base_resume_content, job_description)
+        usage = UsageMetadataCallbackHandler()
+        # It only sums counts under a lock; not inline, every chain event would hop to the default executor
+        usage.run_inline = True
+        attempts = 0
+
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            await self.rate_limiter.acquire(tokens)
+            return await self.chain.ainvoke(inputs, config={"callbacks": [usage]})
+
+        with span("llm.call", model=self.model, estimated_tokens=tokens) as llm_span:
+            try:
+                return await retry_on_rate_limit(call, max_retries=self.max_retries, base_seconds=self.retry_base_seconds)
+            finally:
+                llm_span.set(attempts=attempts, **self._record_usage(usage))
+
+    def _record_usage(self, usage) -> dict:
+        totals = {"input_tokens": 0, "output_tokens": 0}
+        for metadata in usage.usage_metadata.values():
+            for kind in totals:
+                totals[kind] += metadata.get(kind, 0)
+        for kind, count in totals.items():
+            if count:
+                LLM_TOKENS.inc(count, model=self.model, kind=kind.removesuffix("_tokens"))
+        return totals
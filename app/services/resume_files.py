@@ -0,0 +1,73 @@
+from typing import List
+from xml.sax.saxutils import escape
+import io
+import os
+import re
+import zipfile
+
+# The file name recruiters see on the application
+RESUME_FILENAME = os.getenv("FORM_RESUME_FILENAME", "Resume.docx")
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    "</Types>"
+)
+RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    "</Relationships>"
+)
+HEADING = re.compile(r"^#{1,6}\s+")
+BULLET = re.compile(r"^\s*[-*+]\s+")
+EMPHASIS = re.compile(r"\*\*|__")
+# Characters XML 1.0 can't carry at all
+INVALID_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _paragraph(text: str, bold: bool = False) -> str:
+    properties = "<w:rPr><w:b/></w:rPr>" if bold else ""
+    return f'<w:p><w:r>{properties}<w:t xml:space="preserve">{escape(INVALID_XML.sub("", text))}</w:t></w:r></w:p>'
+
+
+def resume_docx(content: str) -> bytes:
+    """
+    A minimal Word document (the format Easy Apply accepts besides PDF and
+    .doc) with one paragraph per line of the resume. Markdown headings are
+    set in bold and list items get a bullet; other markup is dropped.
+    """
+    paragraphs: List[str] = []
+    for line in content.splitlines():
+        line = EMPHASIS.sub("", line.rstrip())
+        if HEADING.match(line):
+            paragraphs.append(_paragraph(HEADING.sub("", line), bold=True))
+        elif BULLET.match(line):
+            paragraphs.append(_paragraph("• " + BULLET.sub("", line)))
+        else:
+            paragraphs.append(_paragraph(line))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        + "".join(paragraphs)
+        + "</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", RELATIONSHIPS)
+        archive.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def write_resume(content: str, directory: str, filename: str = RESUME_FILENAME) -> str:
+    """Writes the resume as a .docx into `directory` and returns its path, for a form's file input."""
+    path = os.path.join(directory, filename)
+    with open(path, "wb") as f:
+        f.write(resume_docx(content))
+    return path
@@ -0,0 +1,50 @@
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import Resume, content_hash
+
+
+async def add_base_resume(db: AsyncSession, content: str) -> Resume:
+    """Returns the stored base resume with this exact content, adding it if new (flushed, not committed)."""
+    existing = await db.scalar(
+        select(Resume)
+        .where(Resume.content_hash == content_hash(content), Resume.base_resume.is_(True), Resume.compressed.is_(None))
+        .order_by(Resume.id)
+        .limit(1)
+    )
+    if existing is not None:
+        return existing
+    resume = Resume(content=content, base_resume=True)
+    db.add(resume)
+    await db.flush()
+    return resume
+
+
+async def add_tailored_resumes(db: AsyncSession, base_content: str, contents: List[str]) -> List[Resume]:
+    """
+    Stores tailored variants of a base resume, in input order (flushed, not committed).
+
+    A variant whose content is already stored (by hash) is returned as is
+    instead of inserted again. New ones are linked to the base resume and
+    stored compressed against it.
+    """
+    base = await add_base_resume(db, base_content)
+    hashes = list({content_hash(content) for content in contents})
+    result = await db.execute(select(Resume).where(Resume.content_hash.in_(hashes)).order_by(Resume.id.desc()))
+    stored = {resume.content_hash: resume for resume in result.unique().scalars()}
+
+    resumes = []
+    for content in contents:
+        resume = stored.get(content_hash(content))
+        if resume is None:
+            resume = Resume(content=content, base_resume=False)
+            resume.compress_against(base)
+            db.add(resume)
+            stored[resume.content_hash] = resume
+        resumes.append(resume)
+    await db.flush()
+    return resumes
+
+
+async def add_tailored_resume(db: AsyncSession, base_content: str, content: str) -> Resume:
+    return (await add_tailored_resumes(db, base_content, [content]))[0]
@@ -1,13 +1,20 @@
 from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
 from ..models import Job
+from ..tracing import span
+from .urls import _is_linkedin
 from datetime import datetime
 
 class BaseScraper(ABC):
+    source = "unknown"
+
     @abstractmethod
     async def scrape_job(self, url: str) -> Job:
         pass
 
 class MockScraper(BaseScraper):
+    source = "mock"
+
     async def scrape_job(self, url: str) -> Job:
         # Simulate network delay
         import asyncio
@@ -25,8 +32,12 @@ class MockScraper(BaseScraper):
 class ScraperFactory:
     @staticmethod
     def get_scraper(url: str) -> BaseScraper:
-        if "linkedin.com" in url:
-            from .scrapers.linkedin import LinkedInScraper
-            return LinkedInScraper()
-        return MockScraper()
+        with span("scraper.get") as current:
+            if _is_linkedin(urlsplit(url.strip()).hostname or ""):
+                from .scrapers.linkedin import LinkedInScraper
+                scraper = LinkedInScraper()
+            else:
+                scraper = MockScraper()
+            current.set(scraper=type(scraper).__name__, scraper_source=scraper.source)
+            return scraper
 
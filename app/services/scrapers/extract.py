@@ -0,0 +1,251 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Selector cascade per field, most specific first. Only "tag" and "tag.class"
+# forms are used so every strategy can evaluate them natively.
+LINKEDIN_SELECTORS: Dict[str, List[str]] = {
+    "title": [
+        "h1.top-card-layout__title",
+        "h1.job-details-jobs-unified-top-card__job-title",
+        "h1", # Fallback
+    ],
+    "company": [
+        "a.topcard__org-name-link",
+        "div.top-card-layout__card", # Sometimes in a div
+    ],
+    "description": [
+        "div.show-more-less-html__markup",
+        "div.description__text",
+    ],
+}
+
+# Elements that start a new line in the extracted text, so descriptions keep
+# their paragraphs, headings and list items apart ("- " marks list items)
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+    "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "tr", "ul",
+})
+
+Fields = Dict[str, Optional[str]]
+
+
+def join_lines(parts: List[str]) -> str:
+    """Joins stripped text pieces and "\n" block markers into one line per block."""
+    return "\n".join(line.strip() for line in "".join(parts).split("\n") if line.strip())
+
+
+def open_block(tag: str, parts: List[str]) -> bool:
+    if tag not in BLOCK_TAGS:
+        return False
+    parts.append("\n- " if tag == "li" else "\n")
+    return True
+
+
+class Extractor(ABC):
+    """Pulls job fields out of a loaded Playwright page."""
+
+    name = "base"
+
+    def __init__(self, selectors: Optional[Dict[str, List[str]]] = None):
+        self.selectors = selectors or LINKEDIN_SELECTORS
+
+    @abstractmethod
+    async def extract(self, page) -> Fields:
+        pass
+
+
+class HtmlExtractor(Extractor):
+    """Serializes the page once and parses it in Python."""
+
+    async def extract(self, page) -> Fields:
+        return self.extract_html(await page.content())
+
+    def extract_html(self, html: str) -> Fields:
+        root = self.parse(html)
+        return {field: self.first_text(root, selectors) for field, selectors in self.selectors.items()}
+
+    @abstractmethod
+    def parse(self, html: str):
+        pass
+
+    @abstractmethod
+    def first_text(self, root, selectors: List[str]) -> Optional[str]:
+        pass
+
+
+class SoupExtractor(HtmlExtractor):
+    """The original BeautifulSoup + html.parser path (pure Python, slowest)."""
+
+    name = "soup"
+
+    def parse(self, html: str):
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, "html.parser")
+
+    def first_text(self, soup, selectors: List[str]) -> Optional[str]:
+        for selector in selectors:
+            tag, _, css_class = selector.partition(".")
+            found = soup.find(tag, class_=css_class) if css_class else soup.find(tag)
+            if found:
+                parts: List[str] = []
+                self._walk(found, parts)
+                return join_lines(parts)
+        return None
+
+    def _walk(self, tag, parts: List[str]):
+        from bs4 import NavigableString, Tag
+        block = open_block(tag.name, parts)
+        for child in tag.children:
+            if isinstance(child, Tag):
+                self._walk(child, parts)
+            elif type(child) is NavigableString: # Not comments, doctypes or CDATA
+                parts.append(child.strip())
+        if block:
+            parts.append("\n")
+
+
+class LxmlExtractor(HtmlExtractor):
+    name = "lxml"
+
+    def __init__(self, selectors: Optional[Dict[str, List[str]]] = None):
+        super().__init__(selectors)
+        from lxml import etree
+        self._xpaths = {selector: etree.XPath(self._to_xpath(selector)) for field in self.selectors.values() for selector in field}
+
+    @staticmethod
+    def _to_xpath(selector: str) -> str:
+        tag, _, css_class = selector.partition(".")
+        if not css_class:
+            return f"(//{tag})[1]"
+        return f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {css_class} ')])[1]"
+
+    def parse(self, html: str):
+        import lxml.html
+        return lxml.html.document_fromstring(html)
+
+    def first_text(self, root, selectors: List[str]) -> Optional[str]:
+        for selector in selectors:
+            found = self._xpaths[selector](root)
+            if found:
+                parts: List[str] = []
+                self._walk(found[0], parts)
+                return join_lines(parts)
+        return None
+
+    def _walk(self, element, parts: List[str]):
+        block = open_block(element.tag, parts)
+        parts.append((element.text or "").strip())
+        for child in element:
+            if isinstance(child.tag, str): # Comments and processing instructions have no text of their own
+                self._walk(child, parts)
+            parts.append((child.tail or "").strip())
+        if block:
+            parts.append("\n")
+
+
+class SelectolaxExtractor(HtmlExtractor):
+    name = "selectolax"
+
+    def __init__(self, selectors: Optional[Dict[str, List[str]]] = None):
+        super().__init__(selectors)
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str):
+        return self._parser(html)
+
+    def first_text(self, tree, selectors: List[str]) -> Optional[str]:
+        for selector in selectors:
+            found = tree.css_first(selector)
+            if found is not None:
+                parts: List[str] = []
+                self._walk(found, parts)
+                return join_lines(parts)
+        return None
+
+    def _walk(self, node, parts: List[str]):
+        block = open_block(node.tag, parts)
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                parts.append(child.text(deep=False).strip())
+            elif not child.tag.startswith("-"): # Comments
+                self._walk(child, parts)
+        if block:
+            parts.append("\n")
+
+
+# Runs the same selector cascade inside the page and returns only the field
+# texts, so the full document never crosses the CDP connection.
+EXTRACT_JS = """
+(selectors) => {
+    const blocks = new Set(%s);
+    const walk = (node, parts) => {
+        const tag = node.tagName.toLowerCase();
+        const block = blocks.has(tag);
+        if (block) parts.push(tag === "li" ? "\\n- " : "\\n");
+        for (const child of node.childNodes) {
+            if (child.nodeType === Node.TEXT_NODE) parts.push(child.nodeValue.trim());
+            else if (child.nodeType === Node.ELEMENT_NODE) walk(child, parts);
+        }
+        if (block) parts.push("\\n");
+    };
+    const text = (el) => {
+        const parts = [];
+        walk(el, parts);
+        return parts.join("").split("\\n").map(line => line.trim()).filter(Boolean).join("\\n");
+    };
+    const out = {};
+    for (const [field, cascade] of Object.entries(selectors)) {
+        out[field] = null;
+        for (const selector of cascade) {
+            const el = document.querySelector(selector);
+            if (el) { out[field] = text(el); break; }
+        }
+    }
+    return out;
+}
+""" % json.dumps(sorted(BLOCK_TAGS))
+
+
+class PageExtractor(Extractor):
+    """Evaluates selectors in the browser; falls back to an HTML parser if evaluation fails."""
+
+    name = "page"
+
+    def __init__(self, selectors: Optional[Dict[str, List[str]]] = None, fallback: Optional[HtmlExtractor] = None):
+        super().__init__(selectors)
+        self.fallback = fallback or html_extractor(selectors=self.selectors)
+
+    async def extract(self, page) -> Fields:
+        try:
+            return await page.evaluate(EXTRACT_JS, self.selectors)
+        except Exception as e:
+            logger.warning(f"In-page extraction failed, falling back to {self.fallback.name}: {e}")
+            return await self.fallback.extract(page)
+
+
+def html_extractor(name: Optional[str] = None, selectors: Optional[Dict[str, List[str]]] = None) -> HtmlExtractor:
+    """Returns the named HTML extractor, or the fastest one whose parser is installed."""
+    candidates = {"selectolax": SelectolaxExtractor, "lxml": LxmlExtractor, "soup": SoupExtractor}
+    if name:
+        return candidates[name](selectors)
+    for cls in candidates.values():
+        try:
+            return cls(selectors)
+        except ImportError:
+            continue
+    return SoupExtractor(selectors)
+
+
+def get_extractor(name: Optional[str] = None) -> Extractor:
+    """Extraction strategy from SCRAPER_EXTRACTOR: page (default), selectolax, lxml or soup."""
+    name = name or os.getenv("SCRAPER_EXTRACTOR", "page")
+    if name == "page":
+        return PageExtractor()
+    return html_extractor(name)
@@ -1,5 +1,10 @@
-from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from typing import Optional
+from ..browser import BrowserPool, get_browser_pool
+from ..page_profiles import PageProfile, SCRAPE_PROFILE
+from ..sessions import LINKEDIN_AUTH, SessionManager, SiteAuth, get_session_manager
+from ..politeness import HostTicket, PolitenessScheduler, get_scheduler
+from ...tracing import span
+from .extract import Extractor, get_extractor
 from ..scraper import BaseScraper
 from ...models import Job
 from datetime import datetime
@@ -7,69 +12,71 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
 class LinkedInScraper(BaseScraper):
-    async def scrape_job(self, url: str) -> Job:
-        async with async_playwright() as p:
-            # Launch browser (headless=True by default)
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = await context.new_page()
-            
-            try:
-                logger.info(f"Navigating to {url}")
-                await page.goto(url, timeout=60000)
-                
-                # Wait for key elements to load. 
-                # LinkedIn public job pages usually have a class like 'top-card-layout__title' or 'job-details-jobs-unified-top-card__job-title'
-                # We'll try a generic wait or check for title
-                await page.wait_for_selector("h1", timeout=10000)
-                
-                content = await page.content()
-                soup = BeautifulSoup(content, "html.parser")
-                
-                # Extract details (Selectors need to be robust or updated frequently)
-                # Strategy: Try multiple common selectors
-                
-                title = self._extract_title(soup)
-                company = self._extract_company(soup)
-                description = self._extract_description(soup)
-                
-                return Job(
-                    title=title or "Unknown Title",
-                    company=company or "Unknown Company",
-                    description=description or "No description found",
-                    url=url,
-                    source="linkedin",
-                    created_at=datetime.now()
-                )
-                
-            except Exception as e:
-                logger.error(f"Error scraping LinkedIn: {e}")
-                raise e
-            finally:
-                await browser.close()
+    source = "linkedin"
 
-    def _extract_title(self, soup: BeautifulSoup) -> str:
-        # Try common LinkedIn title classes
-        title_tag = soup.find("h1", class_="top-card-layout__title")
-        if not title_tag:
-            title_tag = soup.find("h1", class_="job-details-jobs-unified-top-card__job-title")
-        if not title_tag:
-             title_tag = soup.find("h1") # Fallback
-        return title_tag.get_text(strip=True) if title_tag else None
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        extractor: Optional[Extractor] = None,
+        profile: Optional[PageProfile] = None,
+        sessions: Optional[SessionManager] = None,
+        auth: Optional[SiteAuth] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+    ):
+        # Pages are leased from the shared browser pool instead of launching Chromium per job
+        self.pool = pool or get_browser_pool()
+        self.extractor = extractor or get_extractor()
+        # Text-only profile: images, fonts, media, styles and trackers are blocked
+        self.profile = profile or SCRAPE_PROFILE
+        # Logged-in contexts when LINKEDIN_USERNAME/LINKEDIN_PASSWORD are set, anonymous otherwise
+        self.sessions = sessions or (SessionManager(pool=pool, scheduler=scheduler) if pool else get_session_manager())
+        self.auth = auth or LINKEDIN_AUTH
+        # Per-host pacing shared with the submitter; taken before a browser page is leased
+        self.scheduler = scheduler or get_scheduler()
 
-    def _extract_company(self, soup: BeautifulSoup) -> str:
-        # Try common company classes
-        company_tag = soup.find("a", class_="topcard__org-name-link")
-        if not company_tag:
-             company_tag = soup.find("div", class_="top-card-layout__card") # Sometimes in a div
-        return company_tag.get_text(strip=True) if company_tag else None
+    async def scrape_job(self, url: str) -> Job:
+        try:
+            with span("scrape", source=self.source, url=url):
+                async with self.scheduler.slot(url) as ticket:
+                    return await self.sessions.run(
+                        self.auth,
+                        lambda page: self._scrape(page, url, ticket),
+                        profile=self.profile,
+                        ticket=ticket,
+                        user_agent=USER_AGENT,
+                    )
+        except Exception as e:
+            logger.error(f"Error scraping LinkedIn: {e}")
+            raise e
 
-    def _extract_description(self, soup: BeautifulSoup) -> str:
-        # Try common description classes
-        desc_tag = soup.find("div", class_="show-more-less-html__markup")
-        if not desc_tag:
-            desc_tag = soup.find("div", class_="description__text")
-        return desc_tag.get_text(strip=True) if desc_tag else None
+    async def _scrape(self, page, url: str, ticket: HostTicket) -> Job:
+        logger.info(f"Navigating to {url}")
+        with span("page.goto", url=url) as goto_span:
+            response = await page.goto(url, timeout=60000, wait_until=self.profile.wait_until)
+            goto_span.set(status=response.status if response is not None else None)
+        # 429/999/captcha: slow the host down and fail this attempt
+        ticket.check(response, page)
+        
+        # Wait for key elements to load. 
+        # LinkedIn public job pages usually have a class like 'top-card-layout__title' or 'job-details-jobs-unified-top-card__job-title'
+        # We'll try a generic wait or check for title
+        await page.wait_for_selector("h1", timeout=10000)
+        
+        # Only the needed fields come back (in-page by default, see SCRAPER_EXTRACTOR)
+        with span("extract", extractor=self.extractor.name):
+            fields = await self.extractor.extract(page)
+        title = fields.get("title")
+        company = fields.get("company")
+        description = fields.get("description")
+        
+        return Job(
+            title=title or "Unknown Title",
+            company=company or "Unknown Company",
+            description=description or "No description found",
+            url=url,
+            source=self.source,
+            created_at=datetime.now()
+        )
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from ..page_profiles import PageProfile, SCRAPE_PROFILE
+from ..politeness import HostTicket, PolitenessScheduler, get_scheduler
+from ..sessions import LINKEDIN_AUTH, SessionManager, SiteAuth, get_session_manager
+from ..urls import linkedin_job_id, normalize_url
+from ...models import Job
+from ...tracing import span
+from .linkedin import USER_AGENT
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Guest search pages list 25 cards and page with ?start=
+PAGE_SIZE = 25
+
+CARD_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' base-search-card ')]"
+FIELD_XPATHS = {
+    "link": ".//a[contains(@class, 'base-card__full-link')]/@href",
+    "title": ".//h3[contains(@class, 'base-search-card__title')]",
+    "company": ".//h4[contains(@class, 'base-search-card__subtitle')]",
+    "location": ".//span[contains(@class, 'job-search-card__location')]",
+    "listed": ".//time/@datetime",
+}
+
+
+@dataclass
+class JobCard:
+    """A posting as listed on a search result page."""
+    url: str # Normalized
+    title: str
+    company: str
+    location: str = ""
+    listed: str = ""
+
+    @property
+    def content_hash(self) -> str:
+        # Everything the card shows; LinkedIn bumps the listed date when a posting is edited or reposted
+        fields = (self.title, self.company, self.location, self.listed)
+        return hashlib.sha256("\x1f".join(fields).encode()).hexdigest()
+
+    def to_job(self) -> Job:
+        return Job(title=self.title, company=self.company, url=self.url, source="linkedin", content_hash=self.content_hash)
+
+
+def page_url(search_url: str, start: int) -> str:
+    """The search URL for the page starting at result `start`."""
+    parts = urlsplit(search_url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name != "start"]
+    if start:
+        query.append(("start", str(start)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def parse_search_page(html: str) -> List[JobCard]:
+    """Job cards on a search result page, in page order; cards without a job id are skipped."""
+    import lxml.html
+
+    root = lxml.html.document_fromstring(html)
+    cards = []
+    for element in root.xpath(CARD_XPATH):
+        urn = element.get("data-entity-urn") or ""
+        links = element.xpath(FIELD_XPATHS["link"])
+        job_id = urn.rsplit(":", 1)[-1] if urn.startswith("urn:li:jobPosting:") else (linkedin_job_id(links[0]) if links else None)
+        if not job_id:
+            continue
+
+        def text(field: str) -> str:
+            found = element.xpath(FIELD_XPATHS[field])
+            if not found:
+                return ""
+            value = found[0] if isinstance(found[0], str) else found[0].text_content()
+            return " ".join(value.split())
+
+        cards.append(JobCard(
+            url=normalize_url(f"https://www.linkedin.com/jobs/view/{job_id}/"),
+            title=text("title"),
+            company=text("company"),
+            location=text("location"),
+            listed=text("listed"),
+        ))
+    return cards
+
+
+class LinkedInSearchFetcher:
+    """Loads search result pages through the shared browser pool, sessions and politeness scheduler."""
+
+    def __init__(
+        self,
+        sessions: Optional[SessionManager] = None,
+        auth: Optional[SiteAuth] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+        profile: Optional[PageProfile] = None,
+    ):
+        self.sessions = sessions or get_session_manager()
+        self.auth = auth or LINKEDIN_AUTH
+        self.scheduler = scheduler or get_scheduler()
+        self.profile = profile or SCRAPE_PROFILE
+
+    async def fetch(self, url: str) -> str:
+        async with self.scheduler.slot(url) as ticket:
+            return await self.sessions.run(
+                self.auth,
+                lambda page: self._fetch(page, url, ticket),
+                profile=self.profile,
+                ticket=ticket,
+                user_agent=USER_AGENT,
+            )
+
+    async def _fetch(self, page, url: str, ticket: HostTicket) -> str:
+        with span("page.goto", url=url) as goto_span:
+            response = await page.goto(url, timeout=60000, wait_until=self.profile.wait_until)
+            goto_span.set(status=response.status if response is not None else None)
+        ticket.check(response, page)
+        return await page.content()
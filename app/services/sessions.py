@@ -0,0 +1,293 @@
+from contextlib import asynccontextmanager
+from cryptography.fernet import Fernet, InvalidToken
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from ..metrics import REGISTRY
+from .browser import BrowserPool, get_browser_pool
+from .page_profiles import PageProfile, SUBMIT_PROFILE
+from .politeness import HostTicket, PolitenessScheduler, get_scheduler, host_key
+from ..tracing import span
+import asyncio
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+SESSION_LOGINS = REGISTRY.counter("browser_session_logins_total", "Logins performed to create or refresh a session", ["site", "outcome"])
+SESSION_EXPIRED = REGISTRY.counter("browser_session_expired_total", "Leases that found their saved session expired", ["site"])
+
+SESSION_DIR = os.getenv("BROWSER_SESSION_DIR", "data/sessions")
+
+T = TypeVar("T")
+
+
+class LoginFailed(Exception):
+    """The site still looked logged out after submitting credentials."""
+
+
+class SessionExpired(Exception):
+    """The session was still expired right after a fresh login."""
+
+
+@dataclass(frozen=True)
+class SiteAuth:
+    """
+    How to log in to a site and how to tell that a session has expired.
+
+    A page counts as logged out when its URL contains one of
+    `expired_url_markers` (login walls are redirects) or, if set, when
+    `logged_out_selector` matches. Credentials come from
+    `<NAME>_USERNAME` / `<NAME>_PASSWORD`; the username is the account key.
+    """
+    name: str
+    login_url: str
+    username_selector: str = "#username"
+    password_selector: str = "#password"
+    submit_selector: str = "button[type=submit]"
+    expired_url_markers: Tuple[str, ...] = ("/login",)
+    logged_out_selector: Optional[str] = None
+
+    def credentials(self) -> Optional[Tuple[str, str]]:
+        prefix = self.name.upper()
+        username = os.getenv(f"{prefix}_USERNAME")
+        password = os.getenv(f"{prefix}_PASSWORD")
+        if not username or not password:
+            return None
+        return username, password
+
+    async def is_expired(self, page) -> bool:
+        if any(marker in page.url for marker in self.expired_url_markers):
+            return True
+        if self.logged_out_selector:
+            return await page.locator(self.logged_out_selector).count() > 0
+        return False
+
+    async def login(self, page, username: str, password: str):
+        await page.goto(self.login_url, wait_until="domcontentloaded")
+        await page.fill(self.username_selector, username)
+        await page.fill(self.password_selector, password)
+        async with page.expect_navigation(wait_until="domcontentloaded"):
+            await page.click(self.submit_selector)
+        if await self.is_expired(page):
+            raise LoginFailed(f"Login to {self.name} as {username} did not succeed (at {page.url})")
+
+
+LINKEDIN_AUTH = SiteAuth(
+    name="linkedin",
+    login_url="https://www.linkedin.com/login",
+    username_selector="#username",
+    password_selector="#password",
+    submit_selector="button[type=submit]",
+    # /checkpoint challenges are throttling, not expiry (see politeness.py); logging in again won't help
+    expired_url_markers=("/login", "/authwall", "/uas/login"),
+)
+
+
+class SessionStore:
+    """
+    Playwright `storage_state` per (site, account), Fernet-encrypted on disk.
+
+    The key comes from BROWSER_SESSION_KEY. Without it a key is generated
+    into `<directory>/.key` (owner-only), which protects against copying
+    the state files alone but not the whole directory.
+    """
+
+    def __init__(self, directory: str = SESSION_DIR, key: Optional[bytes] = None):
+        self.directory = Path(directory)
+        self._fernet = Fernet(key or self._load_key())
+
+    def _load_key(self) -> bytes:
+        key = os.getenv("BROWSER_SESSION_KEY")
+        if key:
+            return key.encode()
+        key_path = self.directory / ".key"
+        if key_path.exists():
+            return key_path.read_bytes().strip()
+        logger.warning(f"BROWSER_SESSION_KEY is not set; generating a local key at {key_path}")
+        key = Fernet.generate_key()
+        self._write(key_path, key)
+        return key
+
+    def _write(self, path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        tmp_path.replace(path)
+
+    def path(self, site: str, account: str) -> Path:
+        # Hashed so usernames/emails don't show up in file names
+        digest = hashlib.sha256(f"{site}\0{account}".encode()).hexdigest()[:24]
+        return self.directory / f"{site}-{digest}.state"
+
+    def load(self, site: str, account: str) -> Optional[dict]:
+        path = self.path(site, account)
+        try:
+            return json.loads(self._fernet.decrypt(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+        except (InvalidToken, ValueError):
+            logger.warning(f"Ignoring unreadable session state {path} (wrong key or corrupted)")
+            return None
+
+    def save(self, site: str, account: str, state: dict):
+        self._write(self.path(site, account), self._fernet.encrypt(json.dumps(state).encode()))
+
+    def delete(self, site: str, account: str):
+        self.path(site, account).unlink(missing_ok=True)
+
+
+class SessionManager:
+    """
+    Hands out pages whose browser context is already logged in.
+
+    The saved state is passed as the context's `storage_state`, and the pool
+    keeps one authenticated context per (site, account) warm across leases,
+    replacing it when a login changes the state.
+    When a lease lands on a login wall the session is refreshed (one login per
+    account even under concurrency) and the work is retried once.
+
+    Logins and retries are navigations too: they take a token from the
+    caller's host ticket, or a slot of their own, from the politeness
+    scheduler.
+    """
+
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        store: Optional[SessionStore] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+    ):
+        self.pool = pool or get_browser_pool()
+        self._store = store
+        self.scheduler = scheduler or get_scheduler()
+        self._states: Dict[Tuple[str, str], dict] = {}
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @property
+    def store(self) -> SessionStore:
+        # Created on first use so anonymous runs never touch the key or directory
+        if self._store is None:
+            self._store = SessionStore()
+        return self._store
+
+    async def run(
+        self,
+        auth: SiteAuth,
+        work: Callable[..., Awaitable[T]],
+        profile: Optional[PageProfile] = None,
+        ticket: Optional[HostTicket] = None,
+        **context_options,
+    ) -> T:
+        """
+        Runs `work(page)` on a page logged in to `auth`'s site.
+
+        `ticket` is the scheduler slot the caller holds for the work's URL;
+        a login or retry takes another token from it instead of queueing for
+        a second slot. Without configured credentials the page is anonymous,
+        exactly as a plain pool lease would be.
+        """
+        credentials = auth.credentials()
+        if credentials is None:
+            async with self.pool.page(profile=profile, **context_options) as page:
+                return await work(page)
+
+        account = credentials[0]
+        state = await self.state(auth, credentials, ticket=ticket)
+        for attempt in range(2):
+            async with self.pool.page(profile=profile, session=f"{auth.name}:{account}", storage_state=state, **context_options) as page:
+                try:
+                    result = await work(page)
+                except Exception:
+                    if not await self._expired(auth, page):
+                        raise
+                else:
+                    if not await self._expired(auth, page):
+                        return result
+            SESSION_EXPIRED.inc(site=auth.name)
+            if attempt:
+                break
+            logger.info(f"{auth.name} session for {account} expired, logging in again")
+            state = await self.refresh(auth, credentials, stale=state, ticket=ticket)
+            if ticket is not None:
+                # The retry is another request to the host
+                await ticket.renew()
+        raise SessionExpired(f"{auth.name} session for {account} expired right after logging in")
+
+    async def _expired(self, auth: SiteAuth, page) -> bool:
+        try:
+            return await auth.is_expired(page)
+        except Exception:
+            # A crashed or closed page can't be inspected; let the original outcome stand
+            return False
+
+    async def state(self, auth: SiteAuth, credentials: Tuple[str, str], ticket: Optional[HostTicket] = None) -> dict:
+        """Current state for the account: memory, then disk, then a fresh login."""
+        key = (auth.name, credentials[0])
+        state = self._states.get(key)
+        if state is None:
+            state = self.store.load(*key)
+            if state is None:
+                return await self.refresh(auth, credentials, ticket=ticket)
+            self._states[key] = state
+        return state
+
+    async def refresh(
+        self,
+        auth: SiteAuth,
+        credentials: Tuple[str, str],
+        stale: Optional[dict] = None,
+        ticket: Optional[HostTicket] = None,
+    ) -> dict:
+        """Logs in again and saves the new state, unless another caller already replaced `stale`."""
+        key = (auth.name, credentials[0])
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            current = self._states.get(key)
+            if current is not None and current is not stale:
+                return current
+
+            # A dedicated anonymous context, cleared afterwards so its cookies don't linger
+            async with self._login_slot(auth, ticket) as login_ticket, \
+                    self.pool.page(profile=SUBMIT_PROFILE, storage_state=None) as page:
+                try:
+                    with span("session.login", site=auth.name):
+                        await auth.login(page, *credentials)
+                    # A login that lands on a captcha/checkpoint slows the host down
+                    login_ticket.check(None, page)
+                    state = await page.context.storage_state()
+                except Exception:
+                    SESSION_LOGINS.inc(site=auth.name, outcome="failed")
+                    raise
+                finally:
+                    await page.context.clear_cookies()
+            SESSION_LOGINS.inc(site=auth.name, outcome="ok")
+
+            self.store.save(*key, state)
+            self._states[key] = state
+            return state
+
+    @asynccontextmanager
+    async def _login_slot(self, auth: SiteAuth, ticket: Optional[HostTicket]):
+        if ticket is not None and ticket.host == host_key(auth.login_url):
+            # Queueing for a second slot on a host we already hold one for could deadlock
+            await ticket.renew()
+            yield ticket
+        else:
+            async with self.scheduler.slot(auth.login_url) as login_ticket:
+                yield login_ticket
+
+    def forget(self, auth: SiteAuth, account: str):
+        """Drops a saved session (e.g. after a password change)."""
+        self._states.pop((auth.name, account), None)
+        self.store.delete(auth.name, account)
+
+
+session_manager = SessionManager()
+
+
+def get_session_manager() -> SessionManager:
+    return session_manager
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
 from ..models import Application, ApplicationStatus
-from playwright.async_api import async_playwright
+from .browser import BrowserPool, get_browser_pool
+from .form_plans import EasyApplyForm, FormFailed, get_easy_apply_form
+from .page_profiles import PageProfile, SUBMIT_PROFILE
+from .sessions import LINKEDIN_AUTH, SessionManager, SiteAuth, get_session_manager
+from .politeness import HostTicket, PolitenessScheduler, get_scheduler
+from .resume_files import write_resume
+from ..tracing import span
+from typing import Optional
 import logging
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -11,54 +19,78 @@ class BaseSubmitter(ABC):
         pass
 
 class LinkedInSubmitter(BaseSubmitter):
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        profile: Optional[PageProfile] = None,
+        sessions: Optional[SessionManager] = None,
+        auth: Optional[SiteAuth] = None,
+        scheduler: Optional[PolitenessScheduler] = None,
+        form: Optional[EasyApplyForm] = None,
+    ):
+        self.pool = pool or get_browser_pool()
+        # Keeps scripts, styles and images the application form needs; only trackers are blocked
+        self.profile = profile or SUBMIT_PROFILE
+        # Saved, encrypted login state per account (see app/services/sessions.py)
+        self.sessions = sessions or (SessionManager(pool=pool, scheduler=scheduler) if pool else get_session_manager())
+        self.auth = auth or LINKEDIN_AUTH
+        self.scheduler = scheduler or get_scheduler()
+        # Replays recorded form plans; explores (and records) forms it hasn't seen
+        self.form = form or get_easy_apply_form()
+
     async def submit_application(self, application: Application) -> ApplicationStatus:
         logger.info(f"Starting LinkedIn submission for Job {application.job_id}")
         
-        async with async_playwright() as p:
-            # Launch browser (headless=False useful for debugging auth)
-            browser = await p.chromium.launch(headless=True) 
-            context = await browser.new_context()
-            page = await context.new_page()
-            
-            try:
-                # 1. Login (Placeholder - assumes cookies or manual login for now)
-                # In a real scenario, we'd load cookies from a file or env
-                # await context.add_cookies(...)
-                
-                # 2. Navigate to Job URL
-                if not application.job or not application.job.url:
-                    logger.error("Job URL missing")
-                    return ApplicationStatus.FAILED
-                
-                await page.goto(application.job.url)
-                
-                # 3. Click "Easy Apply" (Placeholder selector)
-                # easy_apply_button = page.locator("button.jobs-apply-button")
-                # if await easy_apply_button.is_visible():
-                #     await easy_apply_button.click()
-                #     # ... fill form ...
-                # else:
-                #     logger.warning("Easy Apply not found")
-                #     return ApplicationStatus.FAILED
+        if not application.job or not application.job.url:
+            logger.error("Job URL missing")
+            return ApplicationStatus.FAILED
+
+        # Page comes from the shared browser pool, already logged in when credentials are
+        # configured (BROWSER_HEADLESS=0 is useful for debugging auth)
+        try:
+            async with self.scheduler.slot(application.job.url) as ticket:
+                return await self.sessions.run(
+                    self.auth,
+                    lambda page: self._submit(page, application, ticket),
+                    profile=self.profile,
+                    ticket=ticket,
+                )
+        except Exception as e:
+            logger.error(f"Submission failed: {e}")
+            return ApplicationStatus.FAILED
 
-                # For now, just simulate success
-                logger.info("Simulating successful submission")
-                return ApplicationStatus.SUBMITTED
-                
-            except Exception as e:
-                logger.error(f"Submission failed: {e}")
-                return ApplicationStatus.FAILED
-            finally:
-                await browser.close()
+    async def _submit(self, page, application: Application, ticket: HostTicket) -> ApplicationStatus:
+        # 1. Navigate to Job URL (an expired session redirects to the login wall and is refreshed)
+        with span("page.goto", url=application.job.url) as goto_span:
+            response = await page.goto(application.job.url, wait_until=self.profile.wait_until)
+            goto_span.set(status=response.status if response is not None else None)
+        ticket.check(response, page)
+        
+        # 2. Open Easy Apply and walk its steps (see app/services/form_plans.py), uploading the
+        #    tailored resume in place of the one LinkedIn has on file
+        content = application.resume.content if application.resume else None
+        try:
+            with tempfile.TemporaryDirectory(prefix="resume-") as directory:
+                resume_path = write_resume(content, directory) if content else None
+                run = await self.form.complete(page, resume_path=resume_path)
+        except FormFailed as e:
+            logger.warning(f"Easy Apply failed for Job {application.job_id}: {e}")
+            return ApplicationStatus.FAILED
+        logger.info(f"Submitted application for Job {application.job_id} (form plan {run.result})")
+        return ApplicationStatus.SUBMITTED
 
 class ApplicationSubmitter:
     def __init__(self):
         self.linkedin_submitter = LinkedInSubmitter()
 
     async def submit_application(self, application: Application) -> ApplicationStatus:
-        # Route to correct submitter based on Job Source
-        if application.job and "linkedin" in application.job.source.lower():
-            return await self.linkedin_submitter.submit_application(application)
-        
-        # Default/Mock behavior
-        return ApplicationStatus.SUBMITTED
+        source = application.job.source if application.job else "unknown"
+        with span("submit", source=source, application_id=application.id) as submit_span:
+            # Route to correct submitter based on Job Source
+            if application.job and "linkedin" in application.job.source.lower():
+                status = await self.linkedin_submitter.submit_application(application)
+            else:
+                # Default/Mock behavior
+                status = ApplicationStatus.SUBMITTED
+            submit_span.set(status=status.value)
+            return status
@@ -0,0 +1,65 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import re
+
+# Query parameters that only track where a click came from, on any host
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid"}
+TRACKING_PREFIXES = ("utm_", "mc_")
+# LinkedIn's own click tracking; on other hosts names like `position` or `ref` can identify the posting
+LINKEDIN_TRACKING_PARAMS = {
+    "trk", "trkinfo", "trackingid", "refid", "lipi", "midtoken", "midsig", "eba", "ebp",
+    "recommendedflavor", "position", "pagenum", "originalsubdomain", "ref", "src",
+}
+
+LINKEDIN_VIEW_RE = re.compile(r"^/jobs/view/(?:[^/]*?-)?(\d+)/?$")
+LINKEDIN_JOB_ID_PARAMS = ("currentjobid",)
+
+
+def _is_linkedin(host: str) -> bool:
+    return host == "linkedin.com" or host.endswith(".linkedin.com")
+
+
+def _is_tracking(name: str, host: str) -> bool:
+    name = name.lower()
+    if name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES):
+        return True
+    return _is_linkedin(host) and name in LINKEDIN_TRACKING_PARAMS
+
+
+def linkedin_job_id(url: str):
+    """Returns the numeric LinkedIn job id for any of the common job URL forms, or None."""
+    parts = urlsplit(url.strip())
+    if not _is_linkedin(parts.hostname or ""):
+        return None
+    match = LINKEDIN_VIEW_RE.match(parts.path)
+    if match:
+        return match.group(1)
+    for name, value in parse_qsl(parts.query):
+        if name.lower() in LINKEDIN_JOB_ID_PARAMS and value.isdigit():
+            return value
+    return None
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a job URL, used as the dedup key in the `jobs` table.
+
+    LinkedIn postings collapse to https://www.linkedin.com/jobs/view/<id>/ whether
+    they came from a slugged view URL, a search page (?currentJobId=) or a
+    country subdomain. Other URLs keep their path but lose fragments, default
+    ports and tracking parameters (LinkedIn's own only on
+    linkedin.com), and get a stable query-parameter order.
+    """
+    url = url.strip()
+    job_id = linkedin_job_id(url)
+    if job_id:
+        return f"https://www.linkedin.com/jobs/view/{job_id}/"
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    hostname = (parts.hostname or "").lower()
+    host = hostname
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k, hostname)))
+    return urlunsplit((scheme, host, parts.path, query, ""))
@@ -0,0 +1,204 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+from .metrics import REGISTRY
+import json
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+
+# OpenTelemetry-style spans without the SDK: nested spans share a trace id,
+# every finished span is handed to the configured exporters, and its duration
+# feeds the per-stage latency histogram (so /metrics and traces agree).
+
+logger = logging.getLogger(__name__)
+
+STAGE_LATENCY = REGISTRY.histogram("stage_duration_seconds", "Latency of pipeline stages", ["stage", "source"])
+STAGE_IN_FLIGHT = REGISTRY.gauge("stage_in_flight", "Pipeline stages currently running", ["stage", "source"])
+STAGE_ERRORS = REGISTRY.counter("stage_errors_total", "Pipeline stages that raised", ["stage", "source"])
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, source: str = "", parent: Optional["Span"] = None, **attributes):
+        self.name = name
+        self.source = source or (parent.source if parent else "")
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, object] = dict(attributes)
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self.duration: Optional[float] = None
+        self._started = time.perf_counter()
+        STAGE_IN_FLIGHT.inc(stage=name, source=self.source)
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"
+            STAGE_ERRORS.inc(stage=self.name, source=self.source)
+        STAGE_IN_FLIGHT.dec(stage=self.name, source=self.source)
+        STAGE_LATENCY.observe(self.duration, stage=self.name, source=self.source)
+        for exporter in _exporters:
+            try:
+                exporter.export(self)
+            except Exception as e:
+                logger.warning(f"Span exporter {type(exporter).__name__} failed: {e}")
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "source": self.source,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class ConsoleExporter:
+    """One JSON line per span on stderr."""
+
+    def export(self, span: Span):
+        print(json.dumps(span.to_dict(), default=str), file=sys.stderr)
+
+
+class FileExporter:
+    """Appends one JSON line per span to `path`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list; for tests and benchmarks."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def names(self) -> List[str]:
+        return [span.name for span in self.spans]
+
+
+def exporters_from_env() -> list:
+    exporters = []
+    for name in os.getenv("TRACING_EXPORTER", "").split(","):
+        name = name.strip().lower()
+        if name == "console":
+            exporters.append(ConsoleExporter())
+        elif name == "file":
+            exporters.append(FileExporter(os.getenv("TRACING_FILE", "traces.jsonl")))
+        elif name:
+            logger.warning(f"Unknown TRACING_EXPORTER {name!r}, ignored")
+    return exporters
+
+
+_exporters: list = exporters_from_env()
+
+
+def add_exporter(exporter):
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter):
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, source: str = "", **attributes) -> Span:
+    """A child of the current span that the caller must finish(); it does not become current."""
+    return Span(name, source=source, parent=_current.get(), **attributes)
+
+
+@contextmanager
+def span(name: str, source: str = "", **attributes) -> Iterator[Span]:
+    """
+    Times a block as a span nested under the current one.
+
+    Usable from sync and async code alike; `source` (e.g. "linkedin") labels
+    the latency histogram and is inherited by child spans.
+    """
+    current = start_span(name, source=source, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.finish(error=e)
+        raise
+    else:
+        current.finish()
+    finally:
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Exited from another context (e.g. an async generator closed by a different task)
+            pass
+
+
+HTTP_LATENCY = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency until the response started", ["method", "route", "status"])
+HTTP_IN_FLIGHT = REGISTRY.gauge("http_requests_in_flight", "HTTP requests being handled", ["method"])
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: one root span per HTTP request plus request metrics.
+
+    Labels use the matched route template (e.g. /tasks/{task_id}), not the raw
+    path, to keep metric cardinality bounded. Plain ASGI rather than
+    BaseHTTPMiddleware so streaming responses and disconnects pass through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                HTTP_LATENCY.observe(time.perf_counter() - started, method=method, route=route, status=str(status["code"]))
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        try:
+            with span("http.request", method=method, path=scope["path"]) as request_span:
+                await self.app(scope, receive, send_wrapper)
+                request_span.set(route=getattr(scope.get("route"), "path", None), status=status["code"])
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method)
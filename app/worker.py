@@ -0,0 +1,168 @@
+"""
+Background worker that drains the `tasks` table.
+
+Run it next to the API process:
+
+    python -m app.worker --concurrency 4
+"""
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional
+from sqlalchemy import select
+from .database import AsyncSessionLocal, init_db
+from .models import Application, ApplicationStatus, Task
+from .services import queue
+from .services.applications import with_job_and_resume
+from .services.discovery import get_crawler
+from .services.job_description import tokenizer
+from .services.job_store import save_job
+from .services.scraper import ScraperFactory
+from .services.submitter import ApplicationSubmitter
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Awaitable[Optional[dict]]]
+
+submitter = ApplicationSubmitter()
+
+
+class TaskFailed(Exception):
+    """Raised by handlers for a failed attempt that should be retried."""
+
+
+async def handle_submit_application(payload: dict) -> dict:
+    async with AsyncSessionLocal() as db:
+        # Load the job and resume up front: submitters read both (the resume is uploaded),
+        # and lazy loads can't run on an AsyncSession
+        result = await db.execute(
+            with_job_and_resume(select(Application).where(Application.id == payload["application_id"]), resume_content=True)
+        )
+        application = result.scalars().first()
+        if application is None:
+            raise TaskFailed(f"Application {payload['application_id']} not found")
+
+        status = await submitter.submit_application(application)
+        application.status = status
+        if status == ApplicationStatus.SUBMITTED:
+            application.submitted_at = datetime.now()
+        await db.commit()
+
+        if status == ApplicationStatus.FAILED:
+            raise TaskFailed(f"Submission failed for application {application.id}")
+        return {"application_id": application.id, "status": status}
+
+
+async def handle_scrape_job(payload: dict) -> dict:
+    url = payload["url"]
+    scraper = ScraperFactory.get_scraper(url)
+    job = await scraper.scrape_job(url)
+    async with AsyncSessionLocal() as db:
+        db_job = await save_job(db, job)
+        return {"job_id": db_job.id}
+
+
+async def handle_discover_search(payload: dict) -> dict:
+    result = await get_crawler().run(payload["search_id"])
+    return result.to_dict()
+
+
+HANDLERS: Dict[str, Handler] = {
+    "submit_application": handle_submit_application,
+    "scrape_job": handle_scrape_job,
+    "discover_search": handle_discover_search,
+}
+
+
+class Worker:
+    def __init__(
+        self,
+        handlers: Optional[Dict[str, Handler]] = None,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ):
+        self.handlers = handlers or HANDLERS
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", "4"))
+        self.lease_seconds = lease_seconds or queue.DEFAULT_LEASE_SECONDS
+        self.poll_interval = poll_interval or float(os.getenv("WORKER_POLL_INTERVAL", "1.0"))
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    async def _claim(self, limit: int):
+        async with AsyncSessionLocal() as db:
+            return await queue.claim(db, self.worker_id, limit=limit, kinds=self.handlers.keys(), lease_seconds=self.lease_seconds)
+
+    async def _heartbeat(self, task: Task):
+        # Keep the lease alive while a long browser job is running
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            async with AsyncSessionLocal() as db:
+                await queue.extend_lease(db, task, self.worker_id, self.lease_seconds)
+
+    async def execute(self, task: Task):
+        logger.info(f"Running task {task.id} ({task.kind}), attempt {task.attempts}/{task.max_attempts}")
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        try:
+            result = await self.handlers[task.kind](task.payload)
+        except Exception as e:
+            logger.error(f"Task {task.id} ({task.kind}) failed: {e}")
+            async with AsyncSessionLocal() as db:
+                await queue.fail(db, task, self.worker_id, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        async with AsyncSessionLocal() as db:
+            await queue.complete(db, task, self.worker_id, result)
+
+    async def run_once(self) -> int:
+        """Claims one batch of runnable tasks, runs them concurrently and returns how many ran."""
+        tasks = await self._claim(self.concurrency)
+        await asyncio.gather(*(self.execute(task) for task in tasks))
+        return len(tasks)
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        stop = stop or asyncio.Event()
+        running = set()
+        logger.info(f"Worker {self.worker_id} started (concurrency={self.concurrency})")
+        while not stop.is_set():
+            free = self.concurrency - len(running)
+            if free > 0:
+                for task in await self._claim(free):
+                    running.add(asyncio.create_task(self.execute(task)))
+            if running:
+                done, running = await asyncio.wait(running, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        if running:
+            await asyncio.wait(running)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the AI Job Agent task worker")
+    parser.add_argument("--concurrency", type=int, default=None, help="Max tasks running at once")
+    parser.add_argument("--once", action="store_true", help="Drain one batch of runnable tasks and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    # Before the loop starts: scraped descriptions are condensed as they are saved
+    tokenizer.load()
+    worker = Worker(concurrency=args.concurrency)
+    if args.once:
+        asyncio.run(worker.run_once())
+    else:
+        asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+End-to-end load benchmark: scrape → tailor → submit through the FastAPI app.
+
+Runs the app in-process, with its lifespan, browser pool and an in-process
+task worker. The job pages come from a local fixture site (see fixture_site.py)
+and the LLM is the deterministic FakeChatModel with `--llm-latency`. Each
+simulated user runs the full pipeline for one job:
+
+    POST /jobs/scrape → POST /resumes/tailor → GET /jobs?q= → GET /jobs/ranked
+    → POST /applications/submit → poll GET /tasks/{task_id}
+
+`--concurrency` users do this at once. The run reports jobs/sec, p50/p95/p99
+per endpoint and per pipeline stage, peak RSS of the process tree
+(Chromium included), and browser launches and peak running browsers.
+Without a Playwright Chromium install, the fixture pages are fetched and
+parsed in Python, then stored through POST /jobs:bulk instead, and the
+report says so.
+
+    python -m benchmarks.e2e --jobs 200 --concurrency 8 --json results.json
+    python -m benchmarks.e2e --jobs 200 --concurrency 8 --baseline benchmarks/baseline_e2e.json
+
+With `--baseline`, the exit status is 1 when throughput, a p95 or peak RSS
+regresses by more than `--tolerance`. `--save-baseline` stores the results.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sys
+import time
+
+from benchmarks.fixture_site import FixtureSite, job_url
+
+DEFAULT_DB = "bench_e2e.db"
+FIRST_JOB_ID = 4100000000
+BASE_RESUME = (
+    "Jane Doe\nBackend engineer, 7 years.\n"
+    "Built streaming pipelines on kafka and postgres, ran services on kubernetes and aws.\n"
+    "Python, golang, terraform. Led on-call and observability work.\n"
+)
+SEARCH_TERMS = ["python", "kubernetes", "kafka remote", "terraform aws", "golang"]
+
+
+def configure_env(args):
+    """Everything the app reads at import time; must run before `app` is imported."""
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///./{DEFAULT_DB}")
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["BROWSER_POOL_SIZE"] = str(args.browsers)
+    # The benchmark measures our code, not politeness towards a host we own
+    os.environ.setdefault("POLITENESS_REQUESTS_PER_MINUTE", "1000000")
+    os.environ.setdefault("POLITENESS_BURST", "1000000")
+    os.environ.setdefault("POLITENESS_MAX_IN_FLIGHT_PER_HOST", str(args.browsers))
+    os.environ.setdefault("RANKING_INDEX_PATH", "")
+    # Answers for the fixture job pages' Easy Apply form
+    os.environ.setdefault("FORM_ANSWERS_PATH", str(Path(__file__).resolve().parent / "fixtures" / "easy_apply_answers.json"))
+    if os.environ["DATABASE_URL"] == f"sqlite:///./{DEFAULT_DB}":
+        # Start from an empty default database so runs are comparable
+        Path(DEFAULT_DB).unlink(missing_ok=True)
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(timings: List[float], errors: int = 0) -> dict:
+    ordered = sorted(timings)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+def process_tree_rss(pid: int) -> int:
+    """Resident bytes of `pid` and all its descendants (Linux /proc); 0 elsewhere."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return 0
+    children: Dict[int, List[int]] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            statm = (entry / "statm").read_text()
+        except OSError:
+            continue # Exited while we looked
+        # The command name may contain spaces; fields after it are fixed
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+        rss_pages[int(entry.name)] = int(statm.split()[1])
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+class Recorder:
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, ok: bool = True):
+        self.timings.setdefault(name, []).append(seconds)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self) -> dict:
+        return {name: summarize(timings, self.errors.get(name, 0)) for name, timings in sorted(self.timings.items())}
+
+
+class Sampler:
+    """Polls process-tree RSS and the browser pool while the load runs."""
+
+    def __init__(self, pool, interval: float = 0.25):
+        self.pool = pool
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_browsers = 0
+
+    def sample(self):
+        self.peak_rss = max(self.peak_rss, process_tree_rss(os.getpid()))
+        self.peak_browsers = max(self.peak_browsers, self.pool.stats()["browsers_running"])
+
+    async def run(self, stop: asyncio.Event):
+        while not stop.is_set():
+            self.sample()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+        self.sample()
+
+
+async def chromium_available() -> bool:
+    try:
+        from playwright.async_api import async_playwright
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            await browser.close()
+        return True
+    except Exception as e:
+        print(f"Chromium unavailable ({type(e).__name__}); fetching fixture pages without a browser", file=sys.stderr)
+        return False
+
+
+async def run(args) -> dict:
+    import httpx
+    from app.database import init_db
+    from app.main import app
+    from app.services.browser import browser_pool
+    from app.services.scrapers.extract import SelectolaxExtractor
+    from app.tracing import STAGE_LATENCY
+    from app.worker import Worker
+
+    use_browser = not args.no_browser and await chromium_available()
+    init_db() # The lifespan does this too, but it only runs in browser mode
+    recorder = Recorder()
+    completed = failed = 0
+
+    async def call(client, label: str, method: str, url: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            recorder.add(label, time.perf_counter() - started, ok=False)
+            raise
+        recorder.add(label, time.perf_counter() - started, ok=response.status_code < 400)
+        response.raise_for_status()
+        return response.json()
+
+    async def stage(name: str, work):
+        started = time.perf_counter()
+        try:
+            return await work
+        finally:
+            recorder.add(f"stage {name}", time.perf_counter() - started)
+
+    with FixtureSite(latency=args.page_latency) as site:
+        browser_pool.launch_args = site.chromium_args()
+        extractor = SelectolaxExtractor()
+        fetcher = httpx.AsyncClient(verify=False, timeout=30)
+
+        async def ingest(client, job_id: int) -> dict:
+            if use_browser:
+                return await call(client, "POST /jobs/scrape", "POST", "/jobs/scrape", json={"url": job_url(job_id), "force": True})
+            # Same page bytes, parsed in Python instead of by the scraper's browser
+            page = await fetcher.get(f"{site.base_url}/jobs/view/{job_id}/")
+            fields = extractor.extract_html(page.text)
+            record = {**fields, "url": job_url(job_id), "source": "fixture"}
+            result = await call(client, "POST /jobs:bulk", "POST", "/jobs:bulk", json=[record])
+            return {"id": result["ids"][job_url(job_id)], "description": fields["description"]}
+
+        async def submit(client, job_id: int, resume_id: int) -> bool:
+            task = await call(client, "POST /applications/submit", "POST", "/applications/submit", json={"job_id": job_id, "resume_id": resume_id})
+            while True:
+                status = await call(client, "GET /tasks/{task_id}", "GET", f"/tasks/{task['task_id']}")
+                if status["status"] in ("succeeded", "dead"):
+                    return status["status"] == "succeeded"
+                await asyncio.sleep(args.poll_interval)
+
+        async def pipeline(client, job_id: int):
+            nonlocal completed, failed
+            started = time.perf_counter()
+            try:
+                job = await stage("scrape", ingest(client, job_id))
+                resume = await stage("tailor", call(
+                    client, "POST /resumes/tailor", "POST", "/resumes/tailor",
+                    json={"base_resume": BASE_RESUME, "job_description": job["description"], "use_cache": False},
+                ))
+                await call(client, "GET /jobs?q=", "GET", "/jobs", params={"q": SEARCH_TERMS[job_id % len(SEARCH_TERMS)], "limit": 20})
+                await call(client, "GET /jobs/ranked", "GET", "/jobs/ranked", params={"resume_id": resume["id"], "top_k": 20})
+                ok = await stage("submit", submit(client, job["id"], resume["id"]))
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Pipeline for job {job_id} failed: {e}")
+                ok = False
+            recorder.add("pipeline", time.perf_counter() - started, ok=ok)
+            if ok:
+                completed += 1
+            else:
+                failed += 1
+
+        async def user(client, job_ids: asyncio.Queue):
+            while not job_ids.empty():
+                await pipeline(client, job_ids.get_nowait())
+
+        launches_before = STAGE_LATENCY.count(stage="browser.launch", source="")
+        stop = asyncio.Event()
+        sampler = Sampler(browser_pool)
+        worker = Worker(concurrency=args.concurrency, poll_interval=args.poll_interval)
+
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app) if use_browser else _no_lifespan(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+                background = [asyncio.create_task(sampler.run(stop)), asyncio.create_task(worker.run(stop))]
+                job_ids = asyncio.Queue()
+                for i in range(args.jobs):
+                    job_ids.put_nowait(FIRST_JOB_ID + i)
+                started = time.perf_counter()
+                await asyncio.gather(*(user(client, job_ids) for _ in range(args.concurrency)))
+                duration = time.perf_counter() - started
+                stop.set()
+                await asyncio.gather(*background)
+        await fetcher.aclose()
+        pages_served = site.requests
+
+    stats = recorder.summary()
+    return {
+        "config": {
+            "jobs": args.jobs,
+            "concurrency": args.concurrency,
+            "browsers": args.browsers,
+            "llm_latency": args.llm_latency,
+            "page_latency": args.page_latency,
+            "browser": use_browser,
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        },
+        "completed": completed,
+        "failed": failed,
+        "duration_s": round(duration, 3),
+        "jobs_per_sec": round(completed / duration, 3) if duration else 0.0,
+        "endpoints": {name: value for name, value in stats.items() if " /" in name},
+        "stages": {name.removeprefix("stage "): value for name, value in stats.items() if name.startswith("stage ") or name == "pipeline"},
+        "peak_rss_mb": round((sampler.peak_rss or resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024) / 2 ** 20, 1),
+        "browser": {
+            "launches": STAGE_LATENCY.count(stage="browser.launch", source="") - launches_before,
+            "peak_running": sampler.peak_browsers,
+            "pages_served": pages_served,
+        },
+    }
+
+
+class _no_lifespan:
+    """Without a browser there is nothing to warm; just release DB connections at the end."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc):
+        from app.database import async_engine
+
+        await async_engine.dispose()
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Human-readable regressions of `results` against `baseline`; empty if none."""
+    regressions = []
+    if results["config"] != baseline.get("config"):
+        print("warning: baseline was recorded with a different configuration", file=sys.stderr)
+
+    def worse(name: str, current: float, previous: Optional[float], higher_is_better: bool = False):
+        if not previous:
+            return
+        change = (current - previous) / previous
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{name}: {previous} -> {current} ({change:+.0%})")
+
+    worse("jobs_per_sec", results["jobs_per_sec"], baseline.get("jobs_per_sec"), higher_is_better=True)
+    worse("peak_rss_mb", results["peak_rss_mb"], baseline.get("peak_rss_mb"))
+    for group in ("endpoints", "stages"):
+        for name, current in results[group].items():
+            previous = baseline.get(group, {}).get(name)
+            if previous:
+                worse(f"{name} p95_ms", current["p95_ms"], previous["p95_ms"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100, help="Pipelines to run in total")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simulated users running pipelines at once")
+    parser.add_argument("--browsers", type=int, default=2, help="Browser pool size")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake LLM seconds per call")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="Fixture site seconds per page")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="Task status poll and worker poll interval")
+    parser.add_argument("--no-browser", action="store_true", help="Skip Chromium even if it is installed")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--baseline", help="Compare against results stored with --save-baseline")
+    parser.add_argument("--save-baseline", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    configure_env(args)
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    for path in (args.json_path, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(results, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Event-loop lag under concurrent DB load: sync Session (the old handler style) vs AsyncSession.
+
+A ticker coroutine sleeps in short intervals and records how late it wakes up
+while many concurrent "requests" read jobs from the database. Blocking DB calls
+on the loop show up directly as lag.
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.event_loop_lag --requests 200 --concurrency 50
+"""
+from sqlalchemy import func, select
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.database import AsyncSessionLocal, SessionLocal, init_db
+from app.models import Job
+
+TICK = 0.005
+
+
+def seed(rows: int):
+    init_db()
+    db = SessionLocal()
+    try:
+        existing = db.query(func.count(Job.id)).scalar()
+        if existing >= rows:
+            return
+        db.add_all(
+            Job(
+                title=f"Engineer {i}",
+                company=f"Company {i % 97}",
+                description="Build and operate backend services. " * 60,
+                url=f"https://bench.local/jobs/{i}",
+                source="bench",
+            )
+            for i in range(existing, rows)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def sync_request(limit: int):
+    # What the handlers used to do: a sync Session inside `async def`
+    db = SessionLocal()
+    try:
+        db.query(Job).order_by(Job.id).limit(limit).all()
+    finally:
+        db.close()
+
+
+async def async_request(limit: int):
+    async with AsyncSessionLocal() as db:
+        (await db.execute(select(Job).order_by(Job.id).limit(limit))).scalars().all()
+
+
+async def measure(request, requests: int, concurrency: int, limit: int) -> dict:
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - started - TICK)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await request(limit)
+
+    monitor = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    lags.sort()
+    return {
+        "requests": requests,
+        "wall_seconds": round(elapsed, 3),
+        "lag_p50_ms": round(statistics.median(lags) * 1000, 2),
+        "lag_p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 2),
+        "lag_max_ms": round(lags[-1] * 1000, 2),
+        "ticks": len(lags),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=500, help="Rows read per request")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    seed(args.rows)
+    results = {
+        "sync_session": asyncio.run(measure(sync_request, args.requests, args.concurrency, args.limit)),
+        "async_session": asyncio.run(measure(async_request, args.requests, args.concurrency, args.limit)),
+    }
+    for name, result in results.items():
+        print(f"{name:14} " + "  ".join(f"{k}={v}" for k, v in result.items()))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
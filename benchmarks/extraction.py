@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of job field extraction strategies on saved LinkedIn HTML.
+
+Compares the in-page strategy (selectors evaluated by Chromium, only field
+texts returned) against parsing the serialized HTML with selectolax, lxml and
+the original BeautifulSoup/html.parser path. The page strategy needs a
+Playwright Chromium install and is skipped otherwise.
+
+    python -m benchmarks.extraction --repeat 50
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from app.services.scrapers.extract import (
+    LxmlExtractor,
+    PageExtractor,
+    SelectolaxExtractor,
+    SoupExtractor,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def time_html(extractor, html: str, repeat: int):
+    timings = []
+    fields = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fields = extractor.extract_html(html)
+        timings.append(time.perf_counter() - started)
+    return timings, fields
+
+
+async def time_page(html: str, repeat: int):
+    from playwright.async_api import async_playwright
+
+    extractor = PageExtractor()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            await page.set_content(html)
+            timings = []
+            fields = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                fields = await extractor.extract(page)
+                timings.append(time.perf_counter() - started)
+
+            # What the HTML strategies pay before parsing: serializing the page over CDP
+            content_timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await page.content()
+                content_timings.append(time.perf_counter() - started)
+            return timings, fields, content_timings
+        finally:
+            await browser.close()
+
+
+def summarize(timings):
+    return {
+        "mean_ms": round(statistics.mean(timings) * 1000, 3),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=str(FIXTURES / "linkedin_job.html"))
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    html = Path(args.fixture).read_text()
+    results = {"fixture_bytes": len(html.encode())}
+    reference = None
+    for extractor in (SoupExtractor(), LxmlExtractor(), SelectolaxExtractor()):
+        timings, fields = time_html(extractor, html, args.repeat)
+        reference = reference or fields
+        results[extractor.name] = {**summarize(timings), "matches_soup": fields == reference}
+
+    try:
+        timings, fields, content_timings = asyncio.run(time_page(html, args.repeat))
+        results["page"] = {**summarize(timings), "matches_soup": fields == reference}
+        results["page_content_serialization"] = summarize(content_timings)
+    except Exception as e:
+        results["page"] = {"skipped": str(e).splitlines()[0]}
+
+    for name, result in results.items():
+        print(f"{name:28} {result}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Local stand-in for LinkedIn job pages, for benchmarks and tests.
+
+Serves the saved posting in `fixtures/` at /jobs/view/<id>/ over HTTPS with a
+throwaway self-signed certificate. Each id gets its own title and a
+requirements line, so descriptions differ and neither the LLM cache nor the
+job store short-circuits the work. Search result pages for `search_postings`
+are served at /jobs/search/?start=<n>, rendered from the saved search page.
+Chromium reaches it through `chromium_args()`, which maps www.linkedin.com to
+the local port. The scrapers therefore run unchanged against their real,
+normalized URLs.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
+import random
+import re
+import ssl
+import tempfile
+import threading
+
+FIXTURES = Path(__file__).parent / "fixtures"
+HOST = "www.linkedin.com"
+SKILLS = "python golang rust java react typescript kubernetes terraform aws postgres kafka spark pandas django".split()
+
+VIEW_RE = re.compile(r"^/jobs/view/(\d+)/?$")
+MARKUP_OPEN = '<div class="show-more-less-html__markup show-more-less-html__markup--clamp-after-5">'
+SEARCH_PAGE_SIZE = 25
+
+RESULTS_RE = re.compile(r'(<ul class="jobs-search__results-list">)(.*?)(</ul>)', re.DOTALL)
+CARD_RE = re.compile(r"<li>.*?</li>\n", re.DOTALL)
+
+
+def job_url(job_id: int) -> str:
+    return f"https://{HOST}/jobs/view/{job_id}/"
+
+
+@dataclass
+class Posting:
+    """One search result card."""
+    job_id: int
+    title: str
+    company: str = "Acme Robotics"
+    location: str = "Remote"
+    listed: str = "2026-10-16"
+
+
+def render_search(postings: List[Posting], start: int = 0, page_size: int = SEARCH_PAGE_SIZE) -> str:
+    """A search results page with cards for postings[start:start + page_size], in the saved page's markup."""
+    page = (FIXTURES / "linkedin_search.html").read_text()
+    results = RESULTS_RE.search(page)
+    card = CARD_RE.search(results.group(2)).group(0)
+    cards = []
+    for posting in postings[start:start + page_size]:
+        slug = re.sub(r"[^a-z0-9]+", "-", f"{posting.title} at {posting.company}".lower()).strip("-")
+        cards.append(
+            card.replace("senior-backend-engineer-at-acme-robotics", slug)
+            .replace("3901000003", str(posting.job_id))
+            .replace("Senior Backend Engineer", posting.title)
+            .replace("Acme Robotics", posting.company)
+            .replace("San Francisco, CA", posting.location)
+            .replace("2026-10-16", posting.listed)
+        )
+    return page[:results.start(2)] + "\n" + "".join(cards) + page[results.end(2):]
+
+
+def write_self_signed_cert(directory: Path, host: str = HOST):
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(minutes=5))
+        .not_valid_after(now + timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(host)]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return cert_path, key_path
+
+
+class FixtureSite:
+    """Threaded HTTPS server for job pages; use as a context manager."""
+
+    def __init__(self, fixture: str = "linkedin_job.html", latency: float = 0.0):
+        self.template = (FIXTURES / fixture).read_text()
+        self.easy_apply = (FIXTURES / "linkedin_easy_apply.html").read_text()
+        self.latency = latency # Simulated server think time per page
+        self.requests = 0
+        self.search_postings: List[Posting] = [] # Newest first, served at /jobs/search/
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"https://127.0.0.1:{self.port}"
+
+    def render(self, job_id: int) -> str:
+        rng = random.Random(job_id)
+        requirements = f"<p>Requisition {job_id}: {', '.join(rng.sample(SKILLS, 4))}, {rng.choice(['remote', 'hybrid', 'on-site'])}.</p>"
+        html = self.template.replace("Senior Backend Engineer", f"Senior Backend Engineer {job_id}")
+        html = html.replace(MARKUP_OPEN, MARKUP_OPEN + requirements, 1)
+        # The Easy Apply modal, with field ids carrying this job's id as LinkedIn's do
+        return html.replace("</body>", self.easy_apply.replace("3901000003", str(job_id)) + "</body>", 1)
+
+    def chromium_args(self) -> List[str]:
+        return [
+            f"--host-resolver-rules=MAP {HOST} 127.0.0.1:{self.port}",
+            "--ignore-certificate-errors",
+        ]
+
+    def start(self) -> "FixtureSite":
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                parts = urlsplit(self.path)
+                match = VIEW_RE.match(parts.path)
+                if parts.path.rstrip("/") == "/jobs/search":
+                    start = int(parse_qs(parts.query).get("start", ["0"])[0])
+                    body, status = render_search(site.search_postings, start).encode(), 200
+                elif match is None:
+                    body, status = b"Not found", 404
+                else:
+                    if site.latency:
+                        threading.Event().wait(site.latency)
+                    body, status = site.render(int(match.group(1))).encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        with tempfile.TemporaryDirectory() as directory:
+            context.load_cert_chain(*write_self_signed_cert(Path(directory)))
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,103 @@
+"""
+Listing and full-text search over a synthetic job table.
+
+Seeds DATABASE_URL with `--jobs` postings (once), then times GET /jobs style
+queries through list_jobs: the first page, a deep page reached by keyset
+cursor vs the same page by OFFSET, filtered listings and searches.
+
+    DATABASE_URL=sqlite:///./bench_search.db python -m benchmarks.job_search --jobs 100000
+"""
+from sqlalchemy import func, insert, select
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.database import AsyncSessionLocal, engine, init_db
+from app.models import Job
+from app.services.job_search import list_jobs
+
+TITLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "SRE", "Product Manager", "ML Engineer", "QA Analyst"]
+SKILLS = "python golang rust java react typescript kubernetes terraform aws postgres kafka spark pandas django".split()
+PLACES = ["remote", "hybrid", "on-site in Berlin", "on-site in London", "remote (US only)"]
+SOURCES = ["linkedin", "indeed", "greenhouse"]
+
+
+def seed(rows: int, batch: int = 5000):
+    init_db()
+    with engine.begin() as connection:
+        existing = connection.execute(select(func.count(Job.id))).scalar()
+    rng = random.Random(existing)
+    for start in range(existing, rows, batch):
+        values = []
+        for i in range(start, min(start + batch, rows)):
+            skills = rng.sample(SKILLS, 4)
+            values.append({
+                "title": f"{rng.choice(TITLES)} ({skills[0]})",
+                "company": f"Company {i % 997}",
+                "description": f"We are hiring, {rng.choice(PLACES)}. Stack: {', '.join(skills)}. " + "Benefits and equal opportunity statement. " * 20,
+                "url": f"https://bench.local/search/{i}",
+                "source": rng.choice(SOURCES),
+            })
+        with engine.begin() as connection:
+            connection.execute(insert(Job), values)
+
+
+async def timed(repeat: int, call) -> dict:
+    timings = []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await call(db)
+            timings.append(time.perf_counter() - started)
+    return {"p50_ms": round(statistics.median(timings) * 1000, 3), "max_ms": round(max(timings) * 1000, 3)}
+
+
+async def run(repeat: int, depth: int, limit: int) -> dict:
+    # Cursor for page `depth`, found once up front
+    cursor = None
+    async with AsyncSessionLocal() as db:
+        for _ in range(depth):
+            cursor = (await list_jobs(db, limit=limit, cursor=cursor)).next_cursor
+
+    async def offset_page(db):
+        stmt = select(Job).order_by(Job.id.desc()).offset(depth * limit).limit(limit)
+        (await db.execute(stmt)).scalars().all()
+
+    cases = {
+        "first_page": lambda db: list_jobs(db, limit=limit),
+        f"page_{depth}_keyset": lambda db: list_jobs(db, limit=limit, cursor=cursor),
+        f"page_{depth}_offset": offset_page,
+        "filter_source_company": lambda db: list_jobs(db, source="linkedin", company="Company 42", limit=limit),
+        "search_recent": lambda db: list_jobs(db, q="python backend remote", limit=limit),
+        "search_relevance": lambda db: list_jobs(db, q="python backend remote", order="relevance", limit=limit),
+        "search_rare_term": lambda db: list_jobs(db, q="rust berlin", limit=limit),
+    }
+    return {name: await timed(repeat, call) for name, call in cases.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=1000, help="Page number for the deep-page comparison")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seed(args.jobs)
+    print(f"seeded {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+
+    results = asyncio.run(run(args.repeat, args.depth, args.limit))
+    for name, result in results.items():
+        print(f"{name:24} {result}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
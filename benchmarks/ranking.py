@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the local job ranking index on synthetic descriptions.
+
+    python -m benchmarks.ranking --jobs 10000
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+
+from app.services.ranking import JobIndex
+
+SKILLS = (
+    "python golang rust java kotlin typescript react vue kubernetes terraform aws gcp azure "
+    "postgresql redis kafka spark airflow pytorch tensorflow docker linux graphql grpc"
+).split()
+
+
+def synthetic_description(rng: random.Random, words: int) -> str:
+    filler = [f"term{rng.randrange(20000)}" for _ in range(words)]
+    skills = rng.sample(SKILLS, 5)
+    return " ".join(filler[: words // 2] + skills + filler[words // 2:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=250, help="Words per description")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    index = JobIndex(path=None)
+    texts = [synthetic_description(rng, args.words) for _ in range(args.jobs)]
+
+    started = time.perf_counter()
+    index.add(list(range(1, args.jobs + 1)), texts)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index.add([args.jobs + 1], [synthetic_description(rng, args.words)])
+    incremental = time.perf_counter() - started
+
+    resume = "Backend engineer: " + " ".join(rng.sample(SKILLS, 8))
+    index.rank(resume) # Warm the cached IDF/row norms
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        index.rank(resume, top_k=20)
+        timings.append(time.perf_counter() - started)
+
+    results = {
+        "jobs": len(index),
+        "nnz": int(index.matrix.nnz),
+        "build_s": round(build, 3),
+        "incremental_add_ms": round(incremental * 1000, 3),
+        "rank_p50_ms": round(statistics.median(timings) * 1000, 3),
+        "rank_max_ms": round(max(timings) * 1000, 3),
+    }
+    for name, value in results.items():
+        print(f"{name:20} {value}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Storage size and read latency of tailored resumes on a synthetic corpus.
+
+Writes `--candidates` base resumes with `--variants` tailored variants each,
+twice: as plain rows (how resumes were stored before) and through
+resume_store (deduplicated, compressed against the base). A share of the
+variants repeat an earlier output, as cached LLM results do. Reports bytes
+stored per layout and the latency of reading one resume by id and a page
+of them.
+
+    DATABASE_URL=sqlite:///./bench_resumes.db python -m benchmarks.resume_storage --candidates 20 --variants 100
+"""
+from sqlalchemy import func, insert, select
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from app.database import AsyncSessionLocal, async_engine, engine, init_db
+from app.models import Resume
+from app.services.resume_store import add_tailored_resumes
+
+SKILLS = "python golang rust java react typescript kubernetes terraform aws postgres kafka spark airflow django grpc redis".split()
+VERBS = ["Built", "Led", "Designed", "Scaled", "Migrated", "Owned", "Automated", "Shipped"]
+
+
+def base_resume(rng: random.Random, candidate: int) -> str:
+    lines = [f"# Candidate {candidate}", f"Software engineer with {rng.randint(3, 15)} years of experience.", "", "## Experience"]
+    for job in range(4):
+        lines.append(f"### Company {rng.randint(1, 500)} ({2010 + job * 3}-{2013 + job * 3})")
+        for _ in range(8):
+            skills = ", ".join(rng.sample(SKILLS, 3))
+            lines.append(f"- {rng.choice(VERBS)} a {rng.choice(['billing', 'search', 'ingest', 'auth', 'reporting'])} service with {skills}, serving {rng.randint(1, 900)}k users")
+    lines += ["", "## Skills", ", ".join(rng.sample(SKILLS, 10))]
+    return "\n".join(lines)
+
+
+def tailor(rng: random.Random, base: str, job: int) -> str:
+    """Rewrites the summary, rewords some bullets and moves the job's skills up front."""
+    lines = base.splitlines()
+    focus = rng.sample(SKILLS, 3)
+    lines[1] = f"Engineer targeting role {job}: {', '.join(focus)}."
+    for index in rng.sample(range(5, len(lines) - 3), 6):
+        if lines[index].startswith("- "):
+            lines[index] = f"- {rng.choice(VERBS)} {focus[0]} work: " + lines[index][2:].split(" ", 1)[-1]
+    lines[-1] = ", ".join(focus) + ", " + lines[-1]
+    return "\n".join(lines)
+
+
+def corpus(candidates: int, variants: int, repeat_share: float, seed: int = 7):
+    rng = random.Random(seed)
+    for candidate in range(candidates):
+        base = base_resume(rng, candidate)
+        outputs = []
+        for job in range(variants):
+            if outputs and rng.random() < repeat_share:
+                outputs.append(rng.choice(outputs))
+            else:
+                outputs.append(tailor(rng, base, job))
+        yield base, outputs
+
+
+def stored_bytes(ids) -> int:
+    stmt = select(func.coalesce(func.sum(func.length(Resume.compressed)), 0) + func.coalesce(func.sum(func.length(Resume._content)), 0))
+    with engine.connect() as connection:
+        return connection.execute(stmt.where(Resume.id.in_(ids))).scalar()
+
+
+async def write_plain(data) -> list:
+    ids = []
+    async with AsyncSessionLocal() as db:
+        for base, outputs in data:
+            rows = [{"content": base, "base_resume": True}] + [{"content": content, "base_resume": False} for content in outputs]
+            # Table-level insert: "content" is the column, not the ORM property
+            result = await db.execute(insert(Resume.__table__).returning(Resume.id), rows)
+            ids += list(result.scalars())
+        await db.commit()
+    return ids
+
+
+async def write_store(data) -> list:
+    ids = set()
+    async with AsyncSessionLocal() as db:
+        for base, outputs in data:
+            resumes = await add_tailored_resumes(db, base, outputs)
+            ids.update(resume.id for resume in resumes)
+            ids.add(resumes[0].parent_id)
+        await db.commit()
+    return sorted(ids)
+
+
+async def read_latency(ids: list, repeat: int, page: int, rng: random.Random) -> dict:
+    single, paged = [], []
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            resume = await db.get(Resume, rng.choice(ids))
+            resume.content
+            single.append(time.perf_counter() - started)
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            result = await db.execute(select(Resume).where(Resume.id.in_(rng.sample(ids, min(page, len(ids))))))
+            [resume.content for resume in result.scalars()]
+            paged.append(time.perf_counter() - started)
+
+    def summary(timings):
+        timings = sorted(timings)
+        return {
+            "p50_ms": round(statistics.median(timings) * 1000, 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+        }
+    return {"get": summary(single), f"page_{page}": summary(paged)}
+
+
+async def run(args) -> dict:
+    rng = random.Random(1)
+    data = list(corpus(args.candidates, args.variants, args.repeat_share))
+    results = {"resumes": args.candidates * (args.variants + 1)}
+    try:
+        for name, write in (("plain", write_plain), ("store", write_store)):
+            started = time.perf_counter()
+            ids = await write(data)
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "rows": len(ids),
+                "bytes": stored_bytes(ids),
+                "write_per_second": round(results["resumes"] / elapsed, 1),
+                **await read_latency(ids, args.repeat, args.page, rng),
+            }
+    finally:
+        await async_engine.dispose()
+    results["bytes_ratio"] = round(results["store"]["bytes"] / results["plain"]["bytes"], 4)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--variants", type=int, default=100, help="Tailored variants per candidate")
+    parser.add_argument("--repeat-share", type=float, default=0.1, help="Share of variants repeating an earlier output")
+    parser.add_argument("--repeat", type=int, default=200, help="Timed reads per case")
+    parser.add_argument("--page", type=int, default=50, help="Resumes per page read")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    init_db()
+    results = asyncio.run(run(args))
+    for name in ("plain", "store"):
+        print(f"{name:6} {results[name]}")
+    print(f"store/plain bytes: {results['bytes_ratio']:.2%}")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
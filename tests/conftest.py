@@ -0,0 +1,17 @@
+import os
+import tempfile
+
+# Default to a throwaway SQLite file; must be set before app.database is imported
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'ai_job_agent_test.db')}")
+os.environ.setdefault("RANKING_INDEX_PATH", tempfile.mkdtemp(prefix="ai_job_agent_index_") + "/job_index")
+
+import pytest
+from app.database import Base, engine
+from app import models  # noqa: F401  (registers tables on Base)
+
+@pytest.fixture(scope="session", autouse=True)
+def fresh_schema():
+    # Tests share one database file; start every run from empty tables
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
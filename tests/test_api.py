@@ -1,3 +1,5 @@
+import asyncio
+import json
 import os
 
 # Mock OpenAI key to prevent startup errors if not present
@@ -9,6 +11,8 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
 from app.main import app
 from app.models import ApplicationStatus
+from app.services.resume import TailorResult
+from app.worker import Worker
 
 client = TestClient(app)
 
@@ -52,7 +56,7 @@ def test_tailor_resume(mock_tailor):
     data = response.json()
     assert data["content"] == "Tailored Resume Content"
 
-@patch("app.main.submitter.submit_application", new_callable=AsyncMock)
+@patch("app.worker.submitter.submit_application", new_callable=AsyncMock)
 def test_submit_application(mock_submit):
     mock_submit.return_value = ApplicationStatus.SUBMITTED
     
@@ -78,8 +82,217 @@ def test_submit_application(mock_submit):
         resume_resp = client.post("/resumes/tailor", json={"base_resume": "Base", "job_description": "Desc"})
         resume_id = resume_resp.json()["id"]
 
-    # 3. Submit Application
+    # 3. Submit Application (queued, returns immediately)
     response = client.post("/applications/submit", json={"job_id": job_id, "resume_id": resume_id})
+    assert response.status_code == 202
+    data = response.json()
+    assert data["status"] == "queued"
+    mock_submit.assert_not_called()
+
+    # 4. Worker picks it up
+    assert asyncio.run(Worker(concurrency=2).run_once()) == 1
+    task = client.get(f"/tasks/{data['task_id']}").json()
+    assert task["status"] == "succeeded"
+    assert task["result"] == {"application_id": data["application_id"], "status": "submitted"}
+
+def test_submit_rejects_unscraped_placeholders():
+    from app.database import AsyncSessionLocal
+    from app.models import Job
+    from app.services.job_store import insert_listings
+    from sqlalchemy import select
+
+    async def placeholder():
+        async with AsyncSessionLocal() as db:
+            await insert_listings(db, [Job(title="Discovered", company="Corp", url="https://example.com/api/placeholder", source="mock")])
+            return await db.scalar(select(Job.id).where(Job.url == "https://example.com/api/placeholder"))
+    job_id = asyncio.run(placeholder())
+    with patch("app.main.resume_builder.tailor_resume", new_callable=AsyncMock) as mock_tailor:
+        mock_tailor.return_value = "Resume"
+        resume_id = client.post("/resumes/tailor", json={"base_resume": "Base", "job_description": "Desc"}).json()["id"]
+
+    response = client.post("/applications/submit", json={"job_id": job_id, "resume_id": resume_id})
+    assert response.status_code == 409
+    assert all(job["id"] != job_id for job in client.get("/jobs?limit=100").json()["items"])
+
+@patch("app.main.ScraperFactory.get_scraper")
+def test_scrape_jobs_batch_streams_per_url_results(mock_get_scraper):
+    async def scrape(url):
+        if "broken" in url:
+            raise RuntimeError("page blocked")
+        job = AsyncMock()
+        job.title = f"Batch Job {url[-1]}"
+        job.company = "Batch Corp"
+        job.description = "Desc"
+        job.url = url
+        job.source = "mock"
+        return job
+
+    mock_scraper_instance = AsyncMock()
+    mock_scraper_instance.source = "mock"
+    mock_scraper_instance.scrape_job.side_effect = scrape
+    mock_get_scraper.return_value = mock_scraper_instance
+
+    urls = ["http://batch.url/1", "http://batch.url/broken", "http://batch.url/2"]
+    response = client.post("/jobs/scrape:batch", json={"urls": urls})
     assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["url"] for line in lines) == sorted(urls)
+    by_url = {line["url"]: line for line in lines}
+    assert by_url["http://batch.url/broken"]["status"] == "error"
+    assert by_url["http://batch.url/1"]["status"] == "ok"
+    assert by_url["http://batch.url/2"]["job"]["title"] == "Batch Job 2"
+
+@patch("app.main.ScraperFactory.get_scraper")
+def test_scrape_jobs_batch_rejects_out_of_range_requests(mock_get_scraper):
+    from app.services.batch import MAX_BATCH_URLS, MAX_CONCURRENCY
+
+    urls = ["http://batch.url/bounds"]
+    for concurrency in (0, -1, MAX_CONCURRENCY + 1):
+        assert client.post("/jobs/scrape:batch", json={"urls": urls, "concurrency": concurrency}).status_code == 422
+    too_many = [f"http://batch.url/bounds/{i}" for i in range(MAX_BATCH_URLS + 1)]
+    assert client.post("/jobs/scrape:batch", json={"urls": too_many}).status_code == 422
+    mock_get_scraper.assert_not_called()
+
+@patch("app.main.ScraperFactory.get_scraper")
+def test_scrape_known_url_skips_browser_and_force_rescrapes(mock_get_scraper):
+    mock_scraper_instance = AsyncMock()
+    mock_job = AsyncMock()
+    mock_job.title = "Dedup Job"
+    mock_job.company = "Dedup Corp"
+    mock_job.description = "Desc"
+    mock_job.url = "http://dedup.url/job?id=1"
+    mock_job.source = "mock"
+    mock_scraper_instance.scrape_job.return_value = mock_job
+    mock_get_scraper.return_value = mock_scraper_instance
+
+    first = client.post("/jobs/scrape", json={"url": "http://dedup.url/job?id=1&utm_source=newsletter"})
+    second = client.post("/jobs/scrape", json={"url": "http://dedup.url/job?id=1"})
+    assert first.status_code == second.status_code == 200
+    assert first.json()["id"] == second.json()["id"]
+    assert mock_scraper_instance.scrape_job.await_count == 1
+
+    forced = client.post("/jobs/scrape", json={"url": "http://dedup.url/job?id=1", "force": True})
+    assert forced.status_code == 200
+    assert forced.json()["id"] == first.json()["id"]
+    assert mock_scraper_instance.scrape_job.await_count == 2
+
+@patch("app.main.resume_builder.tailor_many", new_callable=AsyncMock)
+def test_tailor_resumes_batch(mock_tailor_many):
+    mock_tailor_many.return_value = [
+        TailorResult(index=0, content="Resume for job 0"),
+        TailorResult(index=1, error="Rate limit reached"),
+    ]
+
+    response = client.post("/resumes/tailor:batch", json={"base_resume": "Base", "job_descriptions": ["JD 0", "JD 1"]})
+    assert response.status_code == 200, f"Response: {response.text}"
     data = response.json()
-    assert data["status"] == "submitted"
+    assert [item["index"] for item in data] == [0, 1]
+    assert data[0]["resume_id"] is not None
+    assert data[1] == {"index": 1, "resume_id": None, "content": None, "error": "Rate limit reached"}
+
+def test_tailor_resume_stream():
+    from app.services.fake_llm import FakeChatModel
+    from app.services.llm_cache import CachePolicy, LLMCache
+    from app.services.resume import ResumeBuilder
+
+    builder = ResumeBuilder(
+        llm=FakeChatModel(latency=0.0),
+        cache=LLMCache(namespace="test-api-stream", persistent=False),
+        cache_policy=CachePolicy(enabled=False),
+    )
+    with patch("app.main.resume_builder", builder):
+        with client.stream("POST", "/resumes/tailor:stream", json={"base_resume": "Base", "job_description": "Needs golang"}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            body = "".join(response.iter_text())
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert "golang" in "".join(tokens)
+    assert events[-1][0] == "done"
+    resume_id = events[-1][1]["resume_id"]
+    assert resume_id is not None
+
+def test_tailor_resume_stream_without_text_saves_nothing():
+    async def silent(*args, **kwargs):
+        return
+        yield
+
+    with patch("app.main.resume_builder.astream_tailor", silent), patch("app.main.add_tailored_resume", new_callable=AsyncMock) as add:
+        with client.stream("POST", "/resumes/tailor:stream", json={"base_resume": "Base", "job_description": "Desc"}) as response:
+            body = "".join(response.iter_text())
+
+    assert "event: done" not in body
+    assert "event: error" in body and "empty resume" in body
+    add.assert_not_awaited()
+
+def test_ranked_jobs():
+    response = client.post("/jobs:bulk", json=[
+        {"title": "Platform Engineer", "company": "Rank Co", "description": "Kubernetes, Terraform and Go on AWS", "url": "https://example.com/ranked/1", "source": "mock"},
+        {"title": "Pastry Chef", "company": "Rank Co", "description": "Croissants, laminated dough and sourdough", "url": "https://example.com/ranked/2", "source": "mock"},
+    ])
+    platform_id = response.json()["ids"]["https://example.com/ranked/1"]
+
+    with patch("app.main.resume_builder.tailor_resume", new_callable=AsyncMock) as mock_tailor:
+        mock_tailor.return_value = "Go developer running Kubernetes clusters with Terraform"
+        resume_id = client.post("/resumes/tailor", json={"base_resume": "Base", "job_description": "Desc"}).json()["id"]
+
+    response = client.get(f"/jobs/ranked?resume_id={resume_id}&top_k=5")
+    assert response.status_code == 200
+    ranked = response.json()
+    assert ranked[0]["id"] == platform_id
+    assert ranked[0]["score"] > 0
+    assert all(job["title"] != "Pastry Chef" for job in ranked)
+
+    assert client.get(f"/jobs/ranked?resume_id={resume_id}&min_score=1").json() == []
+    assert client.get("/jobs/ranked?resume_id=999999").status_code == 404
+
+def test_list_jobs():
+    client.post("/jobs:bulk", json=[
+        {"title": f"Listing Engineer {i}", "company": "List Co", "description": "Python backend, remote", "url": f"https://example.com/listing/{i}", "source": "listing"}
+        for i in range(3)
+    ])
+
+    first = client.get("/jobs?source=listing&limit=2").json()
+    assert len(first["items"]) == 2
+    second = client.get(f"/jobs?source=listing&limit=2&cursor={first['next_cursor']}").json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+
+    found = client.get("/jobs?q=python%20remote&source=listing&order=relevance").json()
+    assert len(found["items"]) == 3
+
+    assert client.get("/jobs?cursor=garbage").status_code == 400
+
+def test_list_applications():
+    ids = client.post("/jobs:bulk", json=[
+        {"title": "Applied Engineer", "company": "Apply Co", "description": "Desc", "url": "https://example.com/applied", "source": "mock"}
+    ]).json()["ids"]
+    job_id = next(iter(ids.values()))
+    with patch("app.main.resume_builder.tailor_resume", new_callable=AsyncMock) as mock_tailor:
+        mock_tailor.return_value = "Resume for listing"
+        resume_id = client.post("/resumes/tailor", json={"base_resume": "Base", "job_description": "Desc"}).json()["id"]
+    application_ids = [
+        client.post("/applications/submit", json={"job_id": job_id, "resume_id": resume_id}).json()["application_id"]
+        for _ in range(3)
+    ]
+
+    first = client.get(f"/applications?job_id={job_id}&status=pending&limit=2").json()
+    assert [item["id"] for item in first["items"]] == application_ids[:0:-1]
+    assert first["items"][0]["job"]["url"] == "https://example.com/applied"
+    assert first["items"][0]["resume"]["id"] == resume_id
+    second = client.get(f"/applications?job_id={job_id}&status=pending&limit=2&cursor={first['next_cursor']}").json()
+    assert [item["id"] for item in second["items"]] == application_ids[:1]
+    assert second["next_cursor"] is None
+
+    detail = client.get(f"/applications/{application_ids[0]}").json()
+    assert detail["resume"]["content"] == "Resume for listing"
+    assert client.get("/applications/999999").status_code == 404
+    assert client.get("/applications?status=lost").status_code == 400
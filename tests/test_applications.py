@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Application, ApplicationStatus, Job, Resume
+from app.services.applications import get_application, list_applications
+from app.services.job_search import InvalidQuery
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+def add_applications(job_id: int, count: int, status=ApplicationStatus.PENDING) -> list:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            applications = []
+            for i in range(count):
+                resume = Resume(content=f"Tailored resume {i}", base_resume=False)
+                application = Application(job_id=job_id, resume=resume, status=status)
+                db.add(application)
+                applications.append(application)
+            await db.commit()
+            return [application.id for application in applications]
+    return asyncio.run(run())
+
+def make_job(url: str) -> int:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            job = Job(title="Platform Engineer", company="Listing Co", description="Apply here", url=url, source="mock")
+            db.add(job)
+            await db.commit()
+            return job.id
+    return asyncio.run(run())
+
+def run_list(**kwargs):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            page = await list_applications(db, **kwargs)
+            # Touch the relationships inside the session: they must already be loaded
+            return page, [(a.id, a.job.url, a.resume.id) for a in page.items]
+    return asyncio.run(run())
+
+@pytest.fixture(scope="module")
+def job_id():
+    return make_job("https://example.com/applications/listing")
+
+def test_pages_walk_newest_first_without_gaps(job_id):
+    ids = add_applications(job_id, 7)
+
+    seen, cursor = [], None
+    while True:
+        page, rows = run_list(job_id=job_id, limit=3, cursor=cursor)
+        seen.extend(row[0] for row in rows)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    # Same-second created_at values are ordered by id
+    assert seen == sorted(ids, reverse=True)
+    assert all(url == "https://example.com/applications/listing" for _, url, _ in rows)
+
+def test_status_filter_and_validation(job_id):
+    submitted = add_applications(job_id, 2, status=ApplicationStatus.SUBMITTED)
+
+    page, rows = run_list(job_id=job_id, status="submitted")
+    assert [row[0] for row in rows] == sorted(submitted, reverse=True)
+
+    with pytest.raises(InvalidQuery):
+        run_list(status="lost")
+
+def test_query_count_does_not_grow_with_rows():
+    job_id = make_job("https://example.com/applications/n-plus-one")
+    add_applications(job_id, 3)
+    with count_queries() as few:
+        run_list(job_id=job_id, limit=100)
+
+    add_applications(job_id, 30)
+    with count_queries() as many:
+        page, rows = run_list(job_id=job_id, limit=100)
+
+    assert len(rows) == 33
+    # One query for applications + jobs, one for their resumes
+    assert len(many) == len(few) == 2
+
+def test_get_application_loads_resume_content(job_id):
+    (application_id,) = add_applications(job_id, 1)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            application = await get_application(db, application_id)
+            return application.job.id, application.resume.content
+
+    with count_queries() as statements:
+        loaded_job_id, content = asyncio.run(run())
+    assert loaded_job_id == job_id
+    assert content == "Tailored resume 0"
+    assert len(statements) == 2
@@ -0,0 +1,30 @@
+import asyncio
+from unittest.mock import patch
+from app.services.batch import scrape_batch
+from app.services.scraper import BaseScraper
+
+class SlowScraper(BaseScraper):
+    source = "slow"
+    in_flight = 0
+    peak = 0
+
+    async def scrape_job(self, url: str):
+        SlowScraper.in_flight += 1
+        SlowScraper.peak = max(SlowScraper.peak, SlowScraper.in_flight)
+        await asyncio.sleep(0.01)
+        SlowScraper.in_flight -= 1
+        if url.endswith("3"):
+            raise ValueError("boom")
+        return url
+
+@patch("app.services.batch.ScraperFactory.get_scraper", return_value=SlowScraper())
+def test_scrape_batch_limits_concurrency_per_source(_):
+    async def run():
+        return [result async for result in scrape_batch([f"http://slow/{i}" for i in range(10)], per_source_limit=3)]
+
+    results = asyncio.run(run())
+    assert len(results) == 10
+    assert SlowScraper.peak == 3
+    failed = [result for result in results if not result.ok]
+    assert [result.url for result in failed] == ["http://slow/3"]
+    assert all(result.source == "slow" for result in results)
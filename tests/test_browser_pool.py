@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from app.services.browser import BrowserPool, BrowserPoolTimeout
+
+class FakePage:
+    async def close(self):
+        pass
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def on(self, event, handler):
+        self.handler = handler
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+class FakeDriver:
+    async def stop(self):
+        pass
+
+class FakePool(BrowserPool):
+    """BrowserPool with the Playwright driver swapped for in-memory fakes."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.launched = []
+
+    async def _start_driver(self):
+        return FakeDriver()
+
+    async def _new_browser(self):
+        browser = FakeBrowser()
+        self.launched.append(browser)
+        return browser
+
+def test_pool_reuses_warm_browsers_and_contexts():
+    async def run():
+        pool = FakePool(size=1, name="test-reuse")
+        await pool.start()
+        async with pool.page(user_agent="ua") as first:
+            pass
+        async with pool.page(user_agent="ua") as second:
+            pass
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+    assert len(pool.launched) == 1
+    assert len(pool.launched[0].contexts) == 1
+    stats = pool.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 0
+
+def test_session_contexts_are_replaced_when_their_state_changes():
+    stale = {"cookies": [{"name": "li_at", "value": "old"}], "origins": []}
+    fresh = {"cookies": [{"name": "li_at", "value": "new"}], "origins": []}
+
+    async def run():
+        pool = FakePool(size=1, name="test-session-contexts")
+        await pool.start()
+        for state in (stale, stale, fresh, fresh):
+            async with pool.page(session="site:me", storage_state=state):
+                pass
+        async with pool.page(session="site:other", storage_state=fresh):
+            pass
+        await pool.stop()
+        return pool.launched[0].contexts
+
+    contexts = asyncio.run(run())
+    assert [context.options["storage_state"] for context in contexts] == [stale, fresh, fresh]
+    # The stale login is closed, not left open until the browser recycles
+    assert [context.closed for context in contexts] == [True, False, False]
+
+def test_pool_recycles_after_max_pages_and_crash():
+    async def run():
+        pool = FakePool(size=1, max_pages_per_browser=2, name="test-recycle")
+        await pool.start(warm=False)
+        for _ in range(3):
+            async with pool.page():
+                pass
+        # Simulate a browser crash between leases
+        pool.launched[-1].connected = False
+        async with pool.page():
+            pass
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+    assert len(pool.launched) == 3
+    stats = pool.stats()
+    assert stats["recycles"]["max_pages"] == 1
+    assert stats["recycles"]["crash"] == 1
+    assert stats["misses"] == 3
+
+def test_pool_applies_backpressure():
+    async def run():
+        pool = FakePool(size=1, acquire_timeout=0.05, name="test-backpressure")
+        await pool.start()
+        async with pool.page():
+            with pytest.raises(BrowserPoolTimeout):
+                async with pool.page():
+                    pass
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.stats()["acquires"] == 2
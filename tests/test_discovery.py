@@ -0,0 +1,172 @@
+import asyncio
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import Job, SavedSearch, Task
+from app.services.discovery import BloomFilter, DiscoveryCrawler, SeenSet, add_search, schedule_due_searches
+from app.services.job_search import list_jobs
+from app.services.job_store import insert_listings, upsert_jobs
+from app.services.ranking import JobIndex
+from app.services.scrapers.linkedin_search import JobCard, page_url, parse_search_page
+from benchmarks.fixture_site import Posting, render_search
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+
+class FixtureSearch:
+    """Serves render_search pages for a mutable list of postings, newest first."""
+
+    def __init__(self, postings):
+        self.postings = postings
+        self.fetched = []
+
+    async def fetch(self, url):
+        self.fetched.append(url)
+        start = int(parse_qs(urlsplit(url).query).get("start", ["0"])[0])
+        return render_search(self.postings, start)
+
+def crawler_for(site):
+    # A low error rate keeps stray false positives out of the lookup counts
+    return DiscoveryCrawler(fetcher=site, seen=SeenSet(error_rate=1e-6))
+
+def saved_search(url):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return (await add_search(db, url)).id
+    return asyncio.run(run())
+
+def scrape_tasks(urls):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            payloads = (await db.execute(select(Task.payload).where(Task.kind == "scrape_job"))).scalars()
+            return sorted(payload["url"] for payload in payloads if payload["url"] in urls)
+    return asyncio.run(run())
+
+def view_url(job_id):
+    return f"https://www.linkedin.com/jobs/view/{job_id}/"
+
+def test_parses_search_result_cards():
+    cards = parse_search_page((FIXTURES / "linkedin_search.html").read_text())
+
+    assert [card.url for card in cards] == [view_url(3901000003), view_url(3901000002), view_url(3901000001)]
+    assert cards[0] == JobCard(
+        url=view_url(3901000003),
+        title="Senior Backend Engineer",
+        company="Acme Robotics",
+        location="San Francisco, CA",
+        listed="2026-10-16",
+    )
+    assert page_url("https://www.linkedin.com/jobs/search/?keywords=go&start=50", 25) == "https://www.linkedin.com/jobs/search/?keywords=go&start=25"
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    members = [f"https://www.linkedin.com/jobs/view/{i}/" for i in range(5000)]
+    for url in members:
+        bloom.add(url)
+
+    assert all(url in bloom for url in members)
+    false_positives = sum(f"https://www.linkedin.com/jobs/view/{i}/" in bloom for i in range(10**6, 10**6 + 20000))
+    assert false_positives / 20000 < 0.02
+
+def test_passes_enqueue_only_new_or_changed_postings_and_stop_at_the_cursor():
+    postings = [Posting(job_id=4100000000 + i, title=f"Engineer {i}") for i in range(60, 0, -1)]
+    site = FixtureSearch(postings)
+    crawler = crawler_for(site)
+    search_id = saved_search("https://www.linkedin.com/jobs/search/?keywords=discovery-incremental")
+    every_url = {view_url(4100000000 + i) for i in range(100)}
+
+    first = asyncio.run(crawler.run(search_id))
+    # 25 + 25 + 10: the short third page ends the pass
+    assert (first.pages, first.new, first.changed, first.db_lookups) == (3, 60, 0, 0)
+    assert len(scrape_tasks(every_url)) == 60
+
+    # Five new postings, and an older one edited and bumped to the top
+    edited = postings.pop(30)
+    edited.title, edited.listed = edited.title + " (Remote)", "2026-10-17"
+    site.postings = [edited] + [Posting(job_id=4100000000 + i, title=f"Engineer {i}") for i in range(65, 60, -1)] + postings
+    site.fetched.clear()
+
+    second = asyncio.run(crawler.run(search_id))
+    assert (second.pages, second.new, second.changed, second.unchanged) == (1, 5, 1, 0)
+    assert second.reached_cursor and second.db_lookups == 1
+    assert len(site.fetched) == 1
+    assert scrape_tasks(every_url).count(view_url(edited.job_id)) == 2
+
+    third = asyncio.run(crawler.run(search_id))
+    assert (third.pages, third.cards, third.enqueued) == (1, 0, 0)
+    assert len(scrape_tasks(every_url)) == 66
+
+    async def stored():
+        async with AsyncSessionLocal() as db:
+            search = await db.get(SavedSearch, search_id)
+            job = (await db.execute(select(Job).where(Job.url == view_url(edited.job_id)))).scalars().one()
+            return search, job
+    search, job = asyncio.run(stored())
+    assert search.cursor == view_url(edited.job_id)
+    assert search.last_result["enqueued"] == 0
+    # Placeholders are stored unscraped, with the hash of their current card
+    assert job.scraped_at is None and job.title == "Engineer 30"
+    assert job.content_hash == JobCard(job.url, edited.title, edited.company, edited.location, edited.listed).content_hash
+
+def test_a_page_without_anything_new_ends_a_pass_without_a_cursor():
+    postings = [Posting(job_id=4200000000 + i, title=f"Analyst {i}") for i in range(80, 0, -1)]
+    site = FixtureSearch(postings)
+    search_id = saved_search("https://www.linkedin.com/jobs/search/?keywords=discovery-no-cursor")
+    asyncio.run(crawler_for(site).run(search_id))
+
+    async def forget_cursor():
+        async with AsyncSessionLocal() as db:
+            search = await db.get(SavedSearch, search_id)
+            search.cursor = None
+            await db.commit()
+    asyncio.run(forget_cursor())
+
+    # A fresh process: the seen-set is rebuilt from the jobs table
+    result = asyncio.run(crawler_for(site).run(search_id))
+    assert (result.pages, result.unchanged, result.enqueued, result.db_lookups) == (1, 25, 0, 25)
+
+def test_due_searches_are_enqueued_once():
+    search_id = saved_search("https://www.linkedin.com/jobs/search/?keywords=discovery-schedule")
+
+    async def schedule(now):
+        async with AsyncSessionLocal() as db:
+            return await schedule_due_searches(db, now)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            now = (await db.get(SavedSearch, search_id)).next_run_at
+            # Two schedulers racing for the same due search
+            first, second = await asyncio.gather(schedule(now), schedule(now))
+            later = await schedule_due_searches(db, now)
+            tasks = (await db.execute(
+                select(func.count(Task.id)).where(Task.kind == "discover_search", Task.payload["search_id"].as_integer() == search_id)
+            )).scalar()
+            # Searches saved by other tests are due as well
+            return [found for found in first + second if found == search_id], later, tasks
+    scheduled, later, tasks = asyncio.run(run())
+
+    assert scheduled == [search_id] and later == [] and tasks == 1
+
+def test_placeholders_stay_out_of_listings_and_ranking_until_scraped():
+    url = view_url(4300000001)
+    index = JobIndex(path=None)
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await insert_listings(db, [Job(title="Zig Toolchain Engineer", company="Placeholder Co", url=url, source="discovery-placeholder")])
+            await index.sync(db)
+            before = (await list_jobs(db, source="discovery-placeholder")).items, index.rank("zig toolchain")
+
+            await upsert_jobs(db, [Job(title="Zig Toolchain Engineer", company="Placeholder Co", description="Zig compilers", url=url, source="discovery-placeholder")])
+            await db.commit()
+            await index.sync(db)
+            return before, ((await list_jobs(db, source="discovery-placeholder")).items, index.rank("zig toolchain"))
+    (listed, ranked), (scraped_listed, scraped_ranked) = asyncio.run(run())
+
+    assert listed == []
+    assert [job.url for job in scraped_listed] == [url]
+    job_id = scraped_listed[0].id
+    assert job_id not in [r.job_id for r in ranked]
+    assert job_id in [r.job_id for r in scraped_ranked]
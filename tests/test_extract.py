@@ -0,0 +1,39 @@
+import asyncio
+from pathlib import Path
+import pytest
+from app.services.scrapers.extract import LxmlExtractor, PageExtractor, SelectolaxExtractor, SoupExtractor
+
+FIXTURE = Path(__file__).parent.parent / "benchmarks" / "fixtures" / "linkedin_job.html"
+
+HTML_EXTRACTORS = [SoupExtractor, LxmlExtractor, SelectolaxExtractor]
+
+@pytest.mark.parametrize("extractor_cls", HTML_EXTRACTORS)
+def test_html_extractors_agree_on_saved_linkedin_page(extractor_cls):
+    html = FIXTURE.read_text()
+    fields = extractor_cls().extract_html(html)
+    assert fields == SoupExtractor().extract_html(html)
+    assert fields["title"] == "Senior Backend Engineer"
+    assert fields["company"] == "Acme Robotics"
+    assert fields["description"].startswith("About the role")
+
+@pytest.mark.parametrize("extractor_cls", HTML_EXTRACTORS)
+def test_html_extractors_follow_selector_cascade(extractor_cls):
+    html = """
+    <html><body>
+      <h1 class="t-24 job-details-jobs-unified-top-card__job-title">Data Engineer</h1>
+      <div class="description__text"><p>Build <b>pipelines</b></p></div>
+    </body></html>
+    """
+    fields = extractor_cls().extract_html(html)
+    assert fields == {"title": "Data Engineer", "company": None, "description": "Buildpipelines"}
+
+class BrokenEvaluatePage:
+    async def evaluate(self, script, arg):
+        raise RuntimeError("Execution context was destroyed")
+
+    async def content(self):
+        return "<html><body><h1>Fallback Title</h1></body></html>"
+
+def test_page_extractor_falls_back_to_html_parser():
+    fields = asyncio.run(PageExtractor().extract(BrokenEvaluatePage()))
+    assert fields["title"] == "Fallback Title"
@@ -0,0 +1,340 @@
+import asyncio
+import copy
+import os
+import re
+import zipfile
+from collections import Counter
+from pathlib import Path
+
+import lxml.html
+import pytest
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Application, ApplicationStatus, FormPlan, Job, Resume
+from app.services.form_plans import FILL_JS, STEP_HTML_JS, EasyApplyForm, FormFailed, FormPlanStore, FormUnanswerable, FormRun, load_answers, scan_step
+from app.services.politeness import HostPolicy, PolitenessScheduler
+from app.services.submitter import LinkedInSubmitter
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures"
+FORM_HTML = (FIXTURES / "linkedin_easy_apply.html").read_text()
+ANSWERS = load_answers(str(FIXTURES / "easy_apply_answers.json"))
+RADIO_RE = re.compile(r'^(input\[name="[^"]+"\])\[value="((?:[^"\\]|\\.)*)"\]$')
+CSS_ESCAPE_RE = re.compile(r"\\(.)")
+RESUME = "/tmp/resume-test/Resume.docx"
+
+def resume_input(job_id):
+    return f'[id="jobs-document-upload-file-input-upload-resume-{job_id}"]'
+
+class FixtureForm:
+    """
+    Page double for the Easy Apply fixture.
+
+    Answers the form's step and fill scripts from the fixture markup, keeps
+    field values per selector, and like the fixture's inline script won't
+    leave a step while a required field is empty.
+    """
+
+    def __init__(self, job_id, html=FORM_HTML):
+        root = lxml.html.fragment_fromstring(html.replace("3901000003", str(job_id)), create_parent="div")
+        self.steps = root.xpath("//div[contains(@class, 'jobs-easy-apply-content')]")
+        self.step = None # Index of the visible step; len(steps) once sent
+        self.values = {}
+        self.calls = Counter()
+
+    @property
+    def sent(self):
+        return self.step == len(self.steps)
+
+    def render(self):
+        step = copy.deepcopy(self.steps[self.step])
+        for element in step.iter("input", "select"):
+            if element.get("type") == "radio":
+                value = self.values.get(f'input[name="{element.get("name")}"]')
+                if value is not None and element.get("value") == value:
+                    element.set("checked", "")
+                continue
+            value = self.values.get(f'[id="{element.get("id")}"]')
+            if value is None:
+                continue
+            if element.tag == "select":
+                for option in element.iter("option"):
+                    option.attrib.pop("selected", None)
+                    if option.text_content().strip() == value:
+                        option.set("selected", "")
+            elif element.get("type") == "checkbox":
+                element.attrib.pop("checked", None)
+                if value:
+                    element.set("checked", "")
+            else:
+                element.set("value", value) # Uploads too: a required upload counts as filled
+        return lxml.html.tostring(step, encoding="unicode")
+
+    async def evaluate(self, script, arg=None):
+        self.calls["evaluate"] += 1
+        if script == STEP_HTML_JS:
+            if self.step is None or self.sent:
+                return {"done": bool(self.sent), "html": None}
+            return {"done": False, "html": self.render()}
+        if script == FILL_JS:
+            self.calls["batched_fill"] += 1
+            for fill in arg:
+                self.values[fill["selector"]] = fill["value"]
+            return []
+        raise AssertionError(f"unexpected script: {script[:40]}")
+
+    async def query_selector(self, selector):
+        return "button" if "jobs-apply-button" in selector else None
+
+    async def click(self, selector):
+        self.calls["click"] += 1
+        if "jobs-apply-button" in selector:
+            self.step = 0
+            return
+        step = scan_step(self.render())
+        assert f'aria-label="{step.advance}"' in selector
+        if not any(field.required and not field.value for field in step.fields):
+            self.step += 1
+
+    async def fill(self, selector, value):
+        self.calls["fill"] += 1
+        self.values[selector] = value
+
+    async def select_option(self, selector, label):
+        self.calls["fill"] += 1
+        self.values[selector] = label
+
+    async def check(self, selector):
+        self.calls["fill"] += 1
+        radio = RADIO_RE.match(selector)
+        if radio:
+            self.values[radio.group(1)] = CSS_ESCAPE_RE.sub(r"\1", radio.group(2))
+        else:
+            self.values[selector] = True
+
+    async def uncheck(self, selector):
+        self.calls["fill"] += 1
+        self.values[selector] = False
+
+    async def set_input_files(self, selector, files):
+        self.calls["upload"] += 1
+        if selector.split('"')[1] not in self.render():
+            raise RuntimeError(f"No element matches {selector}")
+        self.values[selector] = files
+
+def complete(form, page, resume_path=RESUME):
+    return asyncio.run(form.complete(page, resume_path=resume_path))
+
+def test_steps_are_fingerprinted_by_labels_and_types_not_ids():
+    first, second = FixtureForm(5100000001), FixtureForm(5100000002)
+    first.step = second.step = 0
+    step, same = scan_step(first.render()), scan_step(second.render())
+
+    assert [(field.label, field.kind) for field in step.fields] == [
+        ("First name", "text"), ("Last name", "text"), ("Email address", "select"), ("Mobile phone number", "text"),
+    ]
+    assert step.fields[2].value == "jane.doe@example.com" and step.fields[2].options == ["jane.doe@example.com"]
+    assert step.advance == "Continue to next step"
+    assert step.fingerprint == same.fingerprint
+    assert step.fields[0].selector != same.fields[0].selector
+
+    first.step = 2
+    radio = scan_step(first.render()).fields[1]
+    assert (radio.label, radio.kind, radio.options, radio.required) == ("Are you legally authorized to work in the United States?", "radio", ["Yes", "No"], True)
+
+def test_a_recorded_plan_replays_with_one_batched_fill_per_step():
+    form = EasyApplyForm(store=FormPlanStore(persistent=False), answers=ANSWERS, step_timeout=0.5)
+    before = form.stats()
+
+    explored = FixtureForm(5100000011)
+    first = complete(form, explored)
+    assert explored.sent
+    assert first.result == "miss" and [step.mode for step in first.steps] == ["explore"] * 4
+    # First/last name, phone, years, authorization and sponsorship, one call each
+    assert explored.calls["fill"] == 6 and explored.calls["batched_fill"] == 0
+    assert explored.values[resume_input(5100000011)] == RESUME
+
+    replayed = FixtureForm(5100000012)
+    second = complete(form, replayed)
+    assert replayed.sent
+    assert second.result == "hit" and second.plan == first.plan
+    assert [step.mode for step in second.steps] == ["replay"] * 4
+    # Only steps with something to fill need a round trip
+    assert replayed.calls["fill"] == 0 and replayed.calls["batched_fill"] == 2
+    # The tailored resume is uploaded on replays too
+    assert replayed.calls["upload"] == 1 and replayed.values[resume_input(5100000012)] == RESUME
+    assert replayed.values['[id="single-line-text-form-component-formElement-urn-li-jobs-applyformcommon-easyApplyFormElement-5100000012-101-firstName"]'] == "Jane"
+
+    after = form.stats()
+    assert (after["hit"] - before["hit"], after["miss"] - before["miss"]) == (1, 1)
+    assert 0 < after["hit_rate"] <= 1
+
+def test_a_changed_step_is_explored_and_the_walk_recorded_as_a_new_plan():
+    store = FormPlanStore(persistent=False)
+    form = EasyApplyForm(store=store, answers=ANSWERS, step_timeout=0.5)
+    complete(form, FixtureForm(5100000021))
+
+    golang = FORM_HTML.replace("with Python?", "with Go?").replace(
+        "Are you legally authorized", "Do you have a license or are you legally authorized"
+    )
+    changed = complete(form, FixtureForm(5100000022, golang))
+    assert changed.result == "partial"
+    assert [step.mode for step in changed.steps] == ["replay", "replay", "explore", "replay"]
+
+    again = complete(form, FixtureForm(5100000023, golang))
+    assert again.result == "hit" and again.plan == changed.plan
+    assert len(asyncio.run(store.candidates(changed.steps[0].fingerprint))) == 2
+
+def test_a_required_field_without_an_answer_fails_and_records_nothing():
+    store = FormPlanStore(persistent=False)
+    form = EasyApplyForm(store=store, answers={k: v for k, v in ANSWERS.items() if k != "require sponsorship"}, step_timeout=0.5)
+    page = FixtureForm(5100000031)
+
+    with pytest.raises(FormUnanswerable, match="sponsorship"):
+        complete(form, page)
+    assert not page.sent
+    page.step = 0
+    assert asyncio.run(store.candidates(scan_step(page.render()).fingerprint)) == []
+
+def test_a_required_resume_upload_needs_a_resume_that_uploads():
+    required = FORM_HTML.replace('type="file"', 'type="file" required')
+    form = EasyApplyForm(store=FormPlanStore(persistent=False), answers=ANSWERS, step_timeout=0.5)
+
+    with pytest.raises(FormUnanswerable, match="Upload resume"):
+        complete(form, FixtureForm(5100000051, required), resume_path=None)
+
+    class BrokenUpload(FixtureForm):
+        async def set_input_files(self, selector, files):
+            raise RuntimeError("Input is not attached to the DOM")
+    page = BrokenUpload(5100000052, required)
+    with pytest.raises(FormFailed, match="Couldn't upload"):
+        complete(form, page)
+    assert not page.sent
+
+    page = FixtureForm(5100000053, required)
+    complete(form, page)
+    assert page.sent and page.values[resume_input(5100000053)] == RESUME
+
+def test_option_values_with_quotes_and_backslashes_are_escaped_in_selectors():
+    quoted = FORM_HTML.replace('type="radio" value="Yes"', 'type="radio" value="Yes &quot;citizen&quot; \\ GC"')
+    answers = {**ANSWERS, "legally authorized to work": 'Yes "citizen" \\ GC'}
+    form = EasyApplyForm(store=FormPlanStore(persistent=False), answers=answers, step_timeout=0.5)
+
+    explored = FixtureForm(5100000081, quoted)
+    complete(form, explored)
+    assert explored.sent
+    assert explored.values['input[name="urn-li-jobs-applyformcommon-easyApplyFormElement-5100000081-202-multipleChoice"]'] == 'Yes "citizen" \\ GC'
+
+def test_plans_are_shared_through_the_database():
+    complete(EasyApplyForm(answers=ANSWERS, step_timeout=0.5), FixtureForm(5100000041))
+
+    # Another process: empty memory tier, same table
+    run = complete(EasyApplyForm(store=FormPlanStore(), answers=ANSWERS, step_timeout=0.5), FixtureForm(5100000042))
+    assert run.result == "hit"
+
+    async def stored():
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(FormPlan).where(FormPlan.fingerprint == run.plan))).scalars().one()
+    plan = asyncio.run(stored())
+    assert (plan.step_count, plan.hits) == (4, 1)
+    assert plan.steps[0]["fields"][0] == {"label": "First name", "kind": "text", "answer": "first name"}
+    assert plan.last_used_at is not None
+
+def test_the_submitter_uploads_the_tailored_resume_as_a_document():
+    class RecordingForm:
+        async def complete(self, page, resume_path=None):
+            self.path = resume_path
+            with zipfile.ZipFile(resume_path) as archive:
+                self.document = archive.read("word/document.xml").decode()
+            return FormRun()
+
+    class JobPage:
+        url = "https://www.linkedin.com/jobs/view/5100000061/"
+
+        async def goto(self, url, **kwargs):
+            return None
+
+    class Sessions:
+        async def run(self, auth, work, profile=None, ticket=None, **options):
+            return await work(JobPage())
+
+    form = RecordingForm()
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=HostPolicy(requests_per_minute=60000, burst=10))
+    submitter = LinkedInSubmitter(sessions=Sessions(), scheduler=scheduler, form=form)
+    application = Application(
+        id=1,
+        job=Job(url=JobPage.url, source="linkedin"),
+        resume=Resume(content="# Jane Doe\n- Go & Kubernetes at <Acme>\nShipped **everything**"),
+    )
+
+    assert asyncio.run(submitter.submit_application(application)) == ApplicationStatus.SUBMITTED
+    assert os.path.basename(form.path) == "Resume.docx"
+    assert '<w:b/></w:rPr><w:t xml:space="preserve">Jane Doe</w:t>' in form.document
+    assert "• Go &amp; Kubernetes at &lt;Acme&gt;" in form.document and "Shipped everything" in form.document
+    # Only there while the form runs
+    assert not os.path.exists(form.path)
+
+# Real Chromium against the fixture site, so FILL_JS and STEP_HTML_JS run in a browser
+
+class CountingPage:
+    """Passes everything through to a Playwright page, counting the calls that fill fields."""
+
+    COUNTED = {"fill", "select_option", "check", "uncheck", "set_input_files", "evaluate"}
+
+    def __init__(self, page):
+        self.page = page
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.page, name)
+        if name not in self.COUNTED:
+            return attribute
+
+        async def counted(*args, **kwargs):
+            self.calls["batched_fill" if name == "evaluate" and args[0] == FILL_JS else name] += 1
+            return await attribute(*args, **kwargs)
+        return counted
+
+def test_chromium_explores_then_replays_the_fixture_form(tmp_path):
+    from app.services.browser import BrowserPool
+    from app.services.resume_files import write_resume
+    from benchmarks.fixture_site import FixtureSite, job_url
+
+    form = EasyApplyForm(store=FormPlanStore(persistent=False), answers=ANSWERS, step_timeout=5)
+    resume_path = write_resume("# Jane Doe\n- Go and Kubernetes", str(tmp_path))
+
+    async def apply(pool, job_id):
+        async with pool.page() as page:
+            await page.goto(job_url(job_id))
+            counting = CountingPage(page)
+            run = await form.complete(counting, resume_path=resume_path)
+            sent = await page.is_visible(".jobs-easy-apply-success")
+            uploaded = await page.evaluate("() => document.querySelector('input[type=file]').files[0].name")
+            return run, counting.calls, sent, uploaded
+
+    async def run(site):
+        pool = BrowserPool(size=1, name="test-form-plans", launch_args=site.chromium_args())
+        try:
+            await pool.start(warm=False)
+            await pool._launch(pool._slots[0])
+        except Exception as e:
+            await pool.stop()
+            pytest.skip(f"Chromium is not available: {str(e).splitlines()[0]}")
+        try:
+            return await apply(pool, 5100000071), await apply(pool, 5100000072)
+        finally:
+            await pool.stop()
+
+    with FixtureSite() as site:
+        (first, explored, first_sent, first_upload), (second, replayed, second_sent, second_upload) = asyncio.run(run(site))
+
+    assert first.result == "miss" and [step.mode for step in first.steps] == ["explore"] * 4
+    assert first_sent and first_upload == "Resume.docx"
+    assert explored["fill"] + explored["select_option"] + explored["check"] + explored["uncheck"] == 6 and explored["batched_fill"] == 0
+
+    # The page's own validation only lets the replay through if FILL_JS really set every value
+    assert second.result == "hit" and second.plan == first.plan
+    assert [step.mode for step in second.steps] == ["replay"] * 4
+    assert second_sent and second_upload == "Resume.docx"
+    assert replayed["batched_fill"] == 2 and replayed["set_input_files"] == 1
+    assert replayed["fill"] + replayed["select_option"] + replayed["check"] + replayed["uncheck"] == 0
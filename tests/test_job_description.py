@@ -0,0 +1,165 @@
+import asyncio
+import base64
+import os
+from pathlib import Path
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import AsyncSessionLocal, init_db
+from app.models import Job
+from app.services.fake_llm import FakeChatModel
+from app.services.job_description import TOKENS_SAVED, _Tokenizer, condense_description, count_tokens
+from app.services.job_store import save_job
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.rate_limit import LLMRateLimiter
+from app.services.resume import ResumeBuilder
+from app.services.scrapers.extract import html_extractor
+
+LINKEDIN_DESCRIPTION = """About Acme Robotics
+Acme builds robots for warehouses. We were founded in 2012 and have offices in 14 countries.
+
+About the role
+You will own the ingestion platform that moves telemetry from our robot fleet.
+
+Responsibilities:
+- Design and operate Kafka-based streaming pipelines
+- Own service reliability, SLOs and on-call
+- Design and operate Kafka-based streaming pipelines
+
+Requirements:
+• 5+ years building backend services in Python or Go • Experience with PostgreSQL and Kubernetes
+
+Benefits
+- Unlimited PTO
+- 401k matching
+
+Acme Robotics is an equal opportunity employer. Qualified applicants are considered without regard to race, color, religion or veteran status.
+"""
+
+def test_boilerplate_is_dropped_and_requirements_kept():
+    condensed = condense_description(LINKEDIN_DESCRIPTION)
+
+    assert condensed.text.splitlines() == [
+        "About the role:",
+        "- You will own the ingestion platform that moves telemetry from our robot fleet.",
+        "Responsibilities:",
+        "- Design and operate Kafka-based streaming pipelines",
+        "- Own service reliability, SLOs and on-call",
+        "Requirements:",
+        "- 5+ years building backend services in Python or Go",
+        "- Experience with PostgreSQL and Kubernetes",
+    ]
+    assert condensed.tokens == count_tokens(condensed.text)
+    assert condensed.tokens_saved == condensed.original_tokens - condensed.tokens > condensed.tokens / 2
+    # Condensing is stable, so stored text can be condensed again safely
+    assert condense_description(condensed.text).text == condensed.text
+
+def test_budget_prefers_requirement_bullets():
+    filler = " ".join(f"Our team shipped project number {i} last year." for i in range(40))
+    description = f"{filler}\n\nRequirements:\n- Python\n- Kubernetes\n- Terraform"
+
+    condensed = condense_description(description, budget=60)
+
+    assert condensed.tokens <= 60
+    assert condensed.text.startswith("Our team shipped project number 0")
+    assert "Requirements:\n- Python\n- Kubernetes\n- Terraform" in condensed.text
+
+def test_scraped_descriptions_keep_their_structure_and_condense():
+    html = (Path(__file__).parent.parent / "benchmarks" / "fixtures" / "linkedin_job.html").read_text()
+    description = html_extractor().extract_html(html)["description"]
+    assert "\nRequirements\n- Postgres systems pipelines" in description
+
+    condensed = condense_description(description, budget=350)
+
+    source = description.splitlines()
+    requirements = source[source.index("Requirements") + 1:source.index("Benefits")]
+    # Every requirement bullet survives; responsibilities fill what is left
+    assert len(requirements) == 10
+    assert condensed.text.endswith("\n".join(["Requirements:"] + requirements))
+    assert condensed.text.startswith("Responsibilities:\n- Review pipelines")
+    assert "Benefits" not in condensed.text and "equal opportunity" not in condensed.text
+    assert condensed.tokens <= 350 and condensed.tokens_saved > condensed.original_tokens / 3
+
+def test_short_and_unstructured_descriptions():
+    assert condense_description("Needs kubernetes").text == "Needs kubernetes"
+    assert condense_description("").tokens_saved == 0
+
+    # Text without line breaks is condensed sentence by sentence
+    flat = "You will build pipelines. We are an equal opportunity employer. You will build pipelines. Python required."
+    assert condense_description(flat).text == "You will build pipelines.\nPython required."
+
+def test_tokenizer_never_downloads_its_encoding(tmp_path, monkeypatch):
+    tiktoken_load = pytest.importorskip("tiktoken.load")
+    def download(blobpath):
+        raise AssertionError(f"downloaded {blobpath}")
+    monkeypatch.setattr(tiktoken_load, "read_file", download)
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+
+    for tokenizer in (_Tokenizer("cl100k_base", path=None), _Tokenizer("cl100k_base", path=str(tmp_path / "missing.tiktoken"))):
+        assert tokenizer.name == "regex"
+        assert tokenizer.count("Design and operate Kafka-based pipelines.") == 9
+
+def test_tokenizer_loads_the_configured_tiktoken_file(tmp_path, monkeypatch):
+    pytest.importorskip("tiktoken")
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path / "cache"))
+    # Every single byte, plus merges that make "kafka" one token
+    ranks = [bytes([i]) for i in range(256)] + [b"ka", b"kaf", b"kafka"]
+    path = tmp_path / "cl100k_base.tiktoken"
+    path.write_text("".join(f"{base64.b64encode(token).decode()} {rank}\n" for rank, token in enumerate(ranks)))
+
+    tokenizer = _Tokenizer("cl100k_base", path=str(path))
+    assert tokenizer.name == "tiktoken:cl100k_base"
+    assert tokenizer.count("kafka") == 1
+    assert tokenizer.count("kafka kafka") == 3  # No merge for the leading space of " kafka"
+    assert _Tokenizer("p50k_base", path=str(path)).name == "regex"
+
+def test_condensed_form_is_stored_at_scrape_time():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            job = Job(title="Backend Engineer", company="Acme", description=LINKEDIN_DESCRIPTION, url="https://example.com/jd/stored", source="mock")
+            return await save_job(db, job)
+
+    job = asyncio.run(run())
+    condensed = condense_description(LINKEDIN_DESCRIPTION)
+    assert job.description == LINKEDIN_DESCRIPTION
+    assert job.description_condensed == condensed.text
+    assert job.condensed_tokens_saved == condensed.tokens_saved
+
+def test_tailoring_prompt_uses_the_condensed_description():
+    builder = ResumeBuilder(
+        llm=FakeChatModel(latency=0.0),
+        cache=LLMCache(namespace="test-jd-condense", persistent=False),
+        cache_policy=CachePolicy(enabled=False),
+        rate_limiter=LLMRateLimiter(60000, 10_000_000, name="test"),
+    )
+    saved = TOKENS_SAVED.value(model="fake-chat")
+
+    # The fake model echoes the prompt it was sent
+    tailored = asyncio.run(builder.tailor_resume("My resume", LINKEDIN_DESCRIPTION))
+
+    assert "Kafka-based streaming pipelines" in tailored
+    assert "equal opportunity" not in tailored
+    assert "Unlimited PTO" not in tailored
+    assert TOKENS_SAVED.value(model="fake-chat") == saved + condense_description(LINKEDIN_DESCRIPTION).tokens_saved
+
+def test_init_db_adds_columns_to_existing_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        # jobs as created before the condensed description columns existed
+        connection.execute(text(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, title VARCHAR, company VARCHAR, description TEXT, "
+            "url VARCHAR UNIQUE, source VARCHAR, created_at DATETIME, scraped_at DATETIME)"
+        ))
+        connection.execute(text("INSERT INTO jobs (title, url) VALUES ('Old', 'https://example.com/old')"))
+
+    init_db(engine)
+    init_db(engine)
+
+    columns = {column["name"] for column in inspect(engine).get_columns("jobs")}
+    assert {"description_condensed", "condensed_tokens_saved"} <= columns
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT title, description_condensed FROM jobs")).one() == ("Old", None)
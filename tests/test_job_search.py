@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.database import AsyncSessionLocal
+from app.models import Job, create_job_search
+from app.services.job_search import InvalidQuery, fts5_query, list_jobs
+from app.services.job_store import upsert_jobs
+
+SOURCE = "search-test"
+
+def seed():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            jobs = [
+                Job(title=f"Python Backend Engineer {i}", company="Snake Co", description="Remote role building APIs in Python", url=f"https://example.com/search/py{i}", source=SOURCE)
+                for i in range(5)
+            ] + [
+                Job(title="Frontend Developer", company="Pixel Inc", description="React and TypeScript, on-site", url="https://example.com/search/fe", source=SOURCE),
+                Job(title="Python Data Scientist", company="Pixel Inc", description="Pandas notebooks, some backend work, remote friendly", url="https://example.com/search/ds", source=SOURCE),
+            ]
+            await upsert_jobs(db, jobs)
+            await db.commit()
+    asyncio.run(run())
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded():
+    seed()
+
+def run_list(**kwargs):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await list_jobs(db, source=SOURCE, **kwargs)
+    return asyncio.run(run())
+
+def walk(**kwargs):
+    seen, cursor = [], None
+    while True:
+        page = run_list(cursor=cursor, **kwargs)
+        seen.extend(job.id for job in page.items)
+        if not page.next_cursor:
+            return seen
+        cursor = page.next_cursor
+
+def test_recent_pages_cover_everything_once_newest_first():
+    ids = walk(limit=3)
+    assert len(ids) == 7
+    assert ids == sorted(ids, reverse=True)
+
+def test_filters_by_company():
+    page = run_list(company="Pixel Inc")
+    assert {job.title for job in page.items} == {"Frontend Developer", "Python Data Scientist"}
+
+def test_search_matches_all_words_with_stemming():
+    page = run_list(q="python backend remote", limit=50)
+    titles = {job.title for job in page.items}
+    assert "Frontend Developer" not in titles
+    assert "Python Data Scientist" in titles
+    assert len(titles) == 6
+    # Porter stemming: "engineers" finds "Engineer"
+    assert len(run_list(q="engineers", limit=50).items) == 5
+
+def test_relevance_pages_are_stable_and_complete():
+    ids = walk(q="python backend", order="relevance", limit=2)
+    assert len(ids) == len(set(ids)) == 6
+
+def test_search_sees_rescraped_descriptions():
+    async def rescrape():
+        async with AsyncSessionLocal() as db:
+            await upsert_jobs(db, [Job(title="Frontend Developer", company="Pixel Inc", description="Now with Elixir", url="https://example.com/search/fe", source=SOURCE)])
+            await db.commit()
+    asyncio.run(rescrape())
+    assert [job.title for job in run_list(q="elixir").items] == ["Frontend Developer"]
+    assert run_list(q="typescript").items == []
+
+def test_invalid_input():
+    with pytest.raises(InvalidQuery):
+        run_list(cursor="not-a-cursor")
+    with pytest.raises(InvalidQuery):
+        run_list(order="relevance")
+    assert fts5_query('title:"python" NEAR(') == '"title" "python" "near"'
+    assert run_list(q="!!!").items == []
+
+def test_create_job_search_backfills_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE jobs (id INTEGER PRIMARY KEY, title VARCHAR, company VARCHAR, description TEXT, url VARCHAR, source VARCHAR, created_at DATETIME, scraped_at DATETIME)"))
+        connection.execute(text("INSERT INTO jobs (title, description) VALUES ('Rust Engineer', 'Embedded systems')"))
+
+    with engine.begin() as connection:
+        create_job_search(connection)
+        create_job_search(connection) # Idempotent
+        hits = connection.execute(text("SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH 'embedded'")).all()
+    assert len(hits) == 1
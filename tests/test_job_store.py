@@ -0,0 +1,66 @@
+import asyncio
+from datetime import timedelta
+from sqlalchemy import update
+from app.database import AsyncSessionLocal
+from app.models import Job, utcnow
+from app.services.job_store import fresh_jobs, upsert_jobs
+from app.services.scraper import MockScraper, ScraperFactory
+from app.services.urls import linkedin_job_id, normalize_url
+
+def test_normalize_url_canonicalizes_linkedin_and_strips_tracking():
+    canonical = "https://www.linkedin.com/jobs/view/3812345678/"
+    assert normalize_url("https://www.linkedin.com/jobs/view/senior-python-engineer-at-acme-3812345678/?trk=public_jobs&refId=abc") == canonical
+    assert normalize_url("https://uk.linkedin.com/jobs/view/3812345678") == canonical
+    assert normalize_url("https://www.linkedin.com/jobs/search/?currentJobId=3812345678&keywords=python") == canonical
+    assert normalize_url("HTTPS://Example.com:443/job/1?utm_source=x&b=2&a=1#apply") == "https://example.com/job/1?a=1&b=2"
+    assert normalize_url("https://www.linkedin.com/jobs/collections/?position=3&trk=x&mc_cid=1") == "https://www.linkedin.com/jobs/collections/"
+
+def test_normalize_url_keeps_linkedin_tracking_names_on_other_hosts():
+    first = normalize_url("https://boards.greenhouse.io/acme/jobs?position=42&gclid=abc")
+    second = normalize_url("https://boards.greenhouse.io/acme/jobs?position=43&utm_medium=email")
+    assert first == "https://boards.greenhouse.io/acme/jobs?position=42"
+    assert second == "https://boards.greenhouse.io/acme/jobs?position=43"
+    assert normalize_url("https://jobs.example.com/apply?ref=7&src=board") == "https://jobs.example.com/apply?ref=7&src=board"
+
+def test_only_linkedin_hosts_count_as_linkedin():
+    lookalikes = [
+        "https://notlinkedin.com/jobs/view/3812345678/",
+        "https://evil.com/jobs/view/3812345678/?x=linkedin.com",
+        "https://linkedin.com.evil.com/jobs/view/3812345678/",
+    ]
+    for url in lookalikes:
+        assert linkedin_job_id(url) is None
+        assert normalize_url(url) != "https://www.linkedin.com/jobs/view/3812345678/"
+        assert isinstance(ScraperFactory.get_scraper(url), MockScraper)
+    assert linkedin_job_id("https://LinkedIn.com/jobs/view/3812345678/") == "3812345678"
+
+def test_upsert_jobs_counts_created_and_updated():
+    def job(i, title):
+        return Job(title=title, company="Acme", description="Desc", url=f"https://upsert.test/jobs/{i}?utm_campaign=x", source="mock")
+
+    async def run():
+        async with AsyncSessionLocal() as db:
+            first = await upsert_jobs(db, [job(i, "Old") for i in range(300)], chunk_size=128)
+            second = await upsert_jobs(db, [job(i, "New") for i in range(250, 400)], chunk_size=128)
+            stored = await db.get(Job, second.ids["https://upsert.test/jobs/299"], populate_existing=True)
+            return first, second, stored
+
+    first, second, stored = asyncio.run(run())
+    assert (first.created, first.updated) == (300, 0)
+    assert (second.created, second.updated) == (100, 50)
+    assert stored.title == "New"
+    assert stored.url == "https://upsert.test/jobs/299"
+
+def test_fresh_jobs_respects_ttl():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            result = await upsert_jobs(db, [Job(title="T", company="C", description="D", url="https://fresh.test/1", source="mock")])
+            fresh_now = await fresh_jobs(db, ["https://fresh.test/1"], ttl_seconds=3600)
+            await db.execute(update(Job).where(Job.id == result.ids["https://fresh.test/1"]).values(scraped_at=utcnow() - timedelta(hours=2)))
+            await db.commit()
+            fresh_later = await fresh_jobs(db, ["https://fresh.test/1"], ttl_seconds=3600)
+            return fresh_now, fresh_later
+
+    fresh_now, fresh_later = asyncio.run(run())
+    assert list(fresh_now) == ["https://fresh.test/1"]
+    assert fresh_later == {}
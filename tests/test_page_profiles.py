@@ -0,0 +1,67 @@
+import asyncio
+from app.services.page_profiles import PageProfile, SCRAPE_PROFILE, SUBMIT_PROFILE
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+        self.frame = None
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+class FakeContext:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+def route_outcomes(profile, requests):
+    async def run():
+        context = FakeContext()
+        await profile.install(context)
+        if not context.routes:
+            return ["continued"] * len(requests), 0
+        _, handler = context.routes[0]
+        outcomes = []
+        for resource_type, url in requests:
+            route = FakeRoute(resource_type, url)
+            await handler(route)
+            outcomes.append(route.outcome)
+        return outcomes, len(context.routes)
+
+    return asyncio.run(run())
+
+REQUESTS = [
+    ("document", "https://www.linkedin.com/jobs/view/1/"),
+    ("script", "https://static.licdn.com/sc/h/app.js"),
+    ("image", "https://media.licdn.com/logo.png"),
+    ("stylesheet", "https://static.licdn.com/sc/h/app.css"),
+    ("script", "https://www.googletagmanager.com/gtm.js"),
+    ("xhr", "https://px.ads.linkedin.com/collect"),
+]
+
+def test_scrape_profile_blocks_assets_and_trackers():
+    outcomes, routes = route_outcomes(SCRAPE_PROFILE, REQUESTS)
+    assert routes == 1
+    assert outcomes == ["continued", "continued", "aborted", "aborted", "aborted", "aborted"]
+    assert SCRAPE_PROFILE.wait_until == "domcontentloaded"
+
+def test_submit_profile_keeps_form_resources():
+    outcomes, _ = route_outcomes(SUBMIT_PROFILE, REQUESTS)
+    assert outcomes == ["continued", "continued", "continued", "continued", "aborted", "aborted"]
+
+def test_domain_deny_list_matches_subdomains_only():
+    profile = PageProfile(name="test", blocked_domains=("tracker.com",))
+    assert profile.should_block("script", "https://cdn.tracker.com/t.js")
+    assert profile.should_block("script", "https://tracker.com/t.js")
+    assert not profile.should_block("script", "https://nottracker.com/t.js")
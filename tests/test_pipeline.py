@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Application, ApplicationStatus, Job, PipelineItem
+from app.services.fake_llm import FakeChatModel
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.pipeline import Pipeline, create_run
+from app.services.rate_limit import LLMRateLimiter
+from app.services.resume import ResumeBuilder
+
+STAGE_DELAY = 0.05
+
+class FakeScraper:
+    source = "mock"
+
+    def __init__(self, log):
+        self.log = log
+
+    async def scrape_job(self, url):
+        self.log.append(("scrape", url, time.perf_counter()))
+        await asyncio.sleep(STAGE_DELAY)
+        return Job(title="Pipeline Engineer", company="Flow Co", description=f"Kafka pipelines for {url}", url=url, source="mock")
+
+class FakeScraperFactory:
+    def __init__(self):
+        self.log = []
+
+    def get_scraper(self, url):
+        return FakeScraper(self.log)
+
+class FakeSubmitter:
+    def __init__(self, status=ApplicationStatus.SUBMITTED):
+        self.status = status
+        self.calls = []
+
+    async def submit_application(self, application):
+        assert application.job.url # Loaded eagerly
+        assert application.resume.content # Uploaded by the LinkedIn submitter
+        self.calls.append(application.id)
+        await asyncio.sleep(STAGE_DELAY)
+        return self.status
+
+def make_pipeline(namespace, submitter=None, factory=None, **kwargs):
+    llm = FakeChatModel(latency=STAGE_DELAY)
+    builder = ResumeBuilder(
+        llm=llm,
+        cache=LLMCache(namespace=namespace, persistent=False),
+        cache_policy=CachePolicy(enabled=False),
+        rate_limiter=LLMRateLimiter(60000, 10_000_000, name="test"),
+    )
+    pipeline = Pipeline(
+        resume_builder=builder,
+        submitter=submitter or FakeSubmitter(),
+        scraper_factory=factory or FakeScraperFactory(),
+        **{"scrape_workers": 1, "tailor_workers": 1, "submit_workers": 1, **kwargs},
+    )
+    return pipeline, llm
+
+def items(run_id):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(PipelineItem).where(PipelineItem.run_id == run_id).order_by(PipelineItem.id))
+            return list(result.scalars())
+    return asyncio.run(run())
+
+def test_stages_overlap_across_jobs():
+    urls = [f"https://example.com/pipeline/overlap/{i}" for i in range(6)]
+    pipeline, llm = make_pipeline("test-pipeline-overlap")
+    run_id = asyncio.run(create_run(urls + urls[:1], "My resume"))
+
+    report = asyncio.run(pipeline.run(run_id))
+
+    assert (report.done, report.failed) == (6, 0)
+    assert llm.stats["calls"] == 6
+    # Run one job at a time, the run would take as long as all stages' work added up
+    busy = sum(stats.busy_seconds for stats in report.stages.values())
+    assert busy >= 6 * 3 * STAGE_DELAY
+    assert report.duration < busy * 0.75
+    assert all(stats.completed == 6 for stats in report.stages.values())
+    for item in items(run_id):
+        assert item.status == "done"
+        assert None not in (item.job_id, item.resume_id, item.application_id)
+
+def test_failed_submissions_resume_from_their_checkpoint():
+    urls = [f"https://example.com/pipeline/resume/{i}" for i in range(3)]
+    factory = FakeScraperFactory()
+    failing, llm = make_pipeline("test-pipeline-failing", submitter=FakeSubmitter(ApplicationStatus.FAILED), factory=factory)
+    run_id = asyncio.run(create_run(urls, "My resume"))
+
+    report = asyncio.run(failing.run(run_id))
+    assert (report.done, report.failed) == (0, 3)
+    failed = items(run_id)
+    assert {item.failed_stage for item in failed} == {"submit"}
+
+    # Without retry_failed nothing is pending
+    assert asyncio.run(failing.run(run_id)).done == 0
+
+    submitter = FakeSubmitter()
+    retry, retry_llm = make_pipeline("test-pipeline-retry", submitter=submitter, factory=factory)
+    report = asyncio.run(retry.run(run_id, retry_failed=True))
+
+    assert (report.done, report.failed) == (3, 0)
+    assert len(factory.log) == 3 # Not scraped again
+    assert retry_llm.stats["calls"] == 0 # Not tailored again
+    # The same applications were retried, not new ones created
+    assert sorted(submitter.calls) == sorted(item.application_id for item in failed)
+
+    async def statuses():
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Application.status).where(Application.id.in_(submitter.calls)))
+            return set(result.scalars())
+    assert asyncio.run(statuses()) == {"submitted"}
+
+def test_interrupted_run_continues():
+    urls = [f"https://example.com/pipeline/interrupted/{i}" for i in range(6)]
+    factory = FakeScraperFactory()
+    pipeline, _ = make_pipeline("test-pipeline-interrupted", factory=factory)
+    run_id = asyncio.run(create_run(urls, "My resume"))
+
+    async def interrupt():
+        try:
+            await asyncio.wait_for(pipeline.run(run_id), timeout=4 * STAGE_DELAY)
+        except asyncio.TimeoutError:
+            pass
+    asyncio.run(interrupt())
+    checkpointed = [item for item in items(run_id) if item.job_id is not None]
+    assert 0 < len(checkpointed) < 6
+
+    report = asyncio.run(pipeline.run(run_id))
+    assert report.done + len([item for item in checkpointed if item.status == "done"]) == 6
+    assert all(item.status == "done" for item in items(run_id))
+    # Checkpointed jobs weren't scraped twice
+    scraped = [url for _, url, _ in factory.log]
+    assert all(scraped.count(item.url) == 1 for item in checkpointed)
+
+def test_a_failure_that_cannot_be_checkpointed_still_settles():
+    urls = [f"https://example.com/pipeline/unrecorded/{i}" for i in range(2)]
+    pipeline, _ = make_pipeline("test-pipeline-unrecorded", submitter=FakeSubmitter(ApplicationStatus.FAILED))
+    run_id = asyncio.run(create_run(urls, "My resume"))
+
+    async def database_down(item, stage, error):
+        raise ConnectionError("database is down")
+    pipeline._fail = database_down
+
+    report = asyncio.run(asyncio.wait_for(pipeline.run(run_id), timeout=5))
+    assert (report.done, report.failed) == (0, 2)
+    assert all(item.status == "pending" for item in items(run_id))
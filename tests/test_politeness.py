@@ -0,0 +1,158 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services.politeness import HostPolicy, HostThrottled, PolitenessScheduler, host_key
+
+FAST = HostPolicy(requests_per_minute=60000, burst=100, max_in_flight=10)
+
+def test_host_key_ignores_www_and_case():
+    assert host_key("https://WWW.LinkedIn.com/jobs/view/1/") == "linkedin.com"
+    assert host_key("https://boards.greenhouse.io/acme") == "boards.greenhouse.io"
+
+def test_per_host_token_bucket_paces_grants():
+    # 10/s with no burst beyond one: five grants need ~0.4s
+    scheduler = PolitenessScheduler(max_in_flight=10, default_policy=HostPolicy(requests_per_minute=600, burst=1, max_in_flight=10))
+
+    async def run():
+        async def one():
+            async with scheduler.slot("https://a.test/x"):
+                return time.monotonic()
+        started = time.monotonic()
+        times = await asyncio.gather(*(one() for _ in range(5)))
+        return max(times) - started
+
+    assert 0.3 < asyncio.run(run()) < 1.0
+
+def test_max_in_flight_per_host_and_other_hosts_unaffected():
+    scheduler = PolitenessScheduler(max_in_flight=10, policies={"slow.test": HostPolicy(requests_per_minute=60000, burst=100, max_in_flight=1)}, default_policy=FAST)
+    peak = {"slow.test": 0, "fast.test": 0}
+    current = {"slow.test": 0, "fast.test": 0}
+
+    async def one(host):
+        async with scheduler.slot(f"https://{host}/job"):
+            current[host] += 1
+            peak[host] = max(peak[host], current[host])
+            await asyncio.sleep(0.01)
+            current[host] -= 1
+
+    async def run():
+        await asyncio.gather(*(one(host) for host in ["slow.test", "fast.test"] * 5))
+
+    asyncio.run(run())
+    assert peak["slow.test"] == 1
+    assert peak["fast.test"] > 1
+
+def test_free_capacity_is_shared_round_robin():
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=FAST)
+    order = []
+
+    async def one(host):
+        async with scheduler.slot(f"https://{host}/job"):
+            order.append(host)
+            await asyncio.sleep(0.001)
+
+    async def run():
+        # A's whole backlog is queued before B shows up
+        tasks = [asyncio.create_task(one("a.test")) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(one("b.test")) for _ in range(2)]
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    b_positions = [i for i, host in enumerate(order) if host == "b.test"]
+    assert b_positions[-1] <= 4 # Interleaved, not stuck behind all of A
+
+def test_throttle_slows_host_down_and_recovers():
+    policy = HostPolicy(requests_per_minute=60000, burst=100, max_in_flight=10, cooldown_seconds=0.2, recover_after=2)
+    scheduler = PolitenessScheduler(max_in_flight=10, default_policy=policy)
+
+    async def run():
+        async with scheduler.slot("https://a.test/1") as ticket:
+            assert ticket.observe(status=999) == "999"
+        started = time.monotonic()
+        async with scheduler.slot("https://a.test/2") as ticket:
+            waited = time.monotonic() - started
+            ticket.observe(status=200)
+        return waited
+
+    waited = asyncio.run(run())
+    lane = scheduler._lanes["a.test"]
+    assert waited >= 0.15
+    assert lane.rate_factor == 0.5
+    assert scheduler.stats()["a.test"]["rate_per_minute"] == 30000
+
+    lane.succeeded()
+    assert lane.rate_factor == pytest.approx(0.6) # Additive step back up after `recover_after` clean responses
+
+def test_captcha_pages_count_as_throttling():
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=FAST)
+
+    class Page:
+        url = "https://www.linkedin.com/checkpoint/challenge/abc"
+
+    class Response:
+        status = 200
+
+    async def run():
+        async with scheduler.slot("https://www.linkedin.com/jobs/view/1/") as ticket:
+            ticket.check(Response(), Page())
+
+    with pytest.raises(HostThrottled) as error:
+        asyncio.run(run())
+    assert error.value.reason == "captcha"
+
+def test_cancelled_waiters_release_nothing_and_leave_the_queue():
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=FAST)
+
+    async def run():
+        holder_release = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot("https://a.test/1"):
+                await holder_release.wait()
+
+        holding = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(scheduler.slot("https://a.test/2").__aenter__())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        holder_release.set()
+        await holding
+        # Capacity is fully back
+        async with scheduler.slot("https://a.test/3"):
+            pass
+
+    asyncio.run(run())
+    assert scheduler._in_flight == 0
+    assert scheduler.stats()["a.test"]["waiting"] == 0
+
+def test_linkedin_scraper_reports_999_to_the_scheduler(monkeypatch):
+    monkeypatch.delenv("LINKEDIN_USERNAME", raising=False)
+    from app.services.scrapers.linkedin import LinkedInScraper
+    from app.services.sessions import SessionManager
+
+    class Response:
+        status = 999
+
+    class Page:
+        url = "https://www.linkedin.com/jobs/view/1/"
+
+        async def goto(self, url, **kwargs):
+            return Response()
+
+    class Pool:
+        @asynccontextmanager
+        async def page(self, profile=None, **options):
+            yield Page()
+
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=FAST)
+    scraper = LinkedInScraper(pool=Pool(), sessions=SessionManager(pool=Pool()), scheduler=scheduler)
+
+    with pytest.raises(HostThrottled):
+        asyncio.run(scraper.scrape_job("https://www.linkedin.com/jobs/view/1/"))
+    assert scheduler._lanes["linkedin.com"].strikes == 1
@@ -0,0 +1,60 @@
+import asyncio
+from datetime import timedelta
+from sqlalchemy import update
+from app.database import AsyncSessionLocal
+from app.models import Task, TaskStatus
+from app.services import queue
+from app.worker import Worker
+
+def test_claim_is_exclusive_and_respects_leases():
+    async def run():
+        async with AsyncSessionLocal() as db:
+            task = await queue.enqueue(db, "test_exclusive", {"n": 1})
+            first = await queue.claim(db, "worker-a", limit=5, kinds=["test_exclusive"])
+            second = await queue.claim(db, "worker-b", limit=5, kinds=["test_exclusive"])
+            assert [t.id for t in first] == [task.id]
+            assert second == []
+
+            # An expired lease makes the task claimable by another worker
+            await db.execute(update(Task).where(Task.id == task.id).values(locked_until=queue.utcnow() - timedelta(seconds=1)))
+            await db.commit()
+            reclaimed = await queue.claim(db, "worker-b", limit=5, kinds=["test_exclusive"])
+            assert [t.id for t in reclaimed] == [task.id]
+            assert reclaimed[0].attempts == 2
+
+            # The original worker lost its lease and can no longer complete the task
+            assert not await queue.complete(db, first[0], "worker-a", {"ok": True})
+            assert await queue.complete(db, reclaimed[0], "worker-b", {"ok": True})
+
+    asyncio.run(run())
+
+def test_failed_tasks_back_off_then_dead_letter():
+    calls = []
+
+    async def flaky(payload):
+        calls.append(payload)
+        raise RuntimeError("still broken")
+
+    async def run():
+        worker = Worker(handlers={"test_flaky": flaky}, concurrency=1)
+        async with AsyncSessionLocal() as db:
+            task = await queue.enqueue(db, "test_flaky", {"n": 2}, max_attempts=2)
+
+            assert await worker.run_once() == 1
+            await db.refresh(task)
+            assert task.status == TaskStatus.QUEUED
+            assert task.run_at > queue.utcnow()
+            assert task.last_error == "still broken"
+
+            # Not runnable until the backoff elapses
+            assert await worker.run_once() == 0
+            await db.execute(update(Task).where(Task.id == task.id).values(run_at=queue.utcnow()))
+            await db.commit()
+
+            assert await worker.run_once() == 1
+            await db.refresh(task)
+            assert task.status == TaskStatus.DEAD
+            assert task.attempts == 2
+            assert len(calls) == 2
+
+    asyncio.run(run())
@@ -0,0 +1,124 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import update
+
+from app.database import AsyncSessionLocal
+from app.models import Job
+from app.services.job_store import upsert_jobs
+from app.services.ranking import JobIndex, hash_features, tokenize
+
+def test_tokenize_keeps_tech_terms_and_bigrams():
+    tokens = tokenize("Senior C++ and Node.js engineer, machine learning")
+    assert "c++" in tokens
+    assert "node.js" in tokens
+    assert "machine learning" in tokens
+    assert "and" not in tokens
+
+def test_hash_features_is_sublinear_and_stable():
+    first = hash_features(["python python python go"], n_features=1024)
+    second = hash_features(["python python python go"], n_features=1024)
+    assert (first != second).nnz == 0
+    assert sorted(first.data.tolist())[-1] < 3
+
+def test_rank_orders_by_similarity_and_applies_thresholds():
+    index = JobIndex(path=None, n_features=2 ** 12)
+    index.add([1, 2, 3], [
+        "Backend engineer: Python, PostgreSQL, Kubernetes",
+        "Frontend developer: React, TypeScript, CSS",
+        "Data engineer: Python, Spark, Airflow",
+    ])
+
+    ranked = index.rank("Python and Kubernetes backend services", top_k=3)
+    assert [r.job_id for r in ranked][:2] == [1, 3]
+    assert all(0 < r.score <= 1 for r in ranked)
+    assert 2 not in [r.job_id for r in ranked] # No shared terms
+
+    assert len(index.rank("Python", top_k=1)) == 1
+    assert index.rank("Python", min_score=0.99) == []
+    assert index.rank("") == []
+
+def test_add_replaces_existing_rows():
+    index = JobIndex(path=None, n_features=2 ** 12)
+    index.add([1, 2], ["golang services", "react frontend"])
+    index.add([1], ["rust embedded firmware"])
+
+    assert len(index) == 2
+    assert index.rank("golang") == []
+    assert [r.job_id for r in index.rank("rust firmware")] == [1]
+
+def test_persisted_index_round_trips(tmp_path):
+    index = JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 12)
+    index.add([5, 9], ["python backend", "react frontend"])
+    index.save()
+
+    restored = JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 12)
+    assert restored.load()
+    assert restored.max_job_id == 9
+    assert [r.job_id for r in restored.rank("react")] == [9]
+
+    # A different feature space can't reuse the file
+    assert not JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 10).load()
+
+def test_sync_indexes_only_new_and_rescraped_jobs(tmp_path):
+    index = JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 12)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await upsert_jobs(db, [
+                Job(title="Ranking A", company="C", description="elixir phoenix", url="https://example.com/rank/a", source="mock"),
+                Job(title="Ranking B", company="C", description="haskell compiler", url="https://example.com/rank/b", source="mock"),
+            ])
+            await db.commit()
+            first = await index.sync(db)
+            again = await index.sync(db)
+
+            # Re-scrape B with a new description
+            result = await upsert_jobs(db, [
+                Job(title="Ranking B", company="C", description="ocaml compiler", url="https://example.com/rank/b", source="mock"),
+            ])
+            await db.commit()
+            rescraped = await index.sync(db)
+            return first, again, rescraped, result.ids["https://example.com/rank/b"]
+
+    first, again, rescraped, b_id = asyncio.run(scenario())
+    assert first >= 2
+    assert again == 0
+    assert rescraped == 1
+    assert [r.job_id for r in index.rank("ocaml")] == [b_id]
+    assert index.rank("haskell") == []
+
+    # Restart: the persisted index is current, nothing to re-index
+    restored = JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 12)
+
+    async def resync():
+        async with AsyncSessionLocal() as db:
+            return await restored.sync(db)
+
+    assert asyncio.run(resync()) == 0
+    assert len(restored) == len(index)
+
+def test_sync_picks_up_a_rescrape_committed_behind_the_watermark(tmp_path):
+    index = JobIndex(path=str(tmp_path / "job_index"), n_features=2 ** 12)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            result = await upsert_jobs(db, [
+                Job(title="Late A", company="C", description="fortran solver", url="https://example.com/rank/late-a", source="mock"),
+                Job(title="Late B", company="C", description="cobol ledger", url="https://example.com/rank/late-b", source="mock"),
+            ])
+            await db.commit()
+            await index.sync(db)
+
+            # A re-scrape stamped before that sync's watermark, committed after it
+            late_id = result.ids["https://example.com/rank/late-a"]
+            await db.execute(update(Job).where(Job.id == late_id).values(
+                description="erlang telecom", scraped_at=index.watermark - timedelta(seconds=1),
+            ))
+            await db.commit()
+            return late_id, await index.sync(db), await index.sync(db)
+
+    late_id, late, again = asyncio.run(scenario())
+    assert late == 1 and again == 0
+    assert [r.job_id for r in index.rank("erlang telecom")] == [late_id]
+    assert index.rank("fortran") == []
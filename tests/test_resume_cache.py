@@ -0,0 +1,100 @@
+import asyncio
+import os
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.resume import ResumeBuilder
+
+class CountingBuilder(ResumeBuilder):
+    """ResumeBuilder whose LLM call is replaced by a slow, counting stub."""
+
+    def __init__(self, cache, **kwargs):
+        super().__init__(cache=cache, **kwargs)
+        self.calls = 0
+
+    async def _generate(self, base_resume_content, job_description):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if "fail" in job_description:
+            raise RuntimeError("LLM unavailable")
+        return f"tailored:{base_resume_content}:{job_description}"
+
+def test_repeat_and_concurrent_requests_share_one_llm_call():
+    cache = LLMCache(namespace="test-singleflight", persistent=False)
+    builder = CountingBuilder(cache, cache_policy=CachePolicy())
+
+    async def run():
+        concurrent = await asyncio.gather(*(builder.tailor_resume("cv", "python role") for _ in range(5)))
+        repeat = await builder.tailor_resume("cv", "python role")
+        return concurrent, repeat
+
+    concurrent, repeat = asyncio.run(run())
+    assert builder.calls == 1
+    assert set(concurrent) == {repeat} == {"tailored:cv:python role"}
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["hits_memory"] == 1
+
+def test_opt_out_policy_and_errors_are_not_cached():
+    cache = LLMCache(namespace="test-policy", persistent=False)
+    builder = CountingBuilder(cache, cache_policy=CachePolicy(max_temperature=0.2))
+
+    async def run():
+        # temperature 0.7 is above the policy limit
+        await builder.tailor_resume("cv", "role")
+        await builder.tailor_resume("cv", "role")
+        builder.cache_policy = CachePolicy()
+        await builder.tailor_resume("cv", "role", use_cache=False)
+        failed = await builder.tailor_resume("cv", "fail")
+        await builder.tailor_resume("cv", "fail")
+        return failed
+
+    failed = asyncio.run(run())
+    assert builder.calls == 5
+    assert failed.startswith("Error tailoring resume")
+    assert cache.stats()["bypassed"] == 3
+
+def test_persistent_tier_survives_a_new_process_cache():
+    first = CountingBuilder(LLMCache(namespace="test-persistent"), cache_policy=CachePolicy())
+    asyncio.run(first.tailor_resume("cv", "data role"))
+
+    second = CountingBuilder(LLMCache(namespace="test-persistent"), cache_policy=CachePolicy())
+    result = asyncio.run(second.tailor_resume("cv", "data role"))
+    assert second.calls == 0
+    assert result == "tailored:cv:data role"
+    assert second.cache.stats()["hits_db"] == 1
+
+def test_lru_evicts_oldest_entry():
+    cache = LLMCache(namespace="test-lru", max_entries=2, persistent=False)
+    builder = CountingBuilder(cache, cache_policy=CachePolicy())
+
+    async def run():
+        for jd in ["a", "b", "c", "a"]:
+            await builder.tailor_resume("cv", jd)
+
+    asyncio.run(run())
+    assert builder.calls == 4
+    assert cache.stats()["entries"] == 2
+
+def test_cancelling_the_leader_does_not_cancel_callers_sharing_its_call():
+    cache = LLMCache(namespace="test-leader-cancelled", persistent=False)
+    builder = CountingBuilder(cache, cache_policy=CachePolicy())
+
+    async def run():
+        leader = asyncio.create_task(builder.tailor_resume("cv", "platform role"))
+        await asyncio.sleep(0) # The leader starts the LLM call
+        waiter = asyncio.create_task(builder.tailor_resume("cv", "platform role"))
+        await asyncio.sleep(0.001) # The waiter joins it
+        leader.cancel()
+        result = await waiter
+        return leader.cancelled(), result
+
+    leader_cancelled, result = asyncio.run(run())
+    assert leader_cancelled
+    assert result == "tailored:cv:platform role"
+    # The waiter made the call the leader abandoned
+    assert builder.calls == 2
+    assert cache.stats()["coalesced"] == 1
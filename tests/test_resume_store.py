@@ -0,0 +1,107 @@
+import asyncio
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import AsyncSessionLocal, init_db
+from app.migrations import migrate_resumes
+from app.models import Application, Job, Resume
+from app.services.applications import get_application
+from app.services.resume_store import add_base_resume, add_tailored_resume, add_tailored_resumes
+from tests.test_applications import count_queries
+
+BASE = "\n".join(
+    ["# Jane Doe", "Backend engineer with 8 years of experience."]
+    + [f"- Built service {i}: Python, PostgreSQL, Kafka; cut p99 latency by {i}0%" for i in range(40)]
+)
+
+def variant(i: int) -> str:
+    lines = BASE.splitlines()
+    lines[1] = f"Backend engineer focused on streaming platforms (variant {i})."
+    return "\n".join(lines[:30] + [f"- Tailored highlight {i}: led Kubernetes migration"] + lines[30:])
+
+def store(*contents):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            resumes = await add_tailored_resumes(db, BASE, list(contents))
+            await db.commit()
+            return [resume.id for resume in resumes]
+    return asyncio.run(run())
+
+def load(resume_id):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            resume = await db.get(Resume, resume_id)
+            return resume, resume.content
+    return asyncio.run(run())
+
+def test_variants_are_compressed_against_their_base():
+    (resume_id,) = store(variant(1))
+
+    resume, content = load(resume_id)
+    assert content == variant(1)
+    assert resume._content is None
+    assert resume.parent.base_resume and resume.parent.content == BASE
+    # Most of the variant is a back-reference into the base
+    assert len(resume.compressed) < len(variant(1).encode()) / 10
+
+def test_identical_contents_are_stored_once():
+    first, second, again = store(variant(2), variant(3), variant(2))
+    assert first == again != second
+    assert store(variant(3)) == [second]
+
+    async def bases():
+        async with AsyncSessionLocal() as db:
+            base = await add_base_resume(db, BASE)
+            same_as_base = await add_tailored_resume(db, BASE, BASE)
+            return base.id, same_as_base.id
+    base_id, same_as_base_id = asyncio.run(bases())
+    assert base_id == same_as_base_id == load(first)[0].parent_id
+
+def test_application_detail_decodes_without_extra_queries():
+    (resume_id,) = store(variant(4))
+
+    async def add():
+        async with AsyncSessionLocal() as db:
+            job = Job(title="Store Engineer", company="Acme", url="https://example.com/resume-store", source="mock")
+            application = Application(job=job, resume_id=resume_id)
+            db.add(application)
+            await db.commit()
+            return application.id
+    application_id = asyncio.run(add())
+
+    async def read():
+        async with AsyncSessionLocal() as db:
+            return (await get_application(db, application_id)).resume.content
+
+    with count_queries() as statements:
+        content = asyncio.run(read())
+    assert content == variant(4)
+    assert len(statements) == 2
+
+def test_migration_hashes_merges_and_compresses_legacy_rows(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    init_db(engine)
+    resumes = Resume.__table__
+    with engine.begin() as connection:
+        # Rows as the old API wrote them: plain content, no hash, no parent
+        ids = [
+            connection.execute(insert(resumes).values(content=content, base_resume=base)).inserted_primary_key[0]
+            for content, base in [(BASE, True), (variant(5), False), (variant(5), False), (variant(6), False)]
+        ]
+        job_id = connection.execute(insert(Job.__table__).values(title="Legacy", url="https://example.com/legacy")).inserted_primary_key[0]
+        connection.execute(insert(Application.__table__).values(job_id=job_id, resume_id=ids[2]))
+
+    stats = migrate_resumes(engine, batch_size=2)
+
+    assert (stats["rows"], stats["merged"], stats["compressed"]) == (4, 1, 2)
+    assert stats["bytes_after"] < stats["bytes_before"]
+    with Session(engine) as session:
+        stored = {resume.id: resume for resume in session.scalars(select(Resume))}
+        assert sorted(stored) == [ids[0], ids[1], ids[3]]
+        assert stored[ids[0]]._content == BASE
+        assert stored[ids[1]]._content is None and stored[ids[1]].content == variant(5)
+        assert stored[ids[3]].content == variant(6)
+        assert session.scalar(select(Application.resume_id)) == ids[1]
+
+    assert migrate_resumes(engine)["rows"] == 0
@@ -0,0 +1,66 @@
+import asyncio
+import os
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+from app.services.fake_llm import FakeChatModel
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.rate_limit import LLMRateLimiter
+from app.services.resume import TIME_TO_FIRST_TOKEN, ResumeBuilder
+
+def make_builder(llm, namespace):
+    builder = ResumeBuilder(
+        llm=llm,
+        cache=LLMCache(namespace=namespace, persistent=False),
+        cache_policy=CachePolicy(enabled=True),
+        rate_limiter=LLMRateLimiter(60000, 10_000_000, name="test"),
+    )
+    builder.retry_base_seconds = 0.01
+    return builder
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+def test_stream_yields_tokens_and_caches_the_full_text():
+    llm = FakeChatModel(latency=0.0)
+    builder = make_builder(llm, "test-stream")
+    observed = TIME_TO_FIRST_TOKEN.count(model="fake-chat")
+
+    chunks = asyncio.run(collect(builder.astream_tailor("My resume", "Needs kubernetes")))
+    text = "".join(chunks)
+
+    assert len(chunks) > 1
+    assert "kubernetes" in text
+    assert TIME_TO_FIRST_TOKEN.count(model="fake-chat") == observed + 1
+
+    # Replayed from the cache in one piece, without another LLM call
+    assert asyncio.run(collect(builder.astream_tailor("My resume", "Needs kubernetes"))) == [text]
+    assert llm.stats["calls"] == 1
+
+def test_closing_the_stream_early_caches_nothing():
+    llm = FakeChatModel(latency=0.0, token_delay=0.01)
+    builder = make_builder(llm, "test-stream-closed")
+
+    async def first_chunk_then_close():
+        stream = builder.astream_tailor("My resume", "Needs terraform")
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(first_chunk_then_close())
+    assert asyncio.run(builder.cache.peek(builder._cache_key("My resume", "Needs terraform"))) is None
+
+def test_stream_retries_429_before_first_token():
+    llm = FakeChatModel(latency=0.0, rpm_limit=1, window_seconds=0.1)
+    builder = make_builder(llm, "test-stream-429")
+
+    async def two_streams():
+        return await asyncio.gather(
+            collect(builder.astream_tailor("My resume", "role a", use_cache=False)),
+            collect(builder.astream_tailor("My resume", "role b", use_cache=False)),
+        )
+
+    first, second = asyncio.run(two_streams())
+    assert "".join(first) and "".join(second)
+    assert llm.stats["rate_limited"] > 0
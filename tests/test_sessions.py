@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import stat
+import threading
+from contextlib import asynccontextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.services.politeness import HostPolicy, PolitenessScheduler
+from app.services.sessions import LoginFailed, SessionManager, SessionStore, SiteAuth
+
+# In-memory stand-in for a site with a login wall
+
+class FakeSite:
+    def __init__(self):
+        self.valid_tokens = set()
+        self.logins = 0
+
+    def issue(self):
+        self.logins += 1
+        token = f"token-{self.logins}"
+        self.valid_tokens.add(token)
+        return token
+
+class FakeContext:
+    def __init__(self, state):
+        self.cookies = {c["name"]: c["value"] for c in (state or {}).get("cookies", [])}
+
+    async def storage_state(self):
+        return {"cookies": [{"name": k, "value": v} for k, v in self.cookies.items()], "origins": []}
+
+    async def clear_cookies(self):
+        self.cookies = {}
+
+class FakePage:
+    def __init__(self, site, context):
+        self.site = site
+        self.context = context
+        self.url = "about:blank"
+
+    async def goto(self, url, **kwargs):
+        logged_in = self.context.cookies.get("session") in self.site.valid_tokens
+        self.url = url if logged_in else "https://site.test/login?next=" + url
+
+class FakeAuth(SiteAuth):
+    async def login(self, page, username, password):
+        if password != "secret":
+            raise LoginFailed("bad password")
+        page.context.cookies["session"] = page.site.issue()
+
+class FakeSessionPool:
+    def __init__(self, site):
+        self.site = site
+        self.contexts = {}
+
+    @asynccontextmanager
+    async def page(self, profile=None, **options):
+        key = json.dumps(options, sort_keys=True)
+        if key not in self.contexts:
+            self.contexts[key] = FakeContext(options.get("storage_state"))
+        yield FakePage(self.site, self.contexts[key])
+
+AUTH = FakeAuth(name="fakesite", login_url="https://site.test/login")
+
+@pytest.fixture
+def credentials(monkeypatch):
+    monkeypatch.setenv("FAKESITE_USERNAME", "me@example.com")
+    monkeypatch.setenv("FAKESITE_PASSWORD", "secret")
+
+async def open_job(page):
+    await page.goto("https://site.test/jobs/1")
+    return page.url
+
+def test_store_encrypts_state_at_rest(tmp_path):
+    key = Fernet.generate_key()
+    store = SessionStore(str(tmp_path), key=key)
+    state = {"cookies": [{"name": "li_at", "value": "very-secret-cookie"}], "origins": []}
+    store.save("linkedin", "me@example.com", state)
+
+    path = store.path("linkedin", "me@example.com")
+    assert b"very-secret-cookie" not in path.read_bytes()
+    assert "example.com" not in path.name
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert SessionStore(str(tmp_path), key=key).load("linkedin", "me@example.com") == state
+
+    # Wrong key or corrupted file: treated as no session rather than an error
+    assert SessionStore(str(tmp_path), key=Fernet.generate_key()).load("linkedin", "me@example.com") is None
+    path.write_bytes(b"garbage")
+    assert store.load("linkedin", "me@example.com") is None
+
+def test_store_generates_a_local_key_when_unset(tmp_path, monkeypatch):
+    monkeypatch.delenv("BROWSER_SESSION_KEY", raising=False)
+    SessionStore(str(tmp_path)).save("site", "me", {"cookies": []})
+    assert stat.S_IMODE(os.stat(tmp_path / ".key").st_mode) == 0o600
+    assert SessionStore(str(tmp_path)).load("site", "me") == {"cookies": []}
+
+def test_without_credentials_pages_are_anonymous(tmp_path, monkeypatch):
+    monkeypatch.delenv("FAKESITE_USERNAME", raising=False)
+    site = FakeSite()
+    manager = SessionManager(pool=FakeSessionPool(site), store=SessionStore(str(tmp_path), key=Fernet.generate_key()))
+
+    assert "/login" in asyncio.run(manager.run(AUTH, open_job))
+    assert site.logins == 0
+
+def test_logs_in_once_then_reuses_warm_context(tmp_path, credentials):
+    site = FakeSite()
+    pool = FakeSessionPool(site)
+    manager = SessionManager(pool=pool, store=SessionStore(str(tmp_path), key=Fernet.generate_key()))
+
+    async def run():
+        return await asyncio.gather(*(manager.run(AUTH, open_job) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["https://site.test/jobs/1"] * 5
+    assert site.logins == 1
+    # One login context (cleared afterwards) and one authenticated context shared by all leases
+    assert len(pool.contexts) == 2
+    login_context = pool.contexts[json.dumps({"storage_state": None})]
+    assert login_context.cookies == {}
+
+def test_restores_saved_state_across_restarts(tmp_path, credentials):
+    site = FakeSite()
+    key = Fernet.generate_key()
+    first = SessionManager(pool=FakeSessionPool(site), store=SessionStore(str(tmp_path), key=key))
+    asyncio.run(first.run(AUTH, open_job))
+
+    restarted = SessionManager(pool=FakeSessionPool(site), store=SessionStore(str(tmp_path), key=key))
+    assert asyncio.run(restarted.run(AUTH, open_job)) == "https://site.test/jobs/1"
+    assert site.logins == 1
+
+def test_refreshes_expired_session_once_for_concurrent_callers(tmp_path, credentials):
+    site = FakeSite()
+    manager = SessionManager(pool=FakeSessionPool(site), store=SessionStore(str(tmp_path), key=Fernet.generate_key()))
+    asyncio.run(manager.run(AUTH, open_job))
+
+    site.valid_tokens.clear() # Server-side expiry
+
+    async def run():
+        return await asyncio.gather(*(manager.run(AUTH, open_job) for _ in range(4)))
+
+    assert asyncio.run(run()) == ["https://site.test/jobs/1"] * 4
+    assert site.logins == 2
+
+def test_logins_and_retries_take_scheduler_tokens(tmp_path, credentials):
+    # Three tokens and next to no refill: the job page, the login and the retry
+    scheduler = PolitenessScheduler(max_in_flight=1, default_policy=HostPolicy(requests_per_minute=0.001, burst=3, max_in_flight=1))
+    site = FakeSite()
+    manager = SessionManager(pool=FakeSessionPool(site), store=SessionStore(str(tmp_path), key=Fernet.generate_key()), scheduler=scheduler)
+    lane = scheduler._lane("site.test")
+
+    async def run():
+        async with scheduler.slot("https://site.test/jobs/1") as ticket:
+            first = await manager.run(AUTH, open_job, ticket=ticket)
+        assert lane.bucket.try_acquire() > 0 # Each navigation took exactly one token
+        return first
+
+    # A fresh login runs under the caller's slot instead of queueing for a second one
+    lane.bucket._tokens = 2
+    assert asyncio.run(run()) == "https://site.test/jobs/1"
+    assert site.logins == 1
+
+    site.valid_tokens.clear()
+    lane.bucket._tokens = 3
+    assert asyncio.run(run()) == "https://site.test/jobs/1"
+    assert site.logins == 2
+
+    # Without a caller's ticket the login queues for a slot of its own
+    manager.forget(AUTH, "me@example.com")
+    lane.bucket._tokens = 1
+    assert asyncio.run(manager.run(AUTH, open_job)) == "https://site.test/jobs/1"
+    assert lane.bucket.try_acquire() > 0
+
+def test_login_failure_propagates(tmp_path, credentials, monkeypatch):
+    monkeypatch.setenv("FAKESITE_PASSWORD", "wrong")
+    manager = SessionManager(pool=FakeSessionPool(FakeSite()), store=SessionStore(str(tmp_path), key=Fernet.generate_key()))
+    with pytest.raises(LoginFailed):
+        asyncio.run(manager.run(AUTH, open_job))
+
+# Real Chromium against a local stand-in login page
+
+class LoginFixtureHandler(BaseHTTPRequestHandler):
+    valid_tokens = set()
+    logins = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body="", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def do_GET(self):
+        cookie = self.headers.get("Cookie", "")
+        token = dict(part.strip().split("=", 1) for part in cookie.split(";") if "=" in part).get("session")
+        if self.path.startswith("/login"):
+            self._send(200, '<form method="post" action="/login"><input id="username" name="username">'
+                            '<input id="password" name="password" type="password"><button type="submit">Sign in</button></form>')
+        elif token in self.valid_tokens:
+            self._send(200, "<h1>Senior Backend Engineer</h1>")
+        else:
+            self._send(302, headers={"Location": "/login?next=" + self.path})
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        if form.get("password") == ["secret"]:
+            type(self).logins += 1
+            token = f"t{self.logins}"
+            self.valid_tokens.add(token)
+            self._send(302, headers={"Location": "/feed", "Set-Cookie": f"session={token}; Path=/"})
+        else:
+            self._send(302, headers={"Location": "/login?error=1"})
+
+@pytest.fixture
+def login_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LoginFixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_chromium_session_lifecycle(tmp_path, credentials, login_server):
+    from app.services.browser import BrowserPool
+
+    auth = SiteAuth(name="fakesite", login_url=f"{login_server}/login")
+    key = Fernet.generate_key()
+
+    async def title(page):
+        await page.goto(f"{login_server}/jobs/1")
+        return await page.text_content("h1", timeout=2000)
+
+    async def run():
+        pool = BrowserPool(size=1, name="test-sessions")
+        try:
+            await pool.start(warm=False)
+            await pool._launch(pool._slots[0])
+        except Exception as e:
+            await pool.stop()
+            pytest.skip(f"Chromium is not available: {str(e).splitlines()[0]}")
+        try:
+            manager = SessionManager(pool=pool, store=SessionStore(str(tmp_path), key=key))
+            first = await manager.run(auth, title)
+            second = await manager.run(auth, title)
+            logins_before_expiry = LoginFixtureHandler.logins
+            LoginFixtureHandler.valid_tokens.clear()
+            third = await manager.run(auth, title)
+            restarted = SessionManager(pool=pool, store=SessionStore(str(tmp_path), key=key))
+            fourth = await restarted.run(auth, title)
+            return [first, second, third, fourth], logins_before_expiry
+        finally:
+            await pool.stop()
+
+    LoginFixtureHandler.logins = 0
+    titles, logins_before_expiry = asyncio.run(run())
+    assert titles == ["Senior Backend Engineer"] * 4
+    assert logins_before_expiry == 1
+    assert LoginFixtureHandler.logins == 2
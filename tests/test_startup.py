@@ -0,0 +1,59 @@
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use (LLM call, browser lease, ranking request), never at import
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_openai", "openai", "playwright", "bs4", "numpy", "scipy")
+# Cumulative `import app.main` time; FastAPI and SQLAlchemy alone take most of it
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", "2.5"))
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+def import_times(module: str, tmp_path) -> dict:
+    """Runs `python -X importtime -c "import <module>"` in a clean process; module -> cumulative seconds."""
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'startup.db'}"}
+    env.pop("OPENAI_API_KEY", None) # Importing must not need credentials either
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            times[match.group(4)] = int(match.group(2)) / 1e6
+    return times
+
+def test_api_import_skips_heavy_dependencies_and_stays_in_budget(tmp_path):
+    times = import_times("app.main", tmp_path)
+
+    loaded = sorted(name for name in times if name.split(".")[0] in LAZY_MODULES)
+    assert loaded == [], f"imported at startup: {loaded[:10]}"
+    assert times["app.main"] < IMPORT_BUDGET_SECONDS, f"import app.main took {times['app.main']:.2f}s"
+
+def test_worker_import_skips_playwright(tmp_path):
+    times = import_times("app.worker", tmp_path)
+    assert not any(name.split(".")[0] in LAZY_MODULES for name in times)
+
+def test_importing_the_app_does_not_create_the_schema(tmp_path):
+    import_times("app.main", tmp_path)
+    db_path = tmp_path / "startup.db"
+    if db_path.exists():
+        assert sqlite3.connect(db_path).execute("SELECT name FROM sqlite_master").fetchall() == []
+
+def test_init_db_creates_tables_and_search(tmp_path):
+    from sqlalchemy import create_engine, inspect
+    from app.database import init_db
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'init.db'}")
+    init_db(engine)
+    init_db(engine) # Idempotent
+    tables = set(inspect(engine).get_table_names())
+    assert {"jobs", "resumes", "applications", "tasks", "jobs_fts"} <= tables
+    engine.dispose()
@@ -0,0 +1,79 @@
+import asyncio
+import os
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+from app.services.fake_llm import FakeChatModel
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.rate_limit import LLMRateLimiter, TokenBucket
+from app.services.resume import ResumeBuilder
+
+def make_builder(llm, requests_per_minute=60000, tokens_per_minute=10_000_000):
+    builder = ResumeBuilder(
+        llm=llm,
+        cache=LLMCache(namespace="test-tailor-many", persistent=False),
+        cache_policy=CachePolicy(enabled=False),
+        rate_limiter=LLMRateLimiter(requests_per_minute, tokens_per_minute, name="test"),
+    )
+    builder.retry_base_seconds = 0.01
+    return builder
+
+def test_tailor_many_keeps_input_order_and_runs_concurrently():
+    llm = FakeChatModel(latency=0.05)
+    builder = make_builder(llm)
+    job_descriptions = [f"Job {i} needs kubernetes{i}" for i in range(10)]
+
+    results = asyncio.run(builder.tailor_many("My resume", job_descriptions, concurrency=10))
+
+    assert [r.index for r in results] == list(range(10))
+    assert all(r.ok for r in results)
+    assert all(f"kubernetes{i}" in r.content for i, r in enumerate(results))
+    assert llm.stats["calls"] == 10
+    assert llm.stats["peak_in_flight"] == 10
+
+def test_tailor_many_bounds_calls_in_flight():
+    llm = FakeChatModel(latency=0.01)
+    builder = make_builder(llm)
+
+    results = asyncio.run(builder.tailor_many("My resume", [f"role {i}" for i in range(9)], concurrency=3))
+
+    assert all(r.ok for r in results)
+    assert llm.stats["peak_in_flight"] == 3
+
+def test_tailor_many_retries_simulated_429s():
+    # Provider allows 3 calls per 0.2s window; the burst of 6 must back off and retry
+    llm = FakeChatModel(latency=0.0, rpm_limit=3, window_seconds=0.2)
+    builder = make_builder(llm)
+
+    results = asyncio.run(builder.tailor_many("My resume", [f"role {i}" for i in range(6)]))
+
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert llm.stats["rate_limited"] > 0
+    assert llm.stats["calls"] == 6 + llm.stats["rate_limited"]
+
+def test_tailor_many_reports_per_item_errors():
+    llm = FakeChatModel(latency=0.0, rpm_limit=1, window_seconds=60)
+    builder = make_builder(llm)
+    builder.max_retries = 0
+
+    results = asyncio.run(builder.tailor_many("My resume", ["a", "b", "c"], concurrency=1))
+
+    assert [r.ok for r in results] == [True, False, False]
+    assert "Rate limit" in results[1].error
+
+def test_token_bucket_grants_one_acquisition_per_refill():
+    now = [0.0]
+    bucket = TokenBucket(rate_per_minute=240, capacity=2, clock=lambda: now[0])  # 4/s after a burst of 2
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.25]
+    granted = []
+    for _ in range(8):
+        now[0] += 0.25
+        granted.append(sum(bucket.try_acquire() == 0.0 for _ in range(3)))
+    assert granted == [1] * 8
+
+    # Idle time refills the burst, no more
+    now[0] += 60
+    assert sum(bucket.try_acquire() == 0.0 for _ in range(5)) == 2
+
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+
+if "OPENAI_API_KEY" not in os.environ:
+    os.environ["OPENAI_API_KEY"] = "sk-mock-key"
+
+import pytest
+from fastapi.testclient import TestClient
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.metrics import Registry, render_prometheus
+from app.models import Job
+from app.services.fake_llm import FakeChatModel
+from app.services.llm_cache import CachePolicy, LLMCache
+from app.services.rate_limit import LLMRateLimiter
+from app.services.resume import LLM_TOKENS, ResumeBuilder
+from app.tracing import STAGE_IN_FLIGHT, STAGE_LATENCY, FileExporter, InMemoryExporter, add_exporter, current_span, remove_exporter, span
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    add_exporter(exporter)
+    yield exporter
+    remove_exporter(exporter)
+
+def test_nested_spans_share_a_trace_and_feed_stage_metrics(exporter):
+    observed = STAGE_LATENCY.count(stage="test.child", source="acme")
+
+    with span("test.parent", source="acme") as parent:
+        with span("test.child", step=1) as child:
+            assert current_span() is child
+        assert current_span() is parent
+    assert current_span() is None
+
+    child, parent = exporter.spans
+    assert (child.trace_id, child.parent_id) == (parent.trace_id, parent.span_id)
+    assert child.source == "acme" # Inherited from the parent
+    assert child.attributes == {"step": 1}
+    assert STAGE_LATENCY.count(stage="test.child", source="acme") == observed + 1
+    assert STAGE_IN_FLIGHT.value(stage="test.child", source="acme") == 0
+
+def test_span_records_errors(exporter):
+    with pytest.raises(RuntimeError):
+        with span("test.failing"):
+            raise RuntimeError("boom")
+
+    (failed,) = exporter.spans
+    assert failed.status == "error"
+    assert failed.error == "RuntimeError: boom"
+
+def test_spans_nest_per_task(exporter):
+    async def worker(name):
+        with span("test.task", worker=name):
+            await asyncio.sleep(0.01)
+            with span("test.step", worker=name):
+                await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(worker("a"), worker("b"))
+
+    asyncio.run(main())
+    tasks = {s.attributes["worker"]: s for s in exporter.spans if s.name == "test.task"}
+    for s in exporter.spans:
+        if s.name == "test.step":
+            assert s.parent_id == tasks[s.attributes["worker"]].span_id
+
+def test_file_exporter_writes_json_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = FileExporter(str(path))
+    add_exporter(exporter)
+    try:
+        with span("test.file", source="acme", url="https://example.com"):
+            pass
+    finally:
+        remove_exporter(exporter)
+
+    (record,) = [json.loads(line) for line in path.read_text().splitlines()]
+    assert record["name"] == "test.file"
+    assert record["source"] == "acme"
+    assert record["attributes"] == {"url": "https://example.com"}
+    assert record["duration_ms"] >= 0
+
+def test_render_prometheus_text_format():
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs seen", ["source"]).inc(3, source='li"nk')
+    registry.histogram("work_seconds", "Work time", ["stage"], buckets=(0.1, 1.0)).observe(0.5, stage="parse")
+
+    lines = render_prometheus(registry).splitlines()
+    assert "# TYPE jobs_total counter" in lines
+    assert 'jobs_total{source="li\\"nk"} 3' in lines
+    assert 'work_seconds_bucket{stage="parse",le="0.1"} 0' in lines
+    assert 'work_seconds_bucket{stage="parse",le="1"} 1' in lines
+    assert 'work_seconds_bucket{stage="parse",le="+Inf"} 1' in lines
+    assert 'work_seconds_count{stage="parse"} 1' in lines
+
+def test_llm_call_span_carries_token_counts(exporter):
+    builder = ResumeBuilder(
+        llm=FakeChatModel(latency=0.0),
+        cache=LLMCache(namespace="test-tracing", persistent=False),
+        cache_policy=CachePolicy(enabled=False),
+        rate_limiter=LLMRateLimiter(60000, 10_000_000, name="test"),
+    )
+    observed = LLM_TOKENS.value(model="fake-chat", kind="output")
+
+    asyncio.run(builder.tailor_resume("My resume", "Needs kubernetes"))
+
+    (call,) = [s for s in exporter.spans if s.name == "llm.call"]
+    assert call.attributes["attempts"] == 1
+    assert call.attributes["input_tokens"] > 0
+    assert call.attributes["output_tokens"] > 0
+    assert LLM_TOKENS.value(model="fake-chat", kind="output") == observed + call.attributes["output_tokens"]
+
+def test_db_commit_span(exporter):
+    async def commit():
+        async with AsyncSessionLocal() as db:
+            db.add(Job(title="Traced", company="Acme", url="https://example.com/traced", source="mock"))
+            with span("test.save"):
+                await db.commit()
+
+    asyncio.run(commit())
+    save = next(s for s in exporter.spans if s.name == "test.save")
+    commit_span = next(s for s in exporter.spans if s.name == "db.commit")
+    assert commit_span.parent_id == save.span_id
+    assert commit_span.status == "ok"
+
+def test_metrics_endpoint_and_request_spans(exporter):
+    client = TestClient(app)
+    assert client.get("/").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/",status="200"}' in response.text
+    assert "# TYPE stage_duration_seconds histogram" in response.text
+
+    request = next(s for s in exporter.spans if s.name == "http.request")
+    assert request.attributes["route"] == "/"
+    assert request.attributes["status"] == 200